@@ -0,0 +1,81 @@
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+from explainer import OlamaExplainer, load_config
+from llm_backends import BACKENDS, make_backend
+from stub_llm_server import start_in_background
+
+
+def synthetic_records(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "mutant_name": f"bench.x_func__mutmut_{i}",
+            "source_file": "bench.py",
+            "mutation_desc": f"Line {i + 1}:\n--- original\n+++ mutated\n-    return a + {i}\n+    return a - {i}",
+            "tests": [],
+        }
+        for i in range(count)
+    ]
+
+
+def run_benchmark(explainer: OlamaExplainer, records: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(explainer.explain, records))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": len(records),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(records) / elapsed, 2) if elapsed else None,
+        "empty_answers": sum(1 for r in results if not r.get("why")),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure explainer throughput against a real or stub LLM endpoint")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="ollama")
+    parser.add_argument("--url", default=None, help="Endpoint to benchmark. Without it a local stub server is started.")
+    parser.add_argument("--config", default=None, help="Read backend settings from this config.yaml instead of --backend/--url")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated latency of the stub server in seconds")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated worker counts to try")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    server = None
+    if args.config:
+        cfg = load_config(args.config)
+    else:
+        url = args.url
+        if url is None:
+            server = start_in_background(latency=args.latency)
+            host, port = server.server_address[:2]
+            url = f"http://{host}:{port}"
+            print(f"🤖 Started stub LLM on {url} (latency {args.latency}s)")
+        cfg = {"llm_backend": args.backend, "llm_url": url, "llm_model": "stub"}
+
+    results = []
+    try:
+        for concurrency in [int(x) for x in args.concurrency.split(",") if x.strip()]:
+            # fresh explainer per round so the cache does not hide requests
+            explainer = OlamaExplainer(backend=make_backend(cfg), cfg=cfg)
+            result = run_benchmark(explainer, synthetic_records(args.requests), concurrency)
+            results.append(result)
+            print(f"📈 concurrency={result['concurrency']}: {result['requests_per_second']} req/s "
+                  f"({result['requests']} requests in {result['seconds']}s, {result['empty_answers']} empty)")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from typing import Any, Dict, Mapping, Optional, Set
+
+
+# Changed lines are read from the JSON map that mutmut saves as mutants/changed_lines.json
+# (mutmut.diff_targeting.load_changed_lines), so diffs are only parsed by mutmut.
+def match_path(changed: Mapping[str, Any], path: str) -> Optional[str]:
+    """Key of `changed` naming the same file as `path`, also when one side is relative to a sub-directory of the other.
+
+    None if no key matches, or if several do (like two `__init__.py` in different packages)."""
+    path = path.replace("\\", "/")
+    if path.startswith("./"):
+        path = path[2:]
+    if path in changed:
+        return path
+    matches = [
+        diff_path
+        for diff_path in changed
+        if diff_path.endswith("/" + path) or path.endswith("/" + diff_path)
+    ]
+    return matches[0] if len(matches) == 1 else None
+
+
+def lines_for_path(changed: Dict[str, Set[int]], path: str) -> Set[int]:
+    """Changed lines for `path`, see `match_path`."""
+    diff_path = match_path(changed, path)
+    return changed[diff_path] if diff_path is not None else set()
@@ -1,20 +1,33 @@
+import argparse
 import os
 import json
-import requests
+import time
 import yaml
-import re
 from typing import Dict, Any, List
 
+from llm_backends import CircuitOpenError, LLMBackend, make_resilient_backend
+from prompt_builder import PromptBuilder, DEFAULT_TOKEN_BUDGET
+from mutmut.diff_targeting import load_changed_lines
+from prioritize import prioritize
+
 def load_config(config_path: str = "config.yaml") -> Dict[str, Any]:
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
 
 class OlamaExplainer:
-    def __init__(self, config_path: str = "config.yaml"):
-        cfg = load_config(config_path)
-        self.olama_url = cfg.get("olama_url", "http://localhost:11434/api/generate")
-        self.model = cfg.get("olama_model", "codellama:7b-instruct")
-        self.headers = {"Content-Type": "application/json"}
+    def __init__(self, config_path: str = None, backend: LLMBackend = None, cfg: Dict[str, Any] = None):
+        """Settings come from `cfg` if given, else from `config_path` (./config.yaml by default).
+
+        With an injected `backend` and neither of them, no config file is read and the defaults apply."""
+        if cfg is None:
+            cfg = {} if config_path is None and backend is not None else load_config(config_path or "config.yaml")
+        self.backend = make_resilient_backend(cfg, backend)
+        self.metrics = self.backend.metrics
+        self.metrics_path = cfg.get("metrics_path", "mutants/explainer_metrics.json")
+        self.prompt_builder = PromptBuilder(
+            token_budget=int(cfg.get("prompt_token_budget", DEFAULT_TOKEN_BUDGET)),
+            max_tests=int(cfg.get("prompt_max_tests", 3)),
+        )
         self._cache: Dict[str, Dict[str, str]] = {}
 
     def explain(self, rec: Dict[str, Any]) -> Dict[str, str]:
@@ -22,38 +35,11 @@ class OlamaExplainer:
         if key in self._cache:
             return self._cache[key]
 
-        # Construct prompt
-        mutation_desc = rec.get("mutation_desc", "")[:500]
-        prompt = (
-            "You are a mutation testing expert. Analyze the mutation and suggest how to detect it with a test.\n"
-            "Reply ONLY in valid JSON format using these keys:\n"
-            "- why: explain why this mutant survived\n"
-            "- how to kill: describe what kind of test or code change would kill this mutant\n"
-            "- example_test: write a complete pytest-style test function that would kill this mutant\n\n"
-            f"Mutation description:\n{mutation_desc}\n"
-            f"File: {rec['source_file']}\n"
-        )
-        
-        tests = rec.get("tests", [])
-        if tests:
-            prompt += "Existing tests that touch this code path:\n"
-            for t in tests[:2]:
-                line = t.get("test_code", "").splitlines()[0][:100]
-                prompt += f"- {t['test_name']}: {line}...\n"
-        else:
-            prompt += "No existing tests cover this code path.\n"
-
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False
-        }
+        prompt = self.prompt_builder.build(rec)
 
         print(f"[Explaining] {key}")
         try:
-            resp = requests.post(self.olama_url, headers=self.headers, json=payload, timeout=300)
-            resp.raise_for_status()
-            raw = resp.json().get("response", "").strip()
+            raw = self.backend.generate(prompt)
 
             # Optional debug
             print(f"[Raw LLM Response]\n{raw[:300]}...\n")
@@ -77,33 +63,191 @@ class OlamaExplainer:
                 "example_test": obj.get("example_test", "").strip()
             }
 
+        except CircuitOpenError:
+            raise
         except Exception as e:
             print(f"[Error] {key}: {e}")
             out = {"why": "", "how to kill": "", "example_test": ""}
 
-        self._cache[key] = out
+        # Never cache failures or empty answers, so a later call can still produce an explanation
+        if out["why"] or out["how to kill"]:
+            self._cache[key] = out
         return out
 
+class ExplanationJournal:
+    """Append-only JSON-lines log of finished survivor records.
+
+    Each record is flushed and fsynced as soon as it is explained, so a crash or CI timeout keeps every
+    explanation finished so far. A torn last line from an interrupted write is ignored when reading."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = None
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        records: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                records[rec["mutant_name"]] = rec
+        return records
+
+    def open(self, resume: bool):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if resume and os.path.exists(self.path):
+            self._drop_torn_line()
+        self._f = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _drop_torn_line(self):
+        # Cut the file back to its last newline, so the next record does not get appended to a partial one
+        with open(self.path, 'rb+') as f:
+            end = pos = f.seek(0, os.SEEK_END)
+            while pos > 0:
+                step = min(4096, pos)
+                f.seek(pos - step)
+                newline = f.read(step).rfind(b"\n")
+                if newline != -1:
+                    pos = pos - step + newline + 1
+                    break
+                pos -= step
+            if pos != end:
+                f.truncate(pos)
+
+    def append(self, rec: Dict[str, Any]):
+        self._f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def journal_path_for(output_path: str) -> str:
+    return os.path.splitext(output_path)[0] + ".jsonl"
+
+
+def finalize(input_path: str, journal_path: str, output_path: str) -> List[Dict[str, Any]]:
+    """Write the JSON array read by generate_report.py from the journal.
+
+    Survivors from `input_path` that never reached the journal are included as deferred. The array is written
+    to a temporary file and renamed, so `output_path` is never left half-written."""
+    with open(input_path, 'r', encoding='utf-8') as f:
+        inputs: List[Dict[str, Any]] = json.load(f)
+    journaled = ExplanationJournal(journal_path).load()
+
+    records = list(journaled.values())
+    for rec in inputs:
+        if rec["mutant_name"] not in journaled:
+            rec.update({"why": "", "how to kill": "", "example_test": "", "explanation_status": "deferred"})
+            records.append(rec)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, output_path)
+    return records
+
+
 def main(
     input_path: str = "mutants/survived_mutants.json",
-    output_path: str = "mutants/survived_mutants_with_explanations.json"
+    output_path: str = "mutants/survived_mutants_with_explanations.json",
+    config_path: str = "config.yaml",
+    changed_lines_path: str = None,
+    max_calls: int = None,
+    time_budget: float = None,
+    resume: bool = None,
+    repo_path: str = None,
 ) -> None:
+    """Explain survivors in priority order until the call or wall-clock budget runs out.
+
+    Budgets and the changed lines default to `explain_max_calls`, `explain_time_budget` and `changed_lines_path` in
+    config.yaml. The changed lines are the JSON map mutmut saves as mutants/changed_lines.json. Files with recent
+    churn rank higher when `repo_path` (or `repo_path` in config.yaml) names the checkout mutmut ran in.
+    Survivors left over when a budget is exhausted, or reached while the circuit breaker is open, are written out
+    with "explanation_status": "deferred". Short-circuited survivors do not count against `max_calls`.
+    Every finished record is appended to a .jsonl journal next to `output_path`; with `resume` (or
+    `explain_resume`), survivors already explained in that journal are skipped."""
     if not os.path.exists(input_path):
         raise FileNotFoundError(input_path)
 
     with open(input_path, 'r', encoding='utf-8') as f:
         records: List[Dict[str, Any]] = json.load(f)
 
-    expl = OlamaExplainer()
-    for rec in records:
-        fb = expl.explain(rec)
-        rec.update(fb)
+    cfg = load_config(config_path)
+    changed_lines_path = changed_lines_path or cfg.get("changed_lines_path")
+    repo_path = repo_path or cfg.get("repo_path")
+    max_calls = max_calls if max_calls is not None else cfg.get("explain_max_calls")
+    time_budget = time_budget if time_budget is not None else cfg.get("explain_time_budget")
+    resume = resume if resume is not None else bool(cfg.get("explain_resume", False))
+
+    changed_lines = load_changed_lines(changed_lines_path) if changed_lines_path and os.path.exists(changed_lines_path) else {}
+    records = prioritize(records, changed_lines, repo_path)
+
+    journal = ExplanationJournal(journal_path_for(output_path))
+    done = {k for k, r in journal.load().items() if r.get("explanation_status") == "explained"} if resume else set()
+    if done:
+        print(f"Resuming: {len(done)} survivors already explained")
+    journal.open(resume=resume)
+
+    expl = OlamaExplainer(config_path)
+    start = time.monotonic()
+    calls = 0
+    deferred = 0
+    try:
+        for rec in records:
+            if rec["mutant_name"] in done:
+                continue
+            out_of_calls = max_calls is not None and calls >= int(max_calls)
+            out_of_time = time_budget is not None and time.monotonic() - start >= float(time_budget)
+            if out_of_calls or out_of_time:
+                rec.update({"why": "", "how to kill": "", "example_test": "", "explanation_status": "deferred"})
+                deferred += 1
+            else:
+                try:
+                    fb = expl.explain(rec)
+                except CircuitOpenError:
+                    rec.update({"why": "", "how to kill": "", "example_test": "", "explanation_status": "deferred"})
+                    deferred += 1
+                else:
+                    calls += 1
+                    rec.update(fb)
+                    rec["explanation_status"] = "explained" if fb["why"] or fb["how to kill"] else "failed"
+            journal.append(rec)
+    finally:
+        journal.close()
 
-    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(records, f, indent=2, ensure_ascii=False)
+    if deferred:
+        print(f"Deferred {deferred} of {len(records)} survivors (budget exhausted or circuit open); rerun with --resume")
 
+    finalize(input_path, journal.path, output_path)
     print(f"Wrote feedback to {output_path}")
 
+    expl.metrics.write(expl.metrics_path)
+    print(f"Wrote request metrics to {expl.metrics_path}")
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Explain surviving mutants with an LLM")
+    parser.add_argument("--input", default="mutants/survived_mutants.json")
+    parser.add_argument("--output", default="mutants/survived_mutants_with_explanations.json")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--changed-lines", default=None,
+                        help="mutants/changed_lines.json of a targeted mutmut run; survivors on changed lines are explained first")
+    parser.add_argument("--repo", default=None, help="Checkout mutmut ran in, to rank survivors in files with recent churn first")
+    parser.add_argument("--max-calls", type=int, default=None, help="Explain at most this many survivors")
+    parser.add_argument("--time-budget", type=float, default=None, help="Stop explaining after this many seconds")
+    parser.add_argument("--resume", action="store_true", default=None, help="Skip survivors already explained in the .jsonl journal")
+    parser.add_argument("--finalize", action="store_true", help="Only rebuild the JSON output from the .jsonl journal, e.g. after a crash")
+    args = parser.parse_args()
+    if args.finalize:
+        finalize(args.input, journal_path_for(args.output), args.output)
+        print(f"Wrote feedback to {args.output}")
+    else:
+        main(args.input, args.output, args.config, args.changed_lines, args.max_calls, args.time_budget, args.resume, args.repo)
@@ -1,17 +1,84 @@
+import argparse
 import json
-import re
+from typing import Dict, Any, Iterable, Iterator, List, Set, Tuple
+
+from diff_utils import match_path
 from explainer import main as explain_main
+from prompt_builder import mutated_line_number
+from mutmut.diff_targeting import load_changed_lines
+
+READ_CHUNK_SIZE = 64 * 1024
 
-def collect_and_explain():
+def collect_and_explain(changed_lines_path: str = None, repo_path: str = None):
     explain_main(
         input_path="mutants/survived_mutants.json",
-        output_path="mutants/survived_mutants_with_explanations.json"
+        output_path="mutants/survived_mutants_with_explanations.json",
+        changed_lines_path=changed_lines_path,
+        repo_path=repo_path,
     )
 
 def load_records(path: str):
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+# Yield the elements of a top-level JSON array one at a time, without holding the whole file in memory
+def iter_json_array(f, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        # skip whitespace and separators between elements
+        while pos < len(buf) and (buf[pos].isspace() or (started and buf[pos] == ",")):
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            buf, pos = f.read(chunk_size), 0
+            eof = not buf
+            continue
+
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("Expected a JSON array of survivor records")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == "]":
+            return
+
+        error = None
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            error, end = e, None
+        # only a separator ends an element: a number cut off at the chunk end, like "12" or "-6.", may go on
+        if end is None or (not eof and (end == len(buf) or buf[end] not in ",] \t\r\n")):
+            more = f.read(chunk_size)
+            if more:
+                buf = buf[pos:] + more
+                pos = 0
+                continue
+            eof = True
+            if error is not None:
+                raise error
+        yield value
+        pos = end
+        if pos > chunk_size:
+            buf, pos = buf[pos:], 0
+
+# Yield survivor records from a JSON array or a JSON lines file (such as the explainer journal)
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_json_array(f)
+
 # Generate short human-readable mutation summary
 def summarize_mutation(mutation_desc: str) -> str:
     lines = mutation_desc.splitlines()
@@ -28,70 +95,177 @@ def summarize_mutation(mutation_desc: str) -> str:
         return f"Changed `{original_line}` to `{mutated_line}`"
     return "Mutation applied to unknown line"
 
-def to_rdjson(records):
-    diagnostics = []
+def summarize_record(m) -> str:
+    original = " ".join(str(m.get("original_snippet") or "").split())
+    mutated = " ".join(str(m.get("mutated_snippet") or "").split())
+    if original or mutated:
+        return f"Changed `{original}` to `{mutated}`"
+    return summarize_mutation(m.get("mutation_desc", ""))
 
-    for m in records:
-        file_path    = m.get("source_file", "unknown")
-        mutant_name  = m.get("mutant_name", "unknown")
-        why          = str(m.get("why", "")).strip()
-        how_to_kill  = str(m.get("how to kill", "")).strip()
-
-        # Extract line number from mutation_desc
-        mutation_desc = m.get("mutation_desc", "")
-        match = re.search(r"Line (\d+):", mutation_desc)
-        line_number = int(match.group(1)) if match else 1
-
-        # Mutation summary
-        mutation_summary = summarize_mutation(mutation_desc)
-
-        # Handle example_test
-        example = m.get("example_test", "")
-        if isinstance(example, dict):
-            test_name = example.get("test_name", "")
-            test_code = example.get("test_code", "")
-            example_test = f"{test_name}:\n{test_code}"
-        else:
-            # Decode escaped \n to actual newlines
-            example_test = str(example).encode('utf-8').decode('unicode_escape')
-
-        # Build message
-        message = (
-            f"[{mutant_name}] Survived mutant. {mutation_summary}\n"
-            f"Why: {why}\n"
-            f"How to kill: {how_to_kill}\n"
-            f"Test:\n```python\n{example_test}\n```"
-        )
-
-        diagnostics.append({
-            "message": message,
-            "location": {
-                "path": file_path,
-                "range": {
-                    "start": { "line": line_number, "column": 1 },
-                    "end":   { "line": line_number, "column": 1 }
-                }
-            },
-            "severity": "WARNING",
-            "code": {
-                "value": "survived-mutant"
-            },
-            "source": {
-                "name": "CAMILA"
+# rdjson range of the mutated node: 1-based lines and columns
+def mutation_range(m):
+    if m.get("start_line"):
+        start_line = int(m["start_line"])
+        end_line = int(m.get("end_line") or start_line)
+        # PositionProvider columns are 0-based
+        start_column = int(m.get("start_column") or 0) + 1
+        end_column = int(m.get("end_column") or 0) + 1
+        return start_line, start_column, end_line, end_column
+
+    # records written before survivors carried structured positions
+    line_number = mutated_line_number(m) or 1
+    return line_number, 1, line_number, 1
+
+def to_diagnostic(m) -> Dict[str, Any]:
+    file_path    = m.get("source_file", "unknown")
+    mutant_name  = m.get("mutant_name", "unknown")
+    why          = str(m.get("why", "")).strip()
+    how_to_kill  = str(m.get("how to kill", "")).strip()
+
+    start_line, start_column, end_line, end_column = mutation_range(m)
+
+    # Mutation summary
+    mutation_summary = summarize_record(m)
+
+    # Handle example_test
+    example = m.get("example_test", "")
+    if isinstance(example, dict):
+        test_name = example.get("test_name", "")
+        test_code = example.get("test_code", "")
+        example_test = f"{test_name}:\n{test_code}"
+    else:
+        # Decode escaped \n to actual newlines
+        example_test = str(example).encode('utf-8').decode('unicode_escape')
+
+    # Build message
+    message = (
+        f"[{mutant_name}] Survived mutant. {mutation_summary}\n"
+        f"Why: {why}\n"
+        f"How to kill: {how_to_kill}\n"
+        f"Test:\n```python\n{example_test}\n```"
+    )
+
+    return {
+        "message": message,
+        "location": {
+            "path": file_path,
+            "range": {
+                "start": { "line": start_line, "column": start_column },
+                "end":   { "line": end_line, "column": end_column }
             }
-        })
+        },
+        "severity": "WARNING",
+        "code": {
+            "value": "survived-mutant"
+        },
+        "source": {
+            "name": "CAMILA"
+        }
+    }
 
+def iter_diagnostics(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for m in records:
+        yield to_diagnostic(m)
+
+# Keep diagnostics that touch a line added or changed in the diff, using the diff's path for the location
+def filter_to_diff(diagnostics: Iterable[Dict[str, Any]], changed_lines: Dict[str, Set[int]]) -> Iterator[Dict[str, Any]]:
+    for d in diagnostics:
+        location = d["location"]
+        path = match_path(changed_lines, location["path"])
+        if path is None:
+            continue
+        start, end = location["range"]["start"]["line"], location["range"]["end"]["line"]
+        if not any(line in changed_lines[path] for line in range(start, end + 1)):
+            continue
+        # reviewdog matches locations against the PR diff, which is relative to the repository root
+        location["path"] = path
+        yield d
+
+def merge_diagnostics(group: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if len(group) == 1:
+        return group[0]
+    merged = dict(group[0])
+    start = min((d["location"]["range"]["start"] for d in group), key=lambda p: (p["line"], p["column"]))
+    end = max((d["location"]["range"]["end"] for d in group), key=lambda p: (p["line"], p["column"]))
+    merged["location"] = {
+        "path": group[0]["location"]["path"],
+        "range": {"start": start, "end": end},
+    }
+    merged["message"] = f"{len(group)} survived mutants on this line.\n\n" + "\n\n".join(d["message"] for d in group)
+    return merged
+
+# One diagnostic per (file, line): every survivor on a line would otherwise be its own review comment.
+# The explainer writes survivors in priority order, so a line's survivors can be anywhere in the stream: they are
+# grouped across all of it, and come out in the order of each line's first survivor.
+def aggregate_by_line(diagnostics: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    groups: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+    for d in diagnostics:
+        key = (d["location"]["path"], d["location"]["range"]["start"]["line"])
+        groups.setdefault(key, []).append(d)
+    for group in groups.values():
+        yield merge_diagnostics(group)
+
+def to_rdjson(records):
     return {
-        "diagnostics": diagnostics
+        "diagnostics": list(iter_diagnostics(records))
     }
 
+# reviewdog -f=rdjsonl: one diagnostic per line
+def write_rdjsonl(diagnostics: Iterable[Dict[str, Any]], path: str) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for diagnostic in diagnostics:
+            f.write(json.dumps(diagnostic, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+# reviewdog -f=rdjson, written one diagnostic at a time
+def write_rdjson(diagnostics: Iterable[Dict[str, Any]], path: str) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{\n  "diagnostics": [')
+        for diagnostic in diagnostics:
+            f.write(",\n    " if count else "\n    ")
+            f.write(json.dumps(diagnostic, ensure_ascii=False))
+            count += 1
+        f.write("\n  ]\n}\n")
+    return count
+
+WRITERS = {
+    "rdjsonl": write_rdjsonl,
+    "rdjson": write_rdjson,
+}
+
 def main():
-    collect_and_explain()
-    records = load_records("mutants/survived_mutants_with_explanations.json")
-    rdjson = to_rdjson(records)
+    parser = argparse.ArgumentParser(description="Explain surviving mutants and write a reviewdog report")
+    parser.add_argument("--input", default="mutants/survived_mutants_with_explanations.json",
+                        help="Explained survivors as a JSON array or JSON lines (.jsonl)")
+    parser.add_argument("--output", default="mutmut_report.rdjsonl")
+    parser.add_argument("--format", choices=sorted(WRITERS), default=None,
+                        help="Report format, by default taken from the --output extension")
+    parser.add_argument("--skip-explain", action="store_true",
+                        help="Report on --input as it is, without running the explainer first")
+    parser.add_argument("--changed-lines", default=None,
+                        help="mutants/changed_lines.json of a targeted mutmut run: only report survivors on those lines")
+    parser.add_argument("--repo", default=None,
+                        help="Checkout mutmut ran in, for the explainer to rank survivors in files with recent churn first")
+    parser.add_argument("--no-aggregate", action="store_true",
+                        help="Report every survivor separately instead of one diagnostic per line")
+    args = parser.parse_args()
+
+    fmt = args.format or ("rdjson" if args.output.endswith(".rdjson") else "rdjsonl")
+
+    if not args.skip_explain:
+        collect_and_explain(args.changed_lines, args.repo)
 
-    with open("mutmut_report.rdjson", "w", encoding="utf-8") as f:
-        json.dump(rdjson, f, indent=2, ensure_ascii=False)
+    diagnostics = iter_diagnostics(iter_records(args.input))
+    if args.changed_lines:
+        diagnostics = filter_to_diff(diagnostics, load_changed_lines(args.changed_lines))
+    if not args.no_aggregate:
+        diagnostics = aggregate_by_line(diagnostics)
+    count = WRITERS[fmt](diagnostics, args.output)
+    print(f"📝 Wrote {count} diagnostics to {args.output} ({fmt})")
 
 if __name__ == "__main__":
     main()
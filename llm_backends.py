@@ -0,0 +1,284 @@
+import json
+import os
+import random
+import time
+import requests
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Dict, Any, List
+from urllib.parse import urlparse
+
+DEFAULT_MODEL = "codellama:7b-instruct"
+
+
+class LLMBackend(ABC):
+    """Send one prompt to a language model endpoint and return its raw text reply."""
+
+    # Appended to the configured url when it only names a host (e.g. "http://localhost:11434")
+    endpoint = ""
+    default_url = ""
+
+    def __init__(self, url: str, model: str, timeout: float = 300, api_key: str = None):
+        self.url = self.resolve_url(url or self.default_url)
+        self.model = model
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+
+    def resolve_url(self, url: str) -> str:
+        if urlparse(url).path in ("", "/"):
+            return url.rstrip("/") + self.endpoint
+        return url
+
+    @abstractmethod
+    def build_payload(self, prompt: str) -> Dict[str, Any]:
+        """The JSON body of the request for `prompt`."""
+
+    @abstractmethod
+    def parse_response(self, data: Dict[str, Any]) -> str:
+        """The reply text in the decoded JSON response."""
+
+    def generate(self, prompt: str) -> str:
+        resp = requests.post(self.url, headers=self.headers, json=self.build_payload(prompt), timeout=self.timeout)
+        resp.raise_for_status()
+        return self.parse_response(resp.json()).strip()
+
+
+class OllamaBackend(LLMBackend):
+    endpoint = "/api/generate"
+    default_url = "http://localhost:11434/api/generate"
+
+    def build_payload(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False
+        }
+
+    def parse_response(self, data: Dict[str, Any]) -> str:
+        return data.get("response", "")
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """Client for any server implementing the OpenAI `/v1/chat/completions` API (vLLM, llama.cpp, LM Studio, ...)."""
+    endpoint = "/v1/chat/completions"
+    default_url = "http://localhost:8000/v1/chat/completions"
+
+    def build_payload(self, prompt: str) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0,
+            "stream": False
+        }
+
+    def parse_response(self, data: Dict[str, Any]) -> str:
+        choices = data.get("choices") or [{}]
+        return (choices[0].get("message") or {}).get("content", "")
+
+
+BACKENDS = {
+    "ollama": OllamaBackend,
+    "openai": OpenAICompatibleBackend,
+}
+
+
+def make_backend(cfg: Dict[str, Any]) -> LLMBackend:
+    """Create the backend named by `llm_backend` in config.yaml.
+
+    The older `olama_url`/`olama_model` keys are still honoured when the `llm_*` keys are missing."""
+    name = cfg.get("llm_backend", "ollama")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown llm_backend '{name}', expected one of: {', '.join(sorted(BACKENDS))}")
+
+    api_key = None
+    api_key_env = cfg.get("llm_api_key_env")
+    if api_key_env:
+        api_key = os.environ.get(api_key_env)
+
+    return BACKENDS[name](
+        url=cfg.get("llm_url") or cfg.get("olama_url", ""),
+        model=cfg.get("llm_model") or cfg.get("olama_model", DEFAULT_MODEL),
+        timeout=float(cfg.get("llm_timeout", 300)),
+        api_key=api_key,
+    )
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Stop calling an endpoint after `failure_threshold` consecutive failures.
+
+    After `reset_timeout` seconds one trial request is let through (half-open), and other callers are still rejected
+    until it is recorded. Success closes the circuit again, failure re-opens it for another `reset_timeout` seconds."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "half-open":
+                if self.trial_in_flight:
+                    return False
+                self.trial_in_flight = True
+            return state != "open"
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+
+
+class RequestMetrics:
+    """Per-request latency and error counts, summarized to JSON at the end of an explainer run."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.requests = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self._lock = Lock()
+
+    def record(self, *, latency: float, attempts: int, error: str = None):
+        with self._lock:
+            self.requests += 1
+            self.retries += max(attempts - 1, 0)
+            self.latencies.append(latency)
+            if error is None:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def record_error(self, error: str):
+        with self._lock:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def record_short_circuit(self):
+        with self._lock:
+            self.short_circuited += 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(int(p * len(latencies)), len(latencies) - 1)], 3)
+
+        return {
+            "requests": self.requests,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries,
+            "short_circuited": self.short_circuited,
+            "errors": dict(self.errors),
+            "latency_seconds": {
+                "total": round(sum(latencies), 3),
+                "mean": round(sum(latencies) / len(latencies), 3) if latencies else None,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1], 3) if latencies else None,
+            },
+        }
+
+    def write(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return False
+
+
+class ResilientBackend:
+    """Wrap a backend with bounded retries, full-jitter exponential backoff and a circuit breaker."""
+
+    def __init__(self, backend: LLMBackend, *, max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 30.0,
+                 breaker: CircuitBreaker = None, metrics: RequestMetrics = None, sleep=time.sleep):
+        self.backend = backend
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or RequestMetrics()
+        self.sleep = sleep
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def generate(self, prompt: str) -> str:
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.metrics.record_short_circuit()
+                if attempt:
+                    self.metrics.record(latency=time.perf_counter() - start, attempts=attempt, error=CircuitOpenError.__name__)
+                raise CircuitOpenError(f"circuit open after {self.breaker.consecutive_failures} consecutive failures")
+            try:
+                result = self.backend.generate(prompt)
+            except Exception as e:
+                self.metrics.record_error(type(e).__name__)
+                if not is_retryable(e):
+                    # The endpoint did answer (4xx, malformed body), so a bad prompt must not open the circuit
+                    self.breaker.record_success()
+                    self.metrics.record(latency=time.perf_counter() - start, attempts=attempt + 1, error=type(e).__name__)
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    self.metrics.record(latency=time.perf_counter() - start, attempts=attempt + 1, error=type(e).__name__)
+                    raise
+                self.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            self.metrics.record(latency=time.perf_counter() - start, attempts=attempt + 1)
+            return result
+
+
+def make_resilient_backend(cfg: Dict[str, Any], backend: LLMBackend = None) -> ResilientBackend:
+    return ResilientBackend(
+        backend or make_backend(cfg),
+        max_retries=int(cfg.get("llm_max_retries", 3)),
+        backoff_base=float(cfg.get("llm_backoff_base", 1.0)),
+        backoff_max=float(cfg.get("llm_backoff_max", 30.0)),
+        breaker=CircuitBreaker(
+            failure_threshold=int(cfg.get("llm_circuit_failures", 5)),
+            reset_timeout=float(cfg.get("llm_circuit_reset", 60.0)),
+        ),
+    )
@@ -1,30 +1,38 @@
 import ast
 import fnmatch
 import gc
+import hashlib
 import inspect
 import itertools
 import json
 from multiprocessing import Pool, set_start_method
 import os
+import py_compile
+import random
 import resource
-import shutil
 import signal
+import subprocess
 import sys
 from abc import ABC
-from collections import defaultdict
+from collections import (
+    defaultdict,
+    deque,
+)
 from configparser import (
     ConfigParser,
     NoOptionError,
     NoSectionError,
 )
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import (
+    dataclass,
+    field,
+)
 from datetime import (
     datetime,
     timedelta,
 )
 from difflib import unified_diff
-from io import TextIOBase
 from json import JSONDecodeError
 from math import ceil
 from os import (
@@ -37,7 +45,11 @@ from os.path import (
 )
 from pathlib import Path
 from signal import SIGTERM
-from threading import Thread
+from tempfile import TemporaryFile
+from threading import (
+    Event,
+    Thread,
+)
 from time import (
     process_time,
     sleep,
@@ -45,6 +57,7 @@ from time import (
 from typing import (
     Dict,
     List,
+    Set,
     Union,
 )
 
@@ -55,7 +68,56 @@ from rich.text import Text
 from setproctitle import setproctitle
 
 import mutmut
+from mutmut.bundling import (
+    attribute_failures,
+    load_bundle_result,
+    plan_bundles,
+    save_bundle_result,
+    split_bundle,
+)
+from mutmut.diff_targeting import (
+    find_test_files_importing,
+    git_changed_lines,
+    load_changed_lines,
+    module_name_for_path,
+    mutate_lines_for_path,
+    save_changed_lines,
+)
 from mutmut.file_mutation import mutate_file_contents
+from mutmut.infection import (
+    PROBE_SUFFIX,
+    infecting_tests,
+    take_infected,
+)
+from mutmut.line_coverage import (
+    ORIG_SUFFIX,
+    LineCollector,
+    OrigFunctions,
+    covering_tests,
+)
+from mutmut.mutant_index import (
+    IndexEntry,
+    dedent_function,
+    existing_mutant_index,
+    function_byte_ranges,
+    mutant_index,
+    read_function_copies,
+)
+from mutmut.materialize import (
+    copy_file,
+    link_file,
+    materialize_tree,
+)
+from mutmut.preload import (
+    is_preloadable,
+    preload_modules,
+    unload_denied,
+)
+from mutmut.sampling import (
+    ScoreEstimate,
+    sample_size,
+    stratified_order,
+)
 from mutmut.trampoline_templates import CLASS_NAME_SEPARATOR
 
 # Document: surviving mutants are retested when you ask mutmut to retest them, interactively in the UI or via command line
@@ -76,6 +138,8 @@ status_by_exit_code = {
     34: 'skipped',
     35: 'suspicious',
     36: 'timeout',
+    37: 'equivalent',
+    38: 'not infected',
     24: 'timeout',  # SIGXCPU
     152: 'timeout',  # SIGXCPU
     255: 'timeout',
@@ -136,10 +200,36 @@ def walk_all_files():
                 yield root, filename
 
 
+def count_lines(path):
+    with open(path, 'rb') as f:
+        return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 16), b'')) + 1
+
+
+def lines_to_mutate(path):
+    """Lines to mutate in `path`, or None for all of them. An empty set means no line of the file is targeted."""
+    config = mutmut.config
+    if config.changed_lines_by_path is not None:
+        return mutate_lines_for_path(config.changed_lines_by_path, path)
+    if config.mutate_lines is not None:
+        # a file shorter than the first targeted line has nothing to mutate: skip it without a parse
+        if count_lines(path) < min(config.mutate_lines):
+            return set()
+        return config.mutate_lines
+    return None
+
+
+def is_targeted_run():
+    return mutmut.config.changed_lines_by_path is not None or mutmut.config.mutate_lines is not None
+
+
 def walk_source_files():
     for root, filename in walk_all_files():
         if filename.endswith('.py'):
-            yield Path(root) / filename
+            path = Path(root) / filename
+            # files without a targeted line stay as copy_src_dir linked them: no parse, no .meta
+            if is_targeted_run() and not lines_to_mutate(path):
+                continue
+            yield path
 
 
 class MutmutProgrammaticFailException(Exception):
@@ -157,22 +247,59 @@ class BadTestExecutionCommandsException(Exception):
 
 
 def copy_src_dir():
+    # files about to be mutated are written by create_mutants, everything else is never rewritten and can be linked
+    rewritten = {
+        str(p)
+        for p in walk_source_files()
+        if not mutmut.config.should_ignore_for_mutation(p)
+    }
+
+    linked = []
+
+    def skip(p):
+        if str(p) in rewritten:
+            return True
+        if str(p).endswith('.py'):
+            linked.append(str(p))
+        return False
+
     for path in mutmut.config.paths_to_mutate:
         path = Path(path)  
         output_path: Path = Path('mutants') / path
         if isdir(path):
-            shutil.copytree(path, output_path, dirs_exist_ok=True)
+            materialize_tree(path, output_path, link_file, skip=skip)
         else:
             package_dir = path.parent
             output_package_dir = Path('mutants') / package_dir
             if not output_package_dir.exists():
                 # output_path.parent.mkdir(exist_ok=True, parents=True)
-                shutil.copytree(package_dir, output_package_dir, dirs_exist_ok=True)
+                materialize_tree(package_dir, output_package_dir, link_file, skip=skip)
+
+    forget_mutants(linked)
+
+
+def forget_mutants(paths):
+    """Delete the `.meta` files and index entries of `paths`, which are linked to the original now.
 
+    A previous run may have mutated them, and their mutants shouldn't show up in the results any more."""
+    for path in paths:
+        meta_path = SourceFileMutationData(path=path).meta_path
+        if meta_path.exists():
+            meta_path.unlink()
+    index = existing_mutant_index()
+    if index is not None and paths:
+        index.replace_files({path: [] for path in paths})
 
-def create_mutants(max_children: int, mutate_lines=None):
+
+def create_mutants(max_children: int):
+    paths = list(walk_source_files())
     with Pool(processes=max_children) as p:
-        p.starmap(create_file_mutants, [(path, mutate_lines) for path in walk_source_files()])
+        index_entries = p.starmap(create_file_mutants, [(path, lines_to_mutate(path)) for path in paths])
+    # a targeted run only regenerates some files: copy_src_dir already forgot the mutants of those it linked
+    mutant_index().replace_files(
+        {str(path): entries for path, entries in zip(paths, index_entries) if entries is not None},
+        complete=not is_targeted_run(),
+    )
 
 
 def create_file_mutants(path: Path, mutate_lines=None):
@@ -181,9 +308,9 @@ def create_file_mutants(path: Path, mutate_lines=None):
     makedirs(output_path.parent, exist_ok=True)
 
     if mutmut.config.should_ignore_for_mutation(path):
-        shutil.copy(path, output_path)
-    else:
-        create_mutants_for_file(path, output_path, mutate_lines)
+        link_file(path, output_path)
+        return None
+    return create_mutants_for_file(path, output_path, mutate_lines)
 
 
 def copy_also_copy_files():
@@ -194,11 +321,12 @@ def copy_also_copy_files():
         destination = Path('mutants') / path
         if not path.exists():
             continue
+        # tests may write to their own files and data, so these are copies (reflinks where possible), not links
         if path.is_file():
             destination.parent.mkdir(exist_ok=True, parents=True)
-            shutil.copy(path, destination)
+            copy_file(path, destination)
         else:
-            shutil.copytree(path, destination, dirs_exist_ok=True)
+            materialize_tree(path, destination, copy_file)
 
 
 def create_mutants_for_file(filename, output_path, mutate_lines=None):
@@ -207,39 +335,110 @@ def create_mutants_for_file(filename, output_path, mutate_lines=None):
     with open(filename) as f:
         source = f.read()
 
-    with open(output_path, 'w') as out:
-        mutant_names, hash_by_function_name = write_all_mutants_to_file(out=out, source=source, filename=filename, mutate_lines=mutate_lines)
+    # written next to the output and renamed over it: `output_path` may be a hard link to the original source
+    tmp_path = f'{output_path}.mutmut-tmp'
+    with open(tmp_path, 'w') as out:
+        mutant_names, mutation_info_by_name = write_all_mutants_to_file(out=out, source=source, filename=filename, mutate_lines=mutate_lines)
 
     # validate no syntax errors of mutants
-    with open(output_path) as f:
+    with open(tmp_path, 'rb') as f:
+        mutated_source = f.read()
         try:
-            ast.parse(f.read())
+            tree = ast.parse(mutated_source)
         except (IndentationError, SyntaxError) as e:
             print(output_path, 'has invalid syntax: ', e)
             exit(1)
+    byte_range_by_function = function_byte_ranges(tree, mutated_source)
+
+    os.utime(tmp_path, (input_stat.st_atime, input_stat.st_mtime))
+    os.replace(tmp_path, output_path)
+    precompile(output_path)
 
     source_file_mutation_data = SourceFileMutationData(path=filename)
     module_name = strip_prefix(str(filename)[:-len(filename.suffix)].replace(os.sep, '.'), prefix='src.')
 
+    def key(mutant_name):
+        return '.'.join([module_name, mutant_name]).replace('.__init__.', '.')
+
+    for info in mutation_info_by_name.values():
+        if info.get('equivalent_to') not in (None, 'original'):
+            info['equivalent_to'] = key(info['equivalent_to'])
+
+    # mutants that compile to the same bytecode as the original or as another mutant are never run
     source_file_mutation_data.exit_code_by_key = {
-         '.'.join([module_name, x]).replace('.__init__.', '.'): None
+        key(x): initial_exit_code(mutation_info_by_name.get(x, {}))
+        for x in mutant_names
+    }
+    source_file_mutation_data.mutation_info_by_key = {
+        key(x): mutation_info_by_name[x]
         for x in mutant_names
+        if x in mutation_info_by_name
     }
-    source_file_mutation_data.hash_by_function_name = hash_by_function_name
-    assert None not in hash_by_function_name
+    def hash_by_function_name(suffix):
+        return {
+            key(name[:-len(suffix)]): hashlib.sha1(mutated_source[start:end]).hexdigest()
+            for name, (start, end) in byte_range_by_function.items()
+            if name.endswith(suffix)
+        }
+
+    # the `__mutmut_orig` copies are the original functions: stats of a function are stale when its hash changes. The
+    # probe copies also name the mutants they probe, which are numbered again when other mutations come or go
+    source_file_mutation_data.hash_by_function_name = hash_by_function_name(ORIG_SUFFIX)
+    source_file_mutation_data.probe_hash_by_function_name = hash_by_function_name(PROBE_SUFFIX)
     source_file_mutation_data.save()
 
-    os.utime(output_path, (input_stat.st_atime, input_stat.st_mtime))
+    index_entries = []
+    for x in mutant_names:
+        info = mutation_info_by_name.get(x, {})
+        start_byte, end_byte = byte_range_by_function.get(x, (None, None))
+        orig_start_byte, orig_end_byte = byte_range_by_function.get(x.partition('__mutmut_')[0] + '__mutmut_orig', (None, None))
+        index_entries.append(IndexEntry(
+            name=key(x),
+            path=str(filename),
+            function=mangled_name_from_mutant_name(key(x)),
+            start_line=info.get('start_line'),
+            end_line=info.get('end_line'),
+            exit_code=source_file_mutation_data.exit_code_by_key[key(x)],
+            start_byte=start_byte,
+            end_byte=end_byte,
+            orig_start_byte=orig_start_byte,
+            orig_end_byte=orig_end_byte,
+        ))
+    return index_entries
+
+
+def precompile(path):
+    """Write the bytecode cache of a mutated file, so the children that import it don't all compile it again.
+
+    The cache is checked against the modification time and size of the file, so this must come after `os.utime`."""
+    if sys.dont_write_bytecode:
+        return
+    try:
+        py_compile.compile(str(path), doraise=True)
+    except py_compile.PyCompileError:
+        # the tests get the same error when they import the file
+        pass
+
 
+def use_pycache_prefix(pycache_prefix):
+    """Write and read bytecode caches under `pycache_prefix` instead of in `__pycache__` next to the sources, also in
+    the interpreters the tests start."""
+    pycache_prefix = os.path.abspath(pycache_prefix)
+    sys.pycache_prefix = pycache_prefix
+    os.environ['PYTHONPYCACHEPREFIX'] = pycache_prefix
 
-def write_all_mutants_to_file(*, out, source, filename, mutate_lines=None):
-    result, mutant_names, _ = mutate_file_contents(filename, source, mutate_lines)
-    out.write(result)
 
-    # TODO: function hashes are currently not used. Reimplement this when needed.
-    hash_by_function_name = {}
+def initial_exit_code(info):
+    equivalent_to = info.get('equivalent_to')
+    if equivalent_to is None:
+        return None
+    return 37 if equivalent_to == 'original' else 34
 
-    return mutant_names, hash_by_function_name
+
+def write_all_mutants_to_file(*, out, source, filename, mutate_lines=None):
+    result, mutant_names, mutation_info_by_name = mutate_file_contents(filename, source, mutate_lines, infection_probes=mutmut.config.infection_check)
+    out.write(result)
+    return mutant_names, mutation_info_by_name
 
 
 class SourceFileMutationData:
@@ -248,9 +447,12 @@ class SourceFileMutationData:
         self.path = path
         self.meta_path = Path('mutants') / (str(path) + '.meta')
         self.meta = None
-        self.key_by_pid = {}
+        # a child testing a bundle of mutants is registered once for each of them
+        self.keys_by_pid = defaultdict(list)
         self.exit_code_by_key = {}
         self.hash_by_function_name = {}
+        self.probe_hash_by_function_name = {}
+        self.mutation_info_by_key = {}
         self.start_time_by_pid = {}
         self.estimated_time_of_tests_by_pid = {}
 
@@ -263,31 +465,47 @@ class SourceFileMutationData:
 
         self.exit_code_by_key = self.meta.pop('exit_code_by_key')
         self.hash_by_function_name = self.meta.pop('hash_by_function_name')
+        # only in .meta files written with infection probes
+        self.probe_hash_by_function_name = self.meta.pop('probe_hash_by_function_name', {})
+        # .meta files written before mutation info was tracked do not have it
+        self.mutation_info_by_key = self.meta.pop('mutation_info_by_key', {})
         assert not self.meta, self.meta  # We should read all the data!
 
     def register_pid(self, *, pid, key, estimated_time_of_tests):
-        self.key_by_pid[pid] = key
+        self.keys_by_pid[pid].append(key)
         self.start_time_by_pid[pid] = datetime.now()
         self.estimated_time_of_tests_by_pid[pid] = estimated_time_of_tests
 
     def register_result(self, *, pid, exit_code):
-        assert self.key_by_pid[pid] in self.exit_code_by_key
-        self.exit_code_by_key[self.key_by_pid[pid]] = exit_code
+        """`exit_code` applies to every mutant of the child `pid`, unless it is a dict of exit codes by key."""
+        keys = self.keys_by_pid[pid]
+        for key in keys:
+            assert key in self.exit_code_by_key
+            self.exit_code_by_key[key] = exit_code[key] if isinstance(exit_code, dict) else exit_code
         # TODO: maybe rate limit this? Saving on each result can slow down mutation testing a lot if the test run is fast.
-        del self.key_by_pid[pid]
+        self.unregister_pid(pid)
+        self.save(changed_keys=keys)
+
+    def unregister_pid(self, pid):
+        del self.keys_by_pid[pid]
         del self.start_time_by_pid[pid]
-        self.save()
 
     def stop_children(self):
-        for pid in self.key_by_pid.keys():
+        for pid in list(self.keys_by_pid.keys()):
             os.kill(pid, SIGTERM)
 
-    def save(self):
+    def save(self, changed_keys=()):
+        """Write the .meta file, and the exit codes of `changed_keys` to the mutant index. `create_mutants` indexes
+        the whole file on its own."""
         with open(self.meta_path, 'w') as f:
             json.dump(dict(
                 exit_code_by_key=self.exit_code_by_key,
                 hash_by_function_name=self.hash_by_function_name,
+                probe_hash_by_function_name=self.probe_hash_by_function_name,
+                mutation_info_by_key=self.mutation_info_by_key,
             ), f, indent=4)
+        if changed_keys:
+            mutant_index().set_exit_codes({key: self.exit_code_by_key[key] for key in changed_keys})
 
 
 def unused(*_):
@@ -314,9 +532,20 @@ class TestRunner(ABC):
     def run_tests(self, *, mutant_name, tests):
         raise NotImplementedError()
 
+    def run_bundle(self, *, tests_by_mutant_name):
+        """Run the tests of several mutants at once. Returns the exit code and the names of the failed tests."""
+        raise NotImplementedError()
+
     def list_all_tests(self):
         raise NotImplementedError()
 
+    def run_infection_probes(self, *, tests):
+        raise NotImplementedError()
+
+    def preload_tests(self, *, test_files):
+        """Import the test files in this process, without running them."""
+        raise NotImplementedError()
+
 
 @contextmanager
 def change_cwd(path):
@@ -342,6 +571,12 @@ class ListAllTestsResult:
             k: {test_name for test_name in test_names if test_name in self.ids}
             for k, test_names in mutmut.tests_by_mangled_function_name.items()
         })
+        for tests_by_line in mutmut.tests_by_function_line.values():
+            for tests in tests_by_line.values():
+                tests &= self.ids
+        for tests in mutmut.infected_tests_by_key.values():
+            tests &= self.ids
+        mutmut.probed_tests &= self.ids
         count_after = sum(len(x) for x in mutmut.tests_by_mangled_function_name)
         if count_before != count_after:
             print(f'Removed {count_before - count_after} obsolete test names')
@@ -362,13 +597,25 @@ class PytestRunner(TestRunner):
         return exit_code
 
     def run_stats(self, *, tests):
+        line_collector = None
+        if mutmut.config.line_coverage:
+            orig_functions_by_filename = collect_orig_functions()
+            line_collector = LineCollector(orig_functions_by_filename)
+
         class StatsCollector:
             # noinspection PyMethodMayBeStatic
             def pytest_runtest_teardown(self, item, nextitem):
                 unused(nextitem)
+                test_name = strip_prefix(item._nodeid, prefix='mutants/')
                 for function in mutmut._stats:
-                    mutmut.tests_by_mangled_function_name[function].add(strip_prefix(item._nodeid, prefix='mutants/'))
+                    mutmut.tests_by_mangled_function_name[function].add(test_name)
                 mutmut._stats.clear()
+                if line_collector is not None:
+                    for filename, line in line_collector.take():
+                        found = orig_functions_by_filename[filename].find(line)
+                        if found is not None:
+                            function, offset = found
+                            mutmut.tests_by_function_line[function][offset].add(test_name)
 
             # noinspection PyMethodMayBeStatic
             def pytest_runtest_makereport(self, item, call):
@@ -377,12 +624,51 @@ class PytestRunner(TestRunner):
         stats_collector = StatsCollector()
 
         with change_cwd('mutants'):
-            return int(self.execute_pytest(['-x', '-q'] + list(tests), plugins=[stats_collector]))
+            if line_collector is None:
+                return int(self.execute_pytest(['-x', '-q'] + list(tests), plugins=[stats_collector]))
+            line_collector.start()
+            try:
+                return int(self.execute_pytest(['-x', '-q'] + list(tests), plugins=[stats_collector]))
+            finally:
+                line_collector.stop()
 
     def run_tests(self, *, mutant_name, tests):
         with change_cwd('mutants'):
             return int(self.execute_pytest(['-x', '-q'] + list(tests)))
 
+    def run_bundle(self, *, tests_by_mutant_name):
+        import pytest
+
+        mutant_name_by_test = {test: name for name, tests in tests_by_mutant_name.items() for test in tests}
+        failed_tests = set()
+        killed = set()
+
+        class BundleCollector:
+            # no -x, as that would stop the other mutants' tests: skip the tests of mutants that are already killed instead
+            # noinspection PyMethodMayBeStatic
+            @pytest.hookimpl(tryfirst=True)
+            def pytest_runtest_setup(self, item):
+                if mutant_name_by_test.get(strip_prefix(item.nodeid, prefix='mutants/')) in killed:
+                    pytest.skip('mutant already killed')
+
+            # noinspection PyMethodMayBeStatic
+            def pytest_runtest_logreport(self, report):
+                if report.failed:
+                    test = strip_prefix(report.nodeid, prefix='mutants/')
+                    failed_tests.add(test)
+                    if test in mutant_name_by_test:
+                        killed.add(mutant_name_by_test[test])
+
+            # noinspection PyMethodMayBeStatic
+            def pytest_collectreport(self, report):
+                if report.failed:
+                    failed_tests.add(report.nodeid)
+
+        tests = sorted(mutant_name_by_test, key=lambda test_name: mutmut.duration_by_test.get(test_name, 0))
+        with change_cwd('mutants'):
+            exit_code = int(self.execute_pytest(['-q'] + tests, plugins=[BundleCollector()]))
+        return exit_code, failed_tests
+
     def run_forced_fail(self):
         with change_cwd('mutants'):
             return int(self.execute_pytest(['-x', '-q']))
@@ -400,6 +686,23 @@ class PytestRunner(TestRunner):
                 raise CollectTestsFailedException()
 
         return ListAllTestsResult(ids=collector.nodeids)
+
+    def run_infection_probes(self, *, tests):
+        class InfectionCollector:
+            # noinspection PyMethodMayBeStatic
+            def pytest_runtest_teardown(self, item, nextitem):
+                unused(nextitem)
+                test_name = strip_prefix(item._nodeid, prefix='mutants/')
+                for key in take_infected():
+                    mutmut.infected_tests_by_key[key].add(test_name)
+                mutmut.probed_tests.add(test_name)
+
+        with change_cwd('mutants'):
+            return int(self.execute_pytest(['-q'] + list(tests), plugins=[InfectionCollector()]))
+
+    def preload_tests(self, *, test_files):
+        with change_cwd('mutants'):
+            return int(self.execute_pytest(['-q', '--collect-only'] + list(test_files)))
     
     def collect_failed_tests(self, extra_args=None):
         import pytest
@@ -438,6 +741,7 @@ def orig_function_and_class_names_from_key(mutant_name):
 
 
 spinner = itertools.cycle('⠋⠙⠹⠸⠼⠴⠦⠧⠇⠏')
+SPINNER_INTERVAL = 0.1
 
 
 def status_printer():
@@ -451,14 +755,15 @@ def status_printer():
     last_update = [datetime(1900, 1, 1)]
     update_threshold = timedelta(seconds=0.1)
 
-    def p(s, *, force_output=False):
+    def p(s, *, force_output=False, file=None):
         if not force_output and (datetime.now() - last_update[0]) < update_threshold:
             return
         s = next(spinner) + ' ' + s
         len_s = len(s)
         output = '\r' + s + (' ' * max(last_len[0] - len_s, 0))
-        sys.__stdout__.write(output)
-        sys.__stdout__.flush()
+        file = file or sys.__stdout__
+        file.write(output)
+        file.flush()
         last_len[0] = len_s
     return p
 
@@ -478,6 +783,8 @@ class Stat:
     timeout: int
     check_was_interrupted_by_user: int
     segfault: int
+    equivalent: int
+    not_infected: int
 
 
 def collect_stat(m: SourceFileMutationData):
@@ -507,13 +814,21 @@ def calculate_summary_stats(source_file_mutation_data_by_path):
         timeout=sum(x.timeout for x in stats),
         check_was_interrupted_by_user=sum(x.check_was_interrupted_by_user for x in stats),
         segfault=sum(x.segfault for x in stats),
+        equivalent=sum(x.equivalent for x in stats),
+        not_infected=sum(x.not_infected for x in stats),
     )
 
-def print_stats(source_file_mutation_data_by_path, force_output=False):
+def print_stats(source_file_mutation_data_by_path, force_output=False, estimate=None):
     s = calculate_summary_stats(source_file_mutation_data_by_path)
 
     print('    summary:')
     print(f'    {s.total} mutants, {s.killed} killed, {s.survived} survived, {s.no_tests} no tests')
+    if s.equivalent or s.skipped:
+        print(f'    {s.equivalent} equivalent and {s.skipped} skipped (duplicate) mutants were not run')
+    if s.not_infected:
+        print(f'    {s.not_infected} mutants were not run, as none of their tests makes them compute another value')
+    if estimate is not None:
+        print(f'    estimated mutation score: {estimate.describe()}')
 
     if mutmut.config.debug:
         for x in source_file_mutation_data_by_path.values():
@@ -539,39 +854,78 @@ def run_forced_fail_test(runner):
 
 
 class CatchOutput:
-    def __init__(self, callback=lambda s: None, spinner_title=None):
-        self.strings = []
-        self.spinner_title = spinner_title or ''
+    """Redirect file descriptors 1 and 2 while running tests, so output written by C extensions and subprocesses is
+    caught too, without a Python call for every write.
 
-        class StdOutRedirect(TextIOBase):
-            def __init__(self, catcher):
-                self.catcher = catcher
+    The output goes to a temporary file on disk, where `dump_output` can show it if something went wrong. With
+    `discard`, it goes to /dev/null. The spinner is updated by a timer thread. With `debug`, nothing is redirected."""
 
-            def write(self, s):
-                callback(s)
-                if spinner_title:
-                    print_status(spinner_title)
-                self.catcher.strings.append(s)
-                return len(s)
-        self.redirect = StdOutRedirect(self)
+    def __init__(self, spinner_title=None, discard=False):
+        self.spinner_title = spinner_title or ''
+        self.discard = discard
+        self.output = None
+        self.saved_fds = None
+        self.saved_streams = None
+        self.stream = None
+        self.terminal = None
+        self.spinner_stopped = Event()
+        self.spinner_thread = None
 
-    # noinspection PyMethodMayBeStatic
     def stop(self):
-        sys.stdout = sys.__stdout__
-        sys.stderr = sys.__stderr__
+        if self.spinner_thread is not None:
+            self.spinner_stopped.set()
+            self.spinner_thread.join()
+            self.spinner_thread = None
+        if self.saved_fds is None:
+            return
+        # the streams don't own their fds: closing them flushes them, and leaves the fds open
+        self.stream.close()
+        self.stream = None
+        if self.terminal is not None:
+            self.terminal.close()
+            self.terminal = None
+        sys.stdout, sys.stderr = self.saved_streams
+        for fd, saved_fd in zip((1, 2), self.saved_fds):
+            os.dup2(saved_fd, fd)
+            os.close(saved_fd)
+        self.saved_fds = None
 
     def start(self):
         if self.spinner_title:
             print_status(self.spinner_title)
-        sys.stdout = self.redirect
-        sys.stderr = self.redirect
         if mutmut.config.debug:
-            self.stop()
+            return
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        self.output = open(os.devnull, 'wb') if self.discard else TemporaryFile()
+        self.saved_fds = os.dup(1), os.dup(2)
+        os.dup2(self.output.fileno(), 1)
+        os.dup2(self.output.fileno(), 2)
+        # one line buffered stream for both, so Python output stays in order with what is written to the fds directly
+        self.saved_streams = sys.stdout, sys.stderr
+        self.stream = open(1, 'w', buffering=1, encoding='utf-8', errors='replace', closefd=False)
+        sys.stdout = sys.stderr = self.stream
+
+        if self.spinner_title:
+            self.terminal = open(self.saved_fds[0], 'w', encoding='utf-8', closefd=False)
+            self.spinner_stopped.clear()
+            self.spinner_thread = Thread(target=self.spin, daemon=True)
+            self.spinner_thread.start()
+
+    def spin(self):
+        terminal = self.terminal
+        while not self.spinner_stopped.wait(SPINNER_INTERVAL):
+            print_status(self.spinner_title, file=terminal)
 
     def dump_output(self):
         self.stop()
-        for line in self.strings:
-            print(line, end='')
+        if self.output is None or self.discard:
+            return
+        self.output.seek(0)
+        while chunk := self.output.read(64 * 1024):
+            sys.stdout.write(chunk.decode(errors='replace'))
+        sys.stdout.flush()
 
     def __enter__(self):
         self.start()
@@ -579,6 +933,9 @@ class CatchOutput:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.stop()
+        if self.output is not None:
+            self.output.close()
+            self.output = None
         if self.spinner_title:
             print()
 
@@ -590,6 +947,26 @@ class Config:
     max_stack_depth: int
     debug: bool
     paths_to_mutate: List[Path]
+    # source path -> lines to mutate in it, for runs that only mutate what a change touched
+    changed_lines_by_path: Union[Dict[str, Set[int]], None] = None
+    # lines to mutate in every file (--lines)
+    mutate_lines: Union[Set[int], None] = None
+    # collect which lines each test executes, and only run the tests that execute a mutant's line
+    line_coverage: bool = False
+    # run the tests once with probes, and only run the tests in which a mutant computes another value
+    infection_check: bool = False
+    # how many mutants without shared tests may be tested in one test run
+    max_bundle_size: int = 1
+    # only test a random sample of the mutants (--sample), and stop once the score is known precisely enough (--ci-width)
+    sample: Union[str, None] = None
+    sample_seed: Union[int, None] = None
+    ci_width: Union[float, None] = None
+    # where to write the bytecode caches, instead of `__pycache__` directories next to the sources
+    pycache_prefix: Union[str, None] = None
+    # import the mutated modules and their tests in the parent before forking the children, see `mutmut.preload`
+    preload: bool = False
+    preload_allowlist: List[str] = field(default_factory=list)
+    preload_denylist: List[str] = field(default_factory=list)
 
     def should_ignore_for_mutation(self, path):
         if not str(path).endswith('.py'):
@@ -672,6 +1049,13 @@ def load_config(test_file: str = None):
         also_copy= also_copy,
         max_stack_depth=s('max_stack_depth', -1),
         debug=s('debug', False),
+        max_bundle_size=s('max_bundle_size', 1),
+        line_coverage=s('line_coverage', False),
+        infection_check=s('infection_check', False),
+        pycache_prefix=s('pycache_prefix', None),
+        preload=s('preload', False),
+        preload_allowlist=s('preload_allowlist', []),
+        preload_denylist=s('preload_denylist', []),
         paths_to_mutate=[
             Path(y)
             for y in s('paths_to_mutate', [])
@@ -711,12 +1095,23 @@ def run_stats_collection(runner, tests=None):
     save_stats()
 
 
+def tests_for_changed_files():
+    """Test files that import a changed module, or None to collect stats from all tests."""
+    if mutmut.config.changed_lines_by_path is None:
+        return None
+    modules = {module_name_for_path(path) for path in mutmut.config.changed_lines_by_path if path.endswith('.py')}
+    test_files = find_test_files_importing(modules, [p for p in mutmut.config.also_copy if p.exists()])
+    # no test imports the changed code directly: it may still be reached indirectly, so stay with all tests
+    return test_files or None
+
+
 def collect_or_load_stats(runner):
     did_load = load_stats()
+    test_files = tests_for_changed_files()
 
     if not did_load:
-        # Run full stats
-        run_stats_collection(runner)
+        # Run full stats, or stats for the tests of the changed files
+        run_stats_collection(runner, tests=test_files)
     else:
         # Run incremental stats
         with CatchOutput(spinner_title='Listing all tests') as output_catcher:
@@ -731,10 +1126,62 @@ def collect_or_load_stats(runner):
         all_tests_result.clear_out_obsolete_test_names()
 
         new_tests = all_tests_result.new_tests()
+        if test_files is not None:
+            new_tests = {t for t in new_tests if t.partition('::')[0] in test_files}
+
+        changed_functions = drop_stale_line_stats(function_hashes()) if mutmut.config.line_coverage else set()
+        tests_of_changed_functions = set().union(*(mutmut.tests_by_mangled_function_name.get(f, set()) for f in changed_functions))
 
         if new_tests:
             print(f'Found {len(new_tests)} new tests, rerunning stats collection')
-            run_stats_collection(runner, tests=new_tests)
+        if tests_of_changed_functions - new_tests:
+            print(f'Found {len(changed_functions)} changed functions, collecting the lines of their tests again')
+        if new_tests or tests_of_changed_functions:
+            run_stats_collection(runner, tests=new_tests | tests_of_changed_functions)
+
+    if mutmut.config.infection_check:
+        collect_infections(runner)
+
+
+def preload(runner, mutants):
+    """Import the mutated modules and the test files of the `mutants` before forking, see `mutmut.preload`."""
+    allowlist, denylist = mutmut.config.preload_allowlist, mutmut.config.preload_denylist
+    module_names = sorted({module_name_for_path(m.path) for m, mutant_name, result in mutants})
+    mangled_names = {mangled_name_from_mutant_name(mutant_name.replace('__init__.', '')) for m, mutant_name, result in mutants}
+    test_files = sorted({
+        test.partition('::')[0]
+        for mangled_name in mangled_names
+        for test in mutmut.tests_by_mangled_function_name.get(mangled_name, ())
+    })
+    test_files = [f for f in test_files if is_preloadable(module_name_for_path(f), allowlist, denylist)]
+
+    os.environ['MUTANT_UNDER_TEST'] = ''
+    with CatchOutput(spinner_title='Preloading modules'):
+        errors = preload_modules(module_names, allowlist, denylist)
+        if test_files:
+            runner.preload_tests(test_files=test_files)
+        unloaded = unload_denied(denylist)
+    print('    done')
+
+    if mutmut.config.debug:
+        for module_name, error in errors.items():
+            print(f'    failed to preload {module_name}: {error!r}')
+        for module_name in unloaded:
+            print(f'    unloaded {module_name}')
+
+
+def collect_infections(runner):
+    """Run the tests of mutated functions that didn't run with the infection probes yet, see `mutmut.infection`."""
+    changed_functions = drop_stale_infections(function_hashes(probes=True))
+    tests = set().union(*mutmut.tests_by_mangled_function_name.values()) - mutmut.probed_tests
+    if tests:
+        os.environ['MUTANT_UNDER_TEST'] = 'probe'
+        with CatchOutput(spinner_title='Running infection probes'):
+            runner.run_infection_probes(tests=sorted(tests))
+        print('    done')
+
+    if tests or changed_functions:
+        save_stats()
 
 
 def load_stats():
@@ -746,6 +1193,17 @@ def load_stats():
                 mutmut.tests_by_mangled_function_name[k] |= set(v)
             mutmut.duration_by_test = data.pop('duration_by_test')
             mutmut.stats_time = data.pop('stats_time')
+            # only in stats collected with line coverage
+            for k, v in data.pop('tests_by_function_line', {}).items():
+                for offset, tests in v.items():
+                    mutmut.tests_by_function_line[k][int(offset)] |= set(tests)
+            mutmut.executable_lines_by_function.update({k: set(v) for k, v in data.pop('executable_lines_by_function', {}).items()})
+            mutmut.line_stats_hash_by_function.update(data.pop('line_stats_hash_by_function', {}))
+            # only in stats collected with infection probes
+            for k, v in data.pop('infected_tests_by_key', {}).items():
+                mutmut.infected_tests_by_key[k] |= set(v)
+            mutmut.probed_tests |= set(data.pop('probed_tests', []))
+            mutmut.probe_hash_by_function.update(data.pop('probe_hash_by_function', {}))
             assert not data, data
             did_load = True
     except (FileNotFoundError, JSONDecodeError):
@@ -759,6 +1217,15 @@ def save_stats():
             tests_by_mangled_function_name={k: list(v) for k, v in mutmut.tests_by_mangled_function_name.items()},
             duration_by_test=mutmut.duration_by_test,
             stats_time=mutmut.stats_time,
+            tests_by_function_line={
+                k: {offset: list(tests) for offset, tests in v.items()}
+                for k, v in mutmut.tests_by_function_line.items()
+            },
+            executable_lines_by_function={k: sorted(v) for k, v in mutmut.executable_lines_by_function.items()},
+            line_stats_hash_by_function=mutmut.line_stats_hash_by_function,
+            infected_tests_by_key={k: sorted(v) for k, v in mutmut.infected_tests_by_key.items()},
+            probed_tests=sorted(mutmut.probed_tests),
+            probe_hash_by_function=mutmut.probe_hash_by_function,
         ), f, indent=4)
 
 
@@ -790,6 +1257,87 @@ def collect_source_file_mutation_data(*, mutant_names):
     return mutants, source_file_mutation_data_by_path
 
 
+def function_hashes(probes=False):
+    """Mangled function name -> hash of its source, of every mutated function. With `probes`, of its probe copy."""
+    result = {}
+    for path in walk_source_files():
+        m = SourceFileMutationData(path=path)
+        if mutmut.config.should_ignore_for_mutation(path) or not m.meta_path.exists():
+            continue
+        m.load()
+        result.update(m.probe_hash_by_function_name if probes else m.hash_by_function_name)
+    return result
+
+
+def drop_stale_line_stats(hash_by_function):
+    """Forget the line data of the functions in `hash_by_function` that changed since their lines were collected:
+    offsets from the `def` line don't fit another version of the function. Their mutants get all tests of the
+    function until the lines are collected again. Returns the names of these functions."""
+    changed = {
+        function
+        for function, function_hash in hash_by_function.items()
+        if function in mutmut.executable_lines_by_function or function in mutmut.tests_by_function_line
+        if mutmut.line_stats_hash_by_function.get(function) != function_hash
+    }
+    for function in changed:
+        mutmut.tests_by_function_line.pop(function, None)
+        mutmut.executable_lines_by_function.pop(function, None)
+        mutmut.line_stats_hash_by_function.pop(function, None)
+    return changed
+
+
+def drop_stale_infections(probe_hash_by_function):
+    """Forget what the probes recorded for the functions in `probe_hash_by_function` whose probe copy changed since
+    their tests ran with it: the infections are by mutant name, and the names may now be those of other mutations.
+    Their tests run with the probes again. Returns the names of these functions."""
+    changed = {
+        function
+        for function, probe_hash in probe_hash_by_function.items()
+        if mutmut.probe_hash_by_function.get(function) != probe_hash
+    }
+    for key in list(mutmut.infected_tests_by_key):
+        if mangled_name_from_mutant_name(key) in changed:
+            del mutmut.infected_tests_by_key[key]
+    for function in changed:
+        mutmut.probed_tests -= mutmut.tests_by_mangled_function_name.get(function, set())
+        mutmut.probe_hash_by_function[function] = probe_hash_by_function[function]
+    return changed
+
+
+def collect_orig_functions():
+    """`OrigFunctions` of every mutated file, by the absolute path its code is imported from."""
+    result = {}
+    for path in walk_source_files():
+        m = SourceFileMutationData(path=path)
+        if mutmut.config.should_ignore_for_mutation(path) or not m.meta_path.exists():
+            continue
+        m.load()
+        orig_functions = OrigFunctions(str(Path('mutants') / path), str(path))
+        mutmut.executable_lines_by_function.update(orig_functions.executable_lines_by_function)
+        mutmut.line_stats_hash_by_function.update(m.hash_by_function_name)
+        result[str((Path('mutants') / path).absolute())] = orig_functions
+    return result
+
+
+def mutant_tests(m, mutant_name, infecting_only=True):
+    """Tests to run against a mutant: those that call its function, or with line coverage only those of them that
+    execute one of its lines. With the infection check, only those in which the mutant computes another value."""
+    function = mangled_name_from_mutant_name(mutant_name)
+    tests = set(mutmut.tests_by_mangled_function_name.get(function, ()))
+    info = m.mutation_info_by_key.get(mutant_name, {})
+    if mutmut.config.line_coverage and function in mutmut.executable_lines_by_function:
+        tests_on_lines = covering_tests(
+            info,
+            mutmut.tests_by_function_line.get(function, {}),
+            mutmut.executable_lines_by_function[function],
+        )
+        if tests_on_lines is not None:
+            tests &= tests_on_lines
+    if mutmut.config.infection_check and infecting_only:
+        tests = infecting_tests(info, tests, mutmut.infected_tests_by_key.get(mutant_name, set()), mutmut.probed_tests)
+    return tests
+
+
 def estimated_worst_case_time(mutant_name):
     tests = mutmut.tests_by_mangled_function_name.get(mangled_name_from_mutant_name(mutant_name), set())
     return sum(mutmut.duration_by_test[t] for t in tests)
@@ -844,9 +1392,9 @@ def timeout_checker(mutants):
 
             now = datetime.now()
             for m, mutant_name, result in mutants:
-                for pid, start_time in m.start_time_by_pid.items():
+                for pid, start_time in list(m.start_time_by_pid.items()):
                     run_time = now - start_time
-                    if run_time.total_seconds() > (m.estimated_time_of_tests_by_mutant[mutant_name] + 1) * 4:
+                    if run_time.total_seconds() > (m.estimated_time_of_tests_by_pid[pid] + 1) * 4:
                         try:
                             os.kill(pid, signal.SIGXCPU)
                         except ProcessLookupError:
@@ -857,20 +1405,50 @@ def timeout_checker(mutants):
 @cli.command()
 @click.option('--max-children', type=int)
 @click.option('--lines', type=str, default=None, help="Comma-separated line numbers to mutate (e.g. 10,12,15)")
+@click.option('--changed-lines-json', type=click.Path(exists=True, dir_okay=False), default=None, help='JSON file mapping source paths to the line numbers to mutate in them (e.g. {"src/foo.py": [10, 12]})')
+@click.option('--diff-base', type=str, default=None, help="Only mutate the lines changed since this git revision (working tree included), or in a range like HEAD~1..HEAD")
+@click.option('--sample', type=str, default=None, help="Only test a random sample of the mutants, stratified by file and operator: a count (200), fraction (0.1) or percentage (10%)")
+@click.option('--seed', type=int, default=None, help="Random seed for --sample, to repeat a sampled run")
+@click.option('--ci-width', type=float, default=None, help="Stop once the 95% confidence interval of the sampled mutation score is narrower than this (e.g. 0.05)")
 @click.argument('mutant_names', required=False, nargs=-1)
 @click.option('--test-file', type=str, default=None, help="Test file to copy instead of all test files")
-def run(mutant_names, *, max_children, lines: str, test_file: str):
+def run(mutant_names, *, max_children, lines: str, changed_lines_json: str, diff_base: str, sample: str, seed: int, ci_width: float, test_file: str):
     # used to copy the global mutmut.config to subprocesses
     set_start_method('fork')
 
+    if len([x for x in (lines, changed_lines_json, diff_base) if x]) > 1:
+        raise click.UsageError('--lines, --changed-lines-json and --diff-base cannot be used together')
+
     if lines:
         mutate_lines = set(int (x) for x in lines.split(',') if x.strip())
     else:
         mutate_lines = None
 
+    if changed_lines_json:
+        changed_lines_by_path = load_changed_lines(changed_lines_json)
+    elif diff_base:
+        try:
+            changed_lines_by_path = git_changed_lines(diff_base)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise click.ClickException(f'Could not diff against {diff_base}: {getattr(e, "stderr", None) or e}')
+        print(f'{len(changed_lines_by_path)} file(s) changed since {diff_base}')
+    else:
+        changed_lines_by_path = None
+
+    if sample is not None:
+        try:
+            sample_size(sample, 1)
+        except ValueError:
+            raise click.BadParameter(f'{sample!r} is not a count, fraction or percentage', param_hint='--sample')
+
     assert isinstance(mutant_names, (tuple, list)), mutant_names
     mutmut.config = load_config(test_file=test_file)
-    _run(mutant_names, max_children, mutate_lines)
+    mutmut.config.changed_lines_by_path = changed_lines_by_path
+    mutmut.config.mutate_lines = mutate_lines
+    mutmut.config.sample = sample
+    mutmut.config.sample_seed = seed
+    mutmut.config.ci_width = ci_width
+    _run(mutant_names, max_children)
 
 def get_function_source_from_file(filepath, func_name):
     import ast
@@ -883,17 +1461,14 @@ def get_function_source_from_file(filepath, func_name):
             return ast.get_source_segment(source, node)
     return None
 
-def save_survived_mutants_info(source_file_mutation_data_by_path, mutants_descs, output_path="mutants/survived_mutants.json"):
+def save_survived_mutants_info(source_file_mutation_data_by_path, output_path="mutants/survived_mutants.json"):
     survived_info = []
     for path, m in source_file_mutation_data_by_path.items():
-
-        mutant_name_to_desc = mutants_descs.get(str(path), {})
-
         for mutant_name, exit_code in m.exit_code_by_key.items():
             if exit_code == 0:  # survived
 
                 test_infos = []
-                for test in mutmut.tests_by_mangled_function_name.get(mangled_name_from_mutant_name(mutant_name), []):
+                for test in sorted(mutant_tests(m, mutant_name)):
                     test_file, _, test_func = test.partition("::")
                     test_func = test_func.replace("()", "")
                     test_code = get_function_source_from_file(test_file, test_func) if test_func else None
@@ -902,12 +1477,18 @@ def save_survived_mutants_info(source_file_mutation_data_by_path, mutants_descs,
                         "test_code": test_code
                     })
 
-                short_mutant_name = mutant_name.split('.')[-1]
-                mutation_desc = mutant_name_to_desc.get(mutant_name) or mutant_name_to_desc.get(short_mutant_name, "")
+                info = m.mutation_info_by_key.get(mutant_name, {})
                 survived_info.append({
                     "mutant_name": mutant_name,
                     "source_file": str(path),
-                    "mutation_desc": mutation_desc,
+                    "mutation_desc": info.get("mutation_desc", ""),
+                    "operator": info.get("operator", ""),
+                    "start_line": info.get("start_line"),
+                    "start_column": info.get("start_column"),
+                    "end_line": info.get("end_line"),
+                    "end_column": info.get("end_column"),
+                    "original_snippet": info.get("original_snippet", ""),
+                    "mutated_snippet": info.get("mutated_snippet", ""),
                     "tests": test_infos,
                 })
     with open(output_path, "w") as f:
@@ -926,8 +1507,24 @@ def build_pytest_k_option(failed_tests):
     return ["-k", k_expr]
 
 
+def sample_mutants(pending):
+    """A random sample of `pending` (as (source file mutation data, mutant name) pairs), in random order, stratified by
+    source file and mutation operator. Every prefix of it is itself about a stratified sample."""
+    seed = mutmut.config.sample_seed
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    ordered = stratified_order(
+        pending,
+        lambda x: (str(x[0].path), x[0].mutation_info_by_key.get(x[1], {}).get('operator', '')),
+        random.Random(seed),
+    )
+    size = sample_size(mutmut.config.sample, len(ordered)) if mutmut.config.sample and ordered else len(ordered)
+    print(f'Sampling {size} of {len(ordered)} mutants (--seed {seed})')
+    return ordered[:size]
+
+
 # separate function, so we can call it directly from the tests
-def _run(mutant_names: Union[tuple, list], max_children: Union[None, int], mutate_lines=None):
+def _run(mutant_names: Union[tuple, list], max_children: Union[None, int]):
     # TODO: run no-ops once in a while to detect if we get false negatives
     # TODO: we should be able to get information on which tests killed mutants, which means we can get a list of tests and how many mutants each test kills. Those that kill zero mutants are redundant!
     os.environ['MUTANT_UNDER_TEST'] = 'mutant_generation'
@@ -936,11 +1533,17 @@ def _run(mutant_names: Union[tuple, list], max_children: Union[None, int], mutat
     if max_children is None:
         max_children = os.cpu_count() or 4
 
+    if mutmut.config.pycache_prefix:
+        use_pycache_prefix(mutmut.config.pycache_prefix)
+
     start = datetime.now()
     makedirs(Path('mutants'), exist_ok=True)
+    if mutmut.config.changed_lines_by_path is not None:
+        # for tools that report on this run, so they don't have to parse the diff again
+        save_changed_lines(mutmut.config.changed_lines_by_path, Path('mutants') / 'changed_lines.json')
     with CatchOutput(spinner_title='Generating mutants'):
         copy_src_dir()
-        create_mutants(max_children, mutate_lines) # 
+        create_mutants(max_children)
         copy_also_copy_files()
 
     time = datetime.now() - start
@@ -993,20 +1596,50 @@ def _run(mutant_names: Union[tuple, list], max_children: Union[None, int], mutat
 
     runner.prepare_main_test_run()
 
+    source_file_mutation_data_by_key: Dict[str, SourceFileMutationData] = {}
+    tests_by_key: Dict[str, Set[str]] = {}
+    # all tests that call the function of each mutant, which bundles are planned on
+    function_tests_by_key: Dict[str, Set[str]] = {}
+    bundle_by_pid: Dict[int, List[str]] = {}
+    bundles = deque()
+
     def read_one_child_exit_status():
+        """Register the results of one finished child. Returns how many mutants got a result."""
         pid, wait_status = os.wait()
         exit_code = os.waitstatus_to_exitcode(wait_status)
         if mutmut.config.debug:
             print('    worker exit code', exit_code)
-        source_file_mutation_data_by_pid[pid].register_result(pid=pid, exit_code=exit_code)
+        bundle = bundle_by_pid.pop(pid)
+        ms = list(dict.fromkeys(source_file_mutation_data_by_key[key] for key in bundle))
+        if len(bundle) > 1:
+            exit_code_by_key = load_bundle_result(pid)
+            if exit_code != 0 or exit_code_by_key is None:
+                # a timeout, crash or failure outside the bundle's tests: retry in smaller bundles to find out who caused it
+                if mutmut.config.debug:
+                    print('    splitting bundle', ','.join(bundle))
+                for m in ms:
+                    m.unregister_pid(pid)
+                bundles.extend(split_bundle(bundle))
+                return 0
+            exit_code = exit_code_by_key
+        for m in ms:
+            m.register_result(pid=pid, exit_code=exit_code)
+        return len(bundle)
 
-    source_file_mutation_data_by_pid: Dict[int, SourceFileMutationData] = {}  # many pids map to one MutationData
     running_children = 0
     count_tried = 0
+    estimate = None
+
+    def sampled_status(key):
+        exit_code = source_file_mutation_data_by_key[key].exit_code_by_key[key]
+        return None if exit_code is None else status_by_exit_code[exit_code]
 
     # Run estimated fast mutants first, calculated as the estimated time for a surviving mutant.
     mutants = sorted(mutants, key=lambda x: estimated_worst_case_time(x[1]))
 
+    if mutmut.config.preload and mutants:
+        preload(runner, mutants)
+
     gc.freeze()
 
     start = datetime.now()
@@ -1016,97 +1649,113 @@ def _run(mutant_names: Union[tuple, list], max_children: Union[None, int], mutat
         # Calculate times of tests
         for m, mutant_name, result in mutants:
             mutant_name = mutant_name.replace('__init__.', '')
-            tests = mutmut.tests_by_mangled_function_name.get(mangled_name_from_mutant_name(mutant_name), [])
+            tests = mutant_tests(m, mutant_name)
             estimated_time_of_tests = sum(mutmut.duration_by_test[test_name] for test_name in tests)
             m.estimated_time_of_tests_by_mutant[mutant_name] = estimated_time_of_tests
 
         Thread(target=timeout_checker(mutants), daemon=True).start()
 
-        # Now do mutation
-        for m, mutant_name, result in mutants:
-
-            mutant_name = mutant_name.replace('__init__.', '')
-
+        pending = [
+            (m, mutant_name.replace('__init__.', ''))
+            for m, mutant_name, result in mutants
             # Rerun mutant if it's explicitly mentioned, but otherwise let the result stand
-            if not mutant_names and result is not None:
-                continue
+            if mutant_names or result is None
+        ]
+        if mutmut.config.sample is not None or mutmut.config.ci_width is not None:
+            pending = sample_mutants(pending)
+            estimate = ScoreEstimate([mutant_name for m, mutant_name in pending])
+
+        for m, mutant_name in pending:
+            source_file_mutation_data_by_key[mutant_name] = m
 
-            tests = mutmut.tests_by_mangled_function_name.get(mangled_name_from_mutant_name(mutant_name), [])
+            tests = mutant_tests(m, mutant_name)
 
             # print(tests)
             if not tests:
-                m.exit_code_by_key[mutant_name] = 33
-                m.save()
+                # tests that reach the mutant but never see it compute another value can't kill it
+                m.exit_code_by_key[mutant_name] = 38 if mutant_tests(m, mutant_name, infecting_only=False) else 33
+                m.save(changed_keys=[mutant_name])
                 continue
 
+            tests_by_key[mutant_name] = set(tests)
+            function_tests_by_key[mutant_name] = set(mutmut.tests_by_mangled_function_name[mangled_name_from_mutant_name(mutant_name)])
+
+        bundles.extend(plan_bundles(function_tests_by_key, mutmut.config.max_bundle_size))
+
+        # Now do mutation
+        while bundles or running_children:
+            if estimate is not None:
+                estimate.advance(sampled_status)
+                if bundles and estimate.is_precise_enough(mutmut.config.ci_width):
+                    print(f'\nStopping early, the mutation score is known precisely enough: {estimate.describe()}')
+                    bundles.clear()
+                    continue
+
+            if not bundles or running_children >= max_children:
+                try:
+                    count_tried += read_one_child_exit_status()
+                except ChildProcessError:
+                    # no child left to wait for: go on with the bundles still queued
+                    running_children = 0
+                    continue
+                running_children -= 1
+                continue
+
+            bundle = bundles.popleft()
+            estimated_time_of_tests = sum(source_file_mutation_data_by_key[key].estimated_time_of_tests_by_mutant[key] for key in bundle)
+
             pid = os.fork()
             if not pid:
                 # In the child
-                os.environ['MUTANT_UNDER_TEST'] = mutant_name
-                setproctitle(f'mutmut: {mutant_name}')
-
-                # Run fast tests first
-                tests = sorted(tests, key=lambda test_name: mutmut.duration_by_test[test_name])
-                if not tests:
-                    os._exit(33)
+                os.environ['MUTANT_UNDER_TEST'] = ','.join(bundle)
+                setproctitle(f'mutmut: {",".join(bundle)}')
 
-                estimated_time_of_tests = m.estimated_time_of_tests_by_mutant[mutant_name]
                 cpu_time_limit = ceil((estimated_time_of_tests + 1) * 2 + process_time()) * 10
                 resource.setrlimit(resource.RLIMIT_CPU, (cpu_time_limit, cpu_time_limit))
 
-                with CatchOutput():
-                    result = runner.run_tests(mutant_name=mutant_name, tests=tests)
-
-                if result != 0:
-                    # TODO: write failure information to stdout?
-                    pass
-                os._exit(result)
+                if len(bundle) == 1:
+                    # Run fast tests first
+                    tests = sorted(tests_by_key[bundle[0]], key=lambda test_name: mutmut.duration_by_test[test_name])
+                    with CatchOutput(discard=True):
+                        result = runner.run_tests(mutant_name=bundle[0], tests=tests)
+
+                    if result != 0:
+                        # TODO: write failure information to stdout?
+                        pass
+                    os._exit(result)
+
+                bundle_tests = {key: tests_by_key[key] for key in bundle}
+                with CatchOutput(discard=True):
+                    result, failed_tests = runner.run_bundle(tests_by_mutant_name=bundle_tests)
+                save_bundle_result(os.getpid(), attribute_failures(bundle_tests, failed_tests, result))
+                os._exit(0)
             else:
                 # in the parent
-                source_file_mutation_data_by_pid[pid] = m
-                m.register_pid(pid=pid, key=mutant_name, estimated_time_of_tests=estimated_time_of_tests)
+                bundle_by_pid[pid] = bundle
+                for key in bundle:
+                    source_file_mutation_data_by_key[key].register_pid(pid=pid, key=key, estimated_time_of_tests=estimated_time_of_tests)
                 running_children += 1
-
-            if running_children >= max_children:
-                read_one_child_exit_status()
-                count_tried += 1
-                running_children -= 1
-
-        try:
-            while running_children:
-                read_one_child_exit_status()
-                count_tried += 1
-                running_children -= 1
-        except ChildProcessError:
-            pass
     except KeyboardInterrupt:
         print('Stopping...')
         stop_all_children(mutants)
 
     t = datetime.now() - start
 
-    print_stats(source_file_mutation_data_by_path, force_output=True)
+    if estimate is not None:
+        estimate.advance(sampled_status)
+    print_stats(source_file_mutation_data_by_path, force_output=True, estimate=estimate)
     print()
     print(f'{count_tried / t.total_seconds():.2f} mutations/second')
 
-        
-    mutants_descs = {}
-    for path in walk_source_files():
-        if mutmut.config.should_ignore_for_mutation(path):
-            continue
-        with open(path) as f:
-            code = f.read()
-        _, _, mutant_name_to_desc = mutate_file_contents(str(path), code)
-        mutants_descs[str(path)] = mutant_name_to_desc
 
-    save_survived_mutants_info(source_file_mutation_data_by_path, mutants_descs)
+    save_survived_mutants_info(source_file_mutation_data_by_path)
 
     
     total_tests_run = 0
     all_tests = set()
     for path, m in source_file_mutation_data_by_path.items():
         for mutant_name in m.exit_code_by_key:
-            tests = mutmut.tests_by_mangled_function_name.get(mangled_name_from_mutant_name(mutant_name), set())
+            tests = mutant_tests(m, mutant_name)
             total_tests_run += len(tests)
             all_tests.update(tests)
 
@@ -1128,6 +1777,16 @@ def tests_for_mutant_names(mutant_names):
 @click.option('--all', default=False)
 def results(all):
     ensure_config_loaded()
+    index = existing_mutant_index()
+    entries = list(index.entries()) if index is not None else []
+    if entries:
+        for entry in entries:
+            status = status_by_exit_code[entry.exit_code]
+            if status == 'killed' and not all:
+                continue
+            print(f'    {entry.name}: {status}')
+        return
+
     for path in walk_source_files():
         if not str(path).endswith('.py'):
             continue
@@ -1175,6 +1834,15 @@ def read_mutant_function(module: cst.Module, mutant_name: str):
 
 
 def find_mutant(mutant_name):
+    """The `SourceFileMutationData` of the file the mutant is in: looked up in the index, or else in every .meta file."""
+    index = existing_mutant_index()
+    entry = index.get(mutant_name) if index is not None else None
+    if entry is not None:
+        m = SourceFileMutationData(path=Path(entry.path))
+        m.load()
+        if mutant_name in m.exit_code_by_key:
+            return m
+
     for path in walk_source_files():
         if mutmut.config.should_ignore_for_mutation(path):
             continue
@@ -1187,22 +1855,50 @@ def find_mutant(mutant_name):
     raise FileNotFoundError(f'Could not find mutant {mutant_name}')
 
 
+def indexed_mutant(mutant_name) -> Union[IndexEntry, None]:
+    index = existing_mutant_index()
+    return index.get(mutant_name) if index is not None else None
+
+
+def locate_mutant(mutant_name):
+    """(source path, exit code) of a mutant, from the index without loading its .meta file when possible."""
+    entry = indexed_mutant(mutant_name)
+    if entry is not None:
+        return Path(entry.path), entry.exit_code
+    m = find_mutant(mutant_name)
+    return m.path, m.exit_code_by_key[mutant_name]
+
+
+def read_indexed_function_copies(mutant_name):
+    """(original, mutant) code of the function of a mutant, sliced from the mutated file at the byte ranges in the
+    index. None if the index can't tell, and the mutated file has to be parsed."""
+    entry = indexed_mutant(mutant_name)
+    if entry is None:
+        return None
+    return read_function_copies(entry, Path('mutants') / entry.path)
+
+
 def get_diff_for_mutant(mutant_name, source=None, path=None):
+    copies = None
     if path is None:
-        m = find_mutant(mutant_name)
-        path = m.path
-        status = status_by_exit_code[m.exit_code_by_key[mutant_name]]
+        path, exit_code = locate_mutant(mutant_name)
+        status = status_by_exit_code[exit_code]
+        if source is None:
+            copies = read_indexed_function_copies(mutant_name)
     else:
         status = 'not checked'
 
     print(f'# {mutant_name}: {status}')
 
-    if source is None:
-        module = read_mutants_module(path)
+    if copies is not None:
+        orig_code, mutant_code = (dedent_function(x).strip() for x in copies)
     else:
-        module = cst.parse_module(source)
-    orig_code = cst.Module([read_original_function(module, mutant_name)]).code.strip()
-    mutant_code = cst.Module([read_mutant_function(module, mutant_name)]).code.strip()
+        if source is None:
+            module = read_mutants_module(path)
+        else:
+            module = cst.parse_module(source)
+        orig_code = cst.Module([read_original_function(module, mutant_name)]).code.strip()
+        mutant_code = cst.Module([read_mutant_function(module, mutant_name)]).code.strip()
 
     path = str(path)  # difflib requires str, not Path
     return '\n'.join([
@@ -1230,7 +1926,18 @@ def apply(mutant_name):
 
 
 def apply_mutant(mutant_name):
-    path = find_mutant(mutant_name).path
+    path, _ = locate_mutant(mutant_name)
+
+    copies = read_indexed_function_copies(mutant_name)
+    if copies is not None:
+        orig_code, mutant_code = copies
+        with open(path) as f:
+            source = f.read()
+        # the original copy is the original function verbatim, but only replace it if there's no doubt where it is
+        if source.count(orig_code) == 1:
+            with open(path, 'w') as f:
+                f.write(source.replace(orig_code, mutant_code))
+            return
 
     orig_function_name, class_name = orig_function_and_class_names_from_key(mutant_name)
     orig_function_name = orig_function_name.rpartition('.')[-1]
@@ -0,0 +1,91 @@
+"""Test several mutants in one test run.
+
+Mutants whose functions are called by disjoint sets of tests cannot see each other: no test of one mutant calls the
+function of another. Such mutants can be active together in one child, which runs the union of their tests, and each
+failing test is attributed to the one mutant that covers it. Runs whose outcome can't be attributed like that are
+split.
+
+Line coverage and the infection check narrow the tests each mutant runs, but not what a test can reach once a mutant
+is active: with one mutant active, a test can take another path into a line of another mutant. So bundles are
+planned on the tests of the whole function, and the narrowed tests only decide what each bundle runs.
+"""
+import json
+from pathlib import Path
+from typing import Iterable, Union
+
+
+def plan_bundles(tests_by_key: dict[str, set[str]], max_bundle_size: int) -> list[list[str]]:
+    """Group mutants into bundles of at most `max_bundle_size` whose test sets are pairwise disjoint. The test sets
+    are those of the mutants' functions, not the ones narrowed to a mutant's lines.
+
+    First fit, in the order of `tests_by_key`. A function only has one active mutant at a time, so mutants of the
+    same function never end up in the same bundle, even when line coverage gave them disjoint tests. Every mutant
+    must have at least one test."""
+    bundles = []
+    open_bundles = []  # [keys, union of their tests, their functions]
+    for key, tests in tests_by_key.items():
+        assert tests, key
+        function = function_of(key)
+        for bundle in open_bundles:
+            keys, covered, functions = bundle
+            if function not in functions and covered.isdisjoint(tests):
+                keys.append(key)
+                covered |= tests
+                functions.add(function)
+                if len(keys) >= max_bundle_size:
+                    open_bundles.remove(bundle)
+                break
+        else:
+            keys = [key]
+            bundles.append(keys)
+            if max_bundle_size > 1:
+                open_bundles.append([keys, set(tests), {function}])
+    return bundles
+
+
+def function_of(key: str) -> str:
+    """The mangled function name of a mutant key, like `my_lib.x_f` for `my_lib.x_f__mutmut_3`."""
+    return key.rpartition('__mutmut_')[0]
+
+
+def split_bundle(keys: list[str]) -> list[list[str]]:
+    half = (len(keys) + 1) // 2
+    return [keys[:half], keys[half:]]
+
+
+def attribute_failures(tests_by_key: dict[str, set[str]], failed_tests: Iterable[str], exit_code: int) -> Union[dict[str, int], None]:
+    """Exit code of each mutant of a bundle: 1 (killed) if one of its tests failed, 0 (survived) otherwise.
+
+    None if the run can't be attributed: pytest didn't just report test failures, or a failure (like a collection
+    error) isn't one of the bundle's tests."""
+    failed_tests = set(failed_tests)
+    if exit_code not in (0, 1) or bool(failed_tests) != (exit_code == 1):
+        return None
+    key_by_test = {test: key for key, tests in tests_by_key.items() for test in tests}
+    if not failed_tests <= key_by_test.keys():
+        return None
+    killed = {key_by_test[test] for test in failed_tests}
+    return {key: 1 if key in killed else 0 for key in tests_by_key}
+
+
+def bundle_result_path(pid: int) -> Path:
+    return Path('mutants') / 'mutmut-bundles' / f'{pid}.json'
+
+
+def save_bundle_result(pid: int, exit_code_by_key: Union[dict[str, int], None]) -> None:
+    path = bundle_result_path(pid)
+    path.parent.mkdir(exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(exit_code_by_key, f)
+
+
+def load_bundle_result(pid: int) -> Union[dict[str, int], None]:
+    """What the child `pid` wrote with `save_bundle_result`, None if it didn't get that far."""
+    path = bundle_result_path(pid)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    finally:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,156 @@
+"""Restrict mutation to the lines a change touched, per file."""
+import ast
+import json
+import re
+import subprocess
+from os import walk
+from pathlib import Path
+from typing import Iterable, Union
+
+HUNK_RE = re.compile(r'^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+
+def normalize_path(path: Union[str, Path]) -> str:
+    path = Path(path).as_posix()
+    while path.startswith('./'):
+        path = path[2:]
+    return path
+
+
+def _diff_path(header: str) -> Union[str, None]:
+    path = header.strip().split('\t')[0]
+    if path == '/dev/null':
+        return None
+    if path.startswith(('a/', 'b/')):
+        path = path[2:]
+    return normalize_path(path)
+
+
+def parse_changed_lines(diff_text: str) -> dict[str, set[int]]:
+    """Map each file of a unified diff to the line numbers it adds or changes on the new side.
+
+    Renamed files are keyed by their new name, deleted files are left out. The lines of a hunk are counted from its
+    `@@ -a,b +c,d @@` header, so an added line whose text starts with `++ ` is not taken for a file header."""
+    changed: dict[str, set[int]] = {}
+    current = None
+    new_line = 0
+    old_left = new_left = 0
+    # not splitlines(): a source line may contain a form feed or another line boundary of its own
+    for line in diff_text.split('\n'):
+        if old_left > 0 or new_left > 0:
+            if line.startswith('+'):
+                if current is not None:
+                    changed[current].add(new_line)
+                new_line += 1
+                new_left -= 1
+            elif line.startswith('-'):
+                old_left -= 1
+            elif not line.startswith('\\'):
+                # context, some tools strip the single space of empty context lines. "\ No newline at end of file"
+                # is not a line at all
+                new_line += 1
+                old_left -= 1
+                new_left -= 1
+        elif line.startswith('diff --git '):
+            current = None
+        elif line.startswith('+++ '):
+            current = _diff_path(line[4:])
+            if current is not None:
+                changed.setdefault(current, set())
+        elif (match := HUNK_RE.match(line)) is not None:
+            old_count, new_start, new_count = match.groups()
+            old_left = int(old_count) if old_count is not None else 1
+            new_left = int(new_count) if new_count is not None else 1
+            new_line = int(new_start)
+    return changed
+
+
+def git_changed_lines(diff_base: str) -> dict[str, set[int]]:
+    """Lines the working tree adds or changes compared to `diff_base`, with paths relative to the current directory.
+
+    Files whose change only removed lines are left out: there is nothing left in them to mutate."""
+    output = subprocess.run(
+        ['git', 'diff', '--unified=0', '--no-color', '--no-ext-diff', '--relative', diff_base, '--'],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return {path: lines for path, lines in parse_changed_lines(output).items() if lines}
+
+
+def load_changed_lines(path: Union[str, Path]) -> dict[str, set[int]]:
+    """Read a {"path/to/file.py": [line, ...]} map, as written by `save_changed_lines`."""
+    with open(path) as f:
+        data = json.load(f)
+    return {normalize_path(k): set(int(x) for x in v) for k, v in data.items()}
+
+
+def save_changed_lines(changed: dict[str, set[int]], path: Union[str, Path]) -> None:
+    with open(path, 'w') as f:
+        json.dump({k: sorted(v) for k, v in sorted(changed.items())}, f, indent=2)
+
+
+def mutate_lines_for_path(changed_lines_by_path: dict[str, set[int]], path: Union[str, Path]) -> set[int]:
+    """Lines to mutate in `path`: none at all if the change did not touch the file."""
+    return changed_lines_by_path.get(normalize_path(path), set())
+
+
+def module_name_for_path(path: Union[str, Path]) -> str:
+    name = normalize_path(path)
+    if name.endswith('.py'):
+        name = name[:-len('.py')]
+    name = name.replace('/', '.')
+    if name.startswith('src.'):
+        name = name[len('src.'):]
+    if name.endswith('.__init__'):
+        name = name[:-len('.__init__')]
+    return name
+
+
+def imported_modules(source: str) -> set[str]:
+    """Absolute module names imported by `source`. For `from a import b`, both `a` and `a.b` are included."""
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names |= {alias.name for alias in node.names}
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+            names |= {f'{node.module}.{alias.name}' for alias in node.names}
+    return names
+
+
+def _related(a: str, b: str) -> bool:
+    # importing a package runs its __init__, and a package import can reach its submodules as attributes
+    return a == b or a.startswith(b + '.') or b.startswith(a + '.')
+
+
+def _is_test_file(filename: str) -> bool:
+    return filename.endswith('.py') and (filename.startswith('test_') or filename.endswith('_test.py'))
+
+
+def find_test_files_importing(modules: Iterable[str], test_paths: Iterable[Union[str, Path]]) -> list[str]:
+    """Test files under `test_paths` that directly import one of `modules`, or a package or submodule of one.
+
+    Files that cannot be parsed are kept, to stay on the safe side."""
+    modules = set(modules)
+    result = []
+    for test_path in test_paths:
+        test_path = Path(test_path)
+        if test_path.is_file():
+            candidates = [test_path] if _is_test_file(test_path.name) else []
+        else:
+            candidates = sorted(
+                Path(root) / filename
+                for root, dirs, files in walk(test_path)
+                for filename in files
+                if _is_test_file(filename)
+            )
+        for candidate in candidates:
+            try:
+                imported = imported_modules(candidate.read_text('utf-8'))
+            except (SyntaxError, UnicodeDecodeError):
+                result.append(normalize_path(candidate))
+                continue
+            if any(_related(a, b) for a in imported for b in modules):
+                result.append(normalize_path(candidate))
+    return result
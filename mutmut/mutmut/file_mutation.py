@@ -3,6 +3,7 @@
 from collections import defaultdict
 from collections.abc import Iterable, Sequence, Mapping
 from dataclasses import dataclass
+from types import CodeType
 from typing import Union
 import warnings
 import libcst as cst
@@ -21,19 +22,54 @@ class Mutation:
     mutated_node: cst.CSTNode
     contained_by_top_level_function: Union[cst.FunctionDef, None]
     mutation_desc: str 
-
-
-def mutate_file_contents(filename: str, code: str, mutate_lines: set[int] = None) -> tuple[str, Sequence[str], dict]:
+    operator: str = ''
+    # 1-based lines and 0-based columns of the original node, as reported by PositionProvider
+    start_line: Union[int, None] = None
+    start_column: Union[int, None] = None
+    end_line: Union[int, None] = None
+    end_column: Union[int, None] = None
+    original_snippet: str = ''
+    mutated_snippet: str = ''
+    # 'original' if the mutant compiles to the same bytecode as the original function, the name of an earlier mutant
+    # of the same function if it compiles to the same bytecode as that one, None otherwise
+    equivalent_to: Union[str, None] = None
+    # lines of the `def` and of the first statement in the body of the function that contains the mutation
+    function_line: Union[int, None] = None
+    body_line: Union[int, None] = None
+    # whether the probe copy of the function checks if this mutation computes another value, see mutmut.infection
+    infection_probe: bool = False
+
+    def info(self) -> dict:
+        """JSON serializable description of this mutation, stored in the .meta file of the source file."""
+        return dict(
+            mutation_desc=self.mutation_desc,
+            operator=self.operator,
+            start_line=self.start_line,
+            start_column=self.start_column,
+            end_line=self.end_line,
+            end_column=self.end_column,
+            original_snippet=self.original_snippet,
+            mutated_snippet=self.mutated_snippet,
+            equivalent_to=self.equivalent_to,
+            function_line=self.function_line,
+            body_line=self.body_line,
+            infection_probe=self.infection_probe,
+        )
+
+
+def mutate_file_contents(filename: str, code: str, mutate_lines: set[int] = None, infection_probes: bool = False) -> tuple[str, Sequence[str], dict]:
     """Create mutations for `code` and merge them to a single mutated file with trampolines.
 
-    :return: A tuple of (mutated code, list of mutant function names)"""
+    With `infection_probes`, each mutated function also gets a probe copy, see `infection_probe_function`.
+
+    :return: A tuple of (mutated code, list of mutant function names, mutant function name -> `Mutation.info()`)"""
     try:
         module, mutations = create_mutations(code, mutate_lines)
     except cst.ParserSyntaxError as e:
         warnings.warn(SyntaxWarning(f'Unsupported syntax in {filename} ({str(e)}), skipping'))
-        return code, []
+        return code, [], {}
 
-    return combine_mutations_to_source(module, mutations)
+    return combine_mutations_to_source(module, mutations, infection_probes)
 
 
 def create_mutations(
@@ -102,6 +138,14 @@ def code_diff(orig_code: str, mutated_code: str) -> str:
     )
     return '\n'.join(diff)
 
+_empty_module = cst.Module([])
+
+def node_code(node: cst.CSTNode) -> str:
+    try:
+        return _empty_module.code_for_node(node)
+    except Exception:
+        return ''
+
 def get_function_code(node: cst.FunctionDef) -> str:
     # node is a FunctionDef
     return cst.Module([node]).code
@@ -135,9 +179,9 @@ class MutationVisitor(cst.CSTVisitor):
             if isinstance(node, t):
                 for mutated_node in operator(node):
                         # mutation 설명 생성
+                    pos = self.get_metadata(PositionProvider, node, None)
                     try:
                         # 위치 정보
-                        pos = self.get_metadata(PositionProvider, node, None)
                         line = pos.start.line if pos else "?"
                         func_node = self.get_metadata(OuterFunctionProvider, node, None)
                         if func_node and isinstance(func_node, cst.FunctionDef):
@@ -158,9 +202,29 @@ class MutationVisitor(cst.CSTVisitor):
                         mutated_node=mutated_node,
                         contained_by_top_level_function=self.get_metadata(OuterFunctionProvider, node, None), # type: ignore
                         mutation_desc=mutation_desc,
+                        operator=operator.__name__,
+                        start_line=pos.start.line if pos else None,
+                        start_column=pos.start.column if pos else None,
+                        end_line=pos.end.line if pos else None,
+                        end_column=pos.end.column if pos else None,
+                        original_snippet=node_code(node),
+                        mutated_snippet=node_code(mutated_node),
+                        **self._function_lines(node),
                     )
                     self.mutations.append(mutation)
 
+    def _function_lines(self, node: cst.CSTNode) -> dict:
+        func_node = self.get_metadata(OuterFunctionProvider, node, None)
+        if not isinstance(func_node, cst.FunctionDef):
+            return {}
+        first_statement = func_node.body.body[0] if isinstance(func_node.body, cst.IndentedBlock) else func_node.body
+        function_pos = self.get_metadata(PositionProvider, func_node, None)
+        body_pos = self.get_metadata(PositionProvider, first_statement, None)
+        return dict(
+            function_line=function_pos.start.line if function_pos else None,
+            body_line=body_pos.start.line if body_pos else None,
+        )
+
     def _should_mutate_node(self, node: cst.CSTNode):
         # do not mutate nodes with a pragma: no mutate comment
         # currently, the position metadata does not always exist
@@ -245,16 +309,16 @@ trampoline_impl_cst[-1] = trampoline_impl_cst[-1].with_changes(leading_lines = [
 yield_from_trampoline_impl_cst = list(cst.parse_module(yield_from_trampoline_impl).body)
 yield_from_trampoline_impl_cst[-1] = yield_from_trampoline_impl_cst[-1].with_changes(leading_lines = [cst.EmptyLine(), cst.EmptyLine()])
 
-def combine_mutations_to_source(module: cst.Module, mutations: Sequence[Mutation]) -> tuple[str, Sequence[str], dict]:
+def combine_mutations_to_source(module: cst.Module, mutations: Sequence[Mutation], infection_probes: bool = False) -> tuple[str, Sequence[str], dict]:
     """Create mutated functions and trampolines for all mutations and compile them to a single source code.
     
     :param module: The original parsed module
     :param mutations: Mutations that should be applied.
-    :return: Mutated code, list of mutant names, and mutant_name->desc mapping"""
+    :return: Mutated code, list of mutant names, and mutant_name->`Mutation.info()` mapping"""
 
     result: list[MODULE_STATEMENT] = get_statements_until_func_or_class(module.body)
     mutation_names: list[str] = []
-    mutant_name_to_desc: dict = {}
+    mutation_info_by_name: dict = {}
 
     remaining_statements = module.body[len(result):]
 
@@ -270,12 +334,12 @@ def combine_mutations_to_source(module: cst.Module, mutations: Sequence[Mutation
             if not func_mutants:
                 result.append(func)
                 continue
-            nodes, mutant_names = function_trampoline_arrangement(func, func_mutants, class_name=None)
+            nodes, mutant_names = function_trampoline_arrangement(func, func_mutants, class_name=None, infection_probes=infection_probes)
             result.extend(nodes)
             mutation_names.extend(mutant_names)
-            # mutant_name과 desc 매핑
+            # mutant_name과 mutation 정보 매핑
             for i, mutant_name in enumerate(mutant_names):
-                mutant_name_to_desc[mutant_name] = func_mutants[i].mutation_desc
+                mutation_info_by_name[mutant_name] = func_mutants[i].info()
                 
         elif isinstance(statement, cst.ClassDef):
             cls = statement
@@ -288,12 +352,12 @@ def combine_mutations_to_source(module: cst.Module, mutations: Sequence[Mutation
                     if not isinstance(method, cst.FunctionDef) or not method_mutants:
                         mutated_body.append(method)
                         continue
-                    nodes, mutant_names = function_trampoline_arrangement(method, method_mutants, class_name=cls.name.value)
+                    nodes, mutant_names = function_trampoline_arrangement(method, method_mutants, class_name=cls.name.value, infection_probes=infection_probes)
                     mutated_body.extend(nodes)
                     mutation_names.extend(mutant_names)
-                    # mutant_name과 desc 매핑
+                    # mutant_name과 mutation 정보 매핑
                     for i, mutant_name in enumerate(mutant_names):
-                        mutant_name_to_desc[mutant_name] = method_mutants[i].mutation_desc
+                        mutation_info_by_name[mutant_name] = method_mutants[i].info()
                         
 
                 result.append(cls.with_changes(body=cls.body.with_changes(body=mutated_body)))
@@ -301,9 +365,9 @@ def combine_mutations_to_source(module: cst.Module, mutations: Sequence[Mutation
             result.append(statement)
 
     mutated_module = module.with_changes(body=result)
-    return mutated_module.code, mutation_names, mutant_name_to_desc
+    return mutated_module.code, mutation_names, mutation_info_by_name
 
-def function_trampoline_arrangement(function: cst.FunctionDef, mutants: Iterable[Mutation], class_name: Union[str, None]) -> tuple[Sequence[MODULE_STATEMENT], Sequence[str]]:
+def function_trampoline_arrangement(function: cst.FunctionDef, mutants: Iterable[Mutation], class_name: Union[str, None], infection_probes: bool = False) -> tuple[Sequence[MODULE_STATEMENT], Sequence[str]]:
     """Create mutated functions and a trampoline that switches between original and mutated versions.
     
     :return: A tuple of (nodes, mutant names)"""
@@ -317,22 +381,167 @@ def function_trampoline_arrangement(function: cst.FunctionDef, mutants: Iterable
     # copy of original function
     nodes.append(function.with_changes(name=cst.Name(mangled_name + '_orig')))
 
+    orig_fingerprint = function_fingerprint(function)
+    mutant_name_by_fingerprint = {}
+
     # mutated versions of the function
     for i, mutant in enumerate(mutants):
         mutant_name = f'{mangled_name}_{i+1}'
         mutant_names.append(mutant_name)
-        mutated_method = function.with_changes(name=cst.Name(mutant_name))
-        mutated_method = deep_replace(mutated_method, mutant.original_node, mutant.mutated_node)
-        nodes.append(mutated_method) # type: ignore
+        mutated_method = deep_replace(function, mutant.original_node, mutant.mutated_node)
+
+        # compiled under the original name, so only the mutation can make a difference
+        fingerprint = function_fingerprint(mutated_method) if orig_fingerprint is not None else None
+        if fingerprint is not None:
+            if fingerprint == orig_fingerprint:
+                mutant.equivalent_to = 'original'
+            else:
+                mutant.equivalent_to = mutant_name_by_fingerprint.setdefault(fingerprint, mutant_name)
+                if mutant.equivalent_to == mutant_name:
+                    mutant.equivalent_to = None
+
+        nodes.append(mutated_method.with_changes(name=cst.Name(mutant_name))) # type: ignore
+
+    probe_name = None
+    if infection_probes:
+        probe_function = infection_probe_function(function, list(zip(mutant_names, mutants)))
+        if probe_function is not None:
+            probe_name = mangled_name + '_probe'
+            nodes.append(probe_function.with_changes(name=cst.Name(probe_name)))
 
     # trampoline that forwards the calls
-    trampoline = list(cst.parse_module(build_trampoline(orig_name=name, mutants=mutant_names, class_name=class_name, is_generator=_is_generator)).body)
+    trampoline = list(cst.parse_module(build_trampoline(orig_name=name, mutants=mutant_names, class_name=class_name, is_generator=_is_generator, probe=probe_name)).body)
     trampoline[0] = trampoline[0].with_changes(leading_lines=[cst.EmptyLine()])
     nodes.extend(trampoline)
 
     return nodes, mutant_names
 
 
+# mutated expressions that the probe copy of a function evaluates next to the original expression
+PROBE_SITE_TYPES = (cst.BaseNumber, cst.SimpleString, cst.BinaryOperation, cst.BooleanOperation, cst.Comparison, cst.UnaryOperation)
+PROBE_SITE_NAMES = {'True', 'False', 'None'}
+# can't be evaluated more than once without side effects, or make a new object each time
+probe_unsafe_nodes = m.Call() | m.Await() | m.Yield() | m.NamedExpr() | m.Lambda() | m.GeneratorExp() | m.ListComp() | m.SetComp() | m.DictComp()
+# contexts where an expression can't be replaced by a call, or is evaluated when the function is defined
+PROBE_UNSAFE_ANCESTOR_TYPES = (cst.MatchPattern, cst.Param, cst.Decorator, cst.Annotation, cst.FormattedString, cst.ConcatenatedString)
+
+def infection_probe_function(function: cst.FunctionDef, mutants: Sequence[tuple[str, Mutation]]) -> Union[cst.FunctionDef, None]:
+    """A copy of `function` in which the mutated expressions are evaluated in `mutmut.infection.probe`, together with
+    their mutated versions. None if none of the mutations can be checked like that.
+
+    Sets `Mutation.infection_probe` of the mutations that are checked."""
+    parents = ParentCollector()
+    function.visit(parents)
+
+    probes_by_site: dict[cst.CSTNode, list[tuple[str, cst.CSTNode]]] = defaultdict(list)
+    for mutant_name, mutant in mutants:
+        if mutant.equivalent_to is not None:
+            continue
+        site = _probe_site(mutant.original_node, parents.parents)
+        if site is None:
+            continue
+        mutated_site = mutant.mutated_node if site is mutant.original_node else deep_replace(site, mutant.original_node, mutant.mutated_node)
+        if m.findall(mutated_site, probe_unsafe_nodes):
+            continue
+        probes_by_site[site].append((mutant_name, mutated_site))
+        mutant.infection_probe = True
+
+    if not probes_by_site:
+        return None
+
+    probed = function.visit(ProbeTransformer(probes_by_site))
+    probe_import = cst.parse_statement('from mutmut.infection import probe as _mutmut_probe\n')
+    if isinstance(probed.body, cst.IndentedBlock):
+        body = [probe_import, *probed.body.body]
+    else:
+        body = [*probe_import.body, *probed.body.body]
+    return probed.with_changes(body=probed.body.with_changes(body=body))
+
+def _probe_site(node: cst.CSTNode, parents: Mapping[cst.CSTNode, cst.CSTNode]) -> Union[cst.BaseExpression, None]:
+    """The expression a mutation of `node` changes the value of, if it can be probed."""
+    if isinstance(node, (cst.BaseBinaryOp, cst.BaseBooleanOp)):
+        node = parents.get(node)
+    elif isinstance(node, cst.BaseCompOp):
+        node = parents.get(parents.get(node))
+
+    if isinstance(node, cst.Name):
+        if node.value not in PROBE_SITE_NAMES:
+            return None
+    elif not isinstance(node, PROBE_SITE_TYPES):
+        return None
+    if m.findall(node, probe_unsafe_nodes):
+        return None
+    ancestor = parents.get(node)
+    while ancestor is not None:
+        if isinstance(ancestor, PROBE_UNSAFE_ANCESTOR_TYPES):
+            return None
+        ancestor = parents.get(ancestor)
+    return node
+
+class ParentCollector(cst.CSTVisitor):
+    def __init__(self):
+        self.parents: dict[cst.CSTNode, cst.CSTNode] = {}
+        self._stack: list[cst.CSTNode] = []
+
+    def on_visit(self, node: cst.CSTNode) -> bool:
+        if self._stack:
+            self.parents[node] = self._stack[-1]
+        self._stack.append(node)
+        return True
+
+    def on_leave(self, original_node: cst.CSTNode) -> None:
+        self._stack.pop()
+
+class ProbeTransformer(cst.CSTTransformer):
+    """Replace each probe site with a call to `probe`, which evaluates the site (with the probes of the sites
+    inside it) and the mutated versions of the site in lambdas."""
+    def __init__(self, probes_by_site: Mapping[cst.CSTNode, Sequence[tuple[str, cst.CSTNode]]]):
+        self.probes_by_site = probes_by_site
+
+    def on_leave(self, original_node: cst.CSTNode, updated_node: cst.CSTNode) -> cst.CSTNode:
+        probes = self.probes_by_site.get(original_node)
+        if not probes:
+            return updated_node
+        mutant_names = tuple(mutant_name for mutant_name, _ in probes)
+        mutated = ''.join(f'lambda: {node_code(mutated_site)}, ' for _, mutated_site in probes)
+        return cst.parse_expression(f'_mutmut_probe(__name__, {mutant_names!r}, lambda: {node_code(updated_node)}, ({mutated}))')
+
+
+def normalized_code(code: CodeType) -> tuple:
+    """What `code` does, without its name, file name and line numbers.
+
+    Equal for code that compiles to the same bytecode, like `2 ** 2` and `2 * 2` after constant folding."""
+    return (
+        code.co_code,
+        tuple(_normalized_const(x) for x in code.co_consts),
+        code.co_names,
+        code.co_varnames,
+        code.co_freevars,
+        code.co_cellvars,
+        code.co_argcount,
+        code.co_posonlyargcount,
+        code.co_kwonlyargcount,
+        code.co_flags,
+        getattr(code, 'co_exceptiontable', b''),
+    )
+
+def _normalized_const(value):
+    if isinstance(value, CodeType):
+        return normalized_code(value)
+    if isinstance(value, (tuple, frozenset)):
+        return type(value)(_normalized_const(x) for x in value)
+    # the type keeps 1, 1.0 and True apart, repr keeps 0.0 and -0.0 apart
+    return type(value).__name__, repr(value)
+
+def function_fingerprint(function: cst.FunctionDef) -> Union[tuple, None]:
+    """Normalized bytecode of the module that only defines `function`, None if it doesn't compile on its own."""
+    try:
+        code = compile(cst.Module([function]).code, '<mutmut>', 'exec', dont_inherit=True)
+    except (SyntaxError, ValueError):
+        return None
+    return normalized_code(code)
+
+
 def get_statements_until_func_or_class(statements: Sequence[MODULE_STATEMENT]) -> list[MODULE_STATEMENT]:
     """Get all statements until we encounter the first function or class definition"""
     result = []
@@ -0,0 +1,70 @@
+"""Weak mutation: which tests make a mutant compute another value than the original code.
+
+With `infection_check`, every mutated function also gets a probe copy, in which each mutated expression that can be
+evaluated more than once is replaced with a call to `probe`. The probe copy runs the original code, but evaluates
+the mutated expressions next to the original one and records which of them come out different. A test in which a
+mutant never computes another value can't observe it, so it doesn't have to run against that mutant.
+"""
+from numbers import Number
+from typing import Callable, Iterable, Sequence, Set
+
+# values that are the same if they are equal: for other objects, a different identity can be observed later on
+VALUE_TYPES = (Number, str, bytes, type(None), range)
+
+# of the probe copy of a function, next to its `__mutmut_orig` copy
+PROBE_SUFFIX = '__mutmut_probe'
+
+_infected: Set[str] = set()
+
+
+def probe(module: str, mutant_names: Sequence[str], original: Callable, mutants: Sequence[Callable]):
+    """Evaluate `original` and each of the `mutants` expressions, and record which mutants differ from the original.
+
+    Returns what `original` returns, or raises what it raises."""
+    expected = _evaluate(original)
+    for mutant_name, mutant in zip(mutant_names, mutants):
+        key = f'{module}.{mutant_name}'
+        if key not in _infected and differs(expected, _evaluate(mutant)):
+            _infected.add(key)
+    value, error = expected
+    if error is not None:
+        raise error
+    return value
+
+
+def _evaluate(expression: Callable) -> tuple:
+    try:
+        return expression(), None
+    except Exception as e:
+        return None, e
+
+
+def differs(a: tuple, b: tuple) -> bool:
+    """Whether two (value, exception) outcomes can be told apart. When in doubt, they can."""
+    (value, error), (other_value, other_error) = a, b
+    if error is not None or other_error is not None:
+        return type(error) is not type(other_error)
+    if value is other_value:
+        return False
+    if type(value) is not type(other_value) or not isinstance(value, VALUE_TYPES):
+        return True
+    try:
+        return bool(value != other_value)
+    except Exception:
+        return True
+
+
+def take_infected() -> Set[str]:
+    """Keys of the mutants that computed another value since the last call."""
+    global _infected
+    infected, _infected = _infected, set()
+    return infected
+
+
+def infecting_tests(info: dict, tests: Iterable[str], infected_tests: Set[str], probed_tests: Set[str]) -> Set[str]:
+    """The `tests` of a mutant without those that ran with probes and never saw it compute another value.
+
+    Mutants without a probe (see `Mutation.infection_probe`) keep all their tests."""
+    if not info.get('infection_probe'):
+        return set(tests)
+    return {test for test in tests if test in infected_tests or test not in probed_tests}
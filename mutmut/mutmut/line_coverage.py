@@ -0,0 +1,130 @@
+"""Which lines of the mutated functions each test executes, to give every mutant only the tests that reach it."""
+import ast
+import dis
+from bisect import bisect_right
+from inspect import CO_NEWLOCALS
+import sys
+from types import CodeType
+from typing import Iterable, Union
+
+from mutmut.diff_targeting import module_name_for_path
+
+ORIG_SUFFIX = '__mutmut_orig'
+
+
+class LineCollector:
+    """Record the lines executed in `filenames`, with `sys.monitoring` on Python 3.12+ and `sys.settrace` before.
+
+    Each line is reported once until `take` is called, so a line in a hot loop costs one callback per test."""
+
+    def __init__(self, filenames: Iterable[str]):
+        self.filenames = set(filenames)
+        self.lines = set()
+        self.tool_id = None
+
+    def start(self):
+        monitoring = getattr(sys, 'monitoring', None)
+        if monitoring is not None:
+            for tool_id in (monitoring.COVERAGE_ID, 3, 4):
+                try:
+                    monitoring.use_tool_id(tool_id, 'mutmut')
+                except ValueError:
+                    # taken, by coverage.py for example
+                    continue
+                self.tool_id = tool_id
+                monitoring.register_callback(tool_id, monitoring.events.LINE, self._on_line)
+                monitoring.set_events(tool_id, monitoring.events.LINE)
+                return
+        sys.settrace(self._global_trace)
+
+    def stop(self):
+        if self.tool_id is not None:
+            sys.monitoring.set_events(self.tool_id, 0)
+            sys.monitoring.register_callback(self.tool_id, sys.monitoring.events.LINE, None)
+            sys.monitoring.free_tool_id(self.tool_id)
+            self.tool_id = None
+        else:
+            sys.settrace(None)
+
+    def take(self) -> set:
+        """(filename, line) pairs executed since the last call."""
+        lines, self.lines = self.lines, set()
+        if self.tool_id is not None:
+            sys.monitoring.restart_events()
+        return lines
+
+    def _is_target(self, code) -> bool:
+        # only function bodies: module and class bodies run the `def` lines once on import, whichever test imports them
+        return code.co_filename in self.filenames and bool(code.co_flags & CO_NEWLOCALS)
+
+    def _on_line(self, code, line):
+        if self._is_target(code):
+            self.lines.add((code.co_filename, line))
+        return sys.monitoring.DISABLE
+
+    def _global_trace(self, frame, event, arg):
+        if self._is_target(frame.f_code):
+            return self._local_trace
+        return None
+
+    def _local_trace(self, frame, event, arg):
+        if event == 'line':
+            self.lines.add((frame.f_code.co_filename, frame.f_lineno))
+        return self._local_trace
+
+
+def _code_objects(code: CodeType):
+    yield code
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _code_objects(const)
+
+
+class OrigFunctions:
+    """The `__mutmut_orig` copies of the original functions in a mutated file: where they are and which of their
+    lines have bytecode. Lines are stored as offsets from the `def` line, which are the same in the original file."""
+
+    def __init__(self, path: str, relative_path: str):
+        with open(path) as f:
+            source = f.read()
+        module_name = module_name_for_path(relative_path)
+        self.ranges = []  # (first line, last line, mangled function name)
+        for node in ast.walk(ast.parse(source)):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.endswith(ORIG_SUFFIX):
+                self.ranges.append((node.lineno, node.end_lineno, f'{module_name}.{node.name[:-len(ORIG_SUFFIX)]}'))
+        self.ranges.sort()
+        self.starts = [first for first, _, _ in self.ranges]
+
+        self.executable_lines_by_function = {name: set() for _, _, name in self.ranges}
+        for code in _code_objects(compile(source, path, 'exec')):
+            for _, line in dis.findlinestarts(code):
+                found = self.find(line)
+                if found is not None:
+                    self.executable_lines_by_function[found[0]].add(found[1])
+
+    def find(self, line: int) -> Union[tuple, None]:
+        """(mangled function name, offset) of a line, None if it isn't in an original function."""
+        if line is None:
+            return None
+        i = bisect_right(self.starts, line) - 1
+        if i < 0:
+            return None
+        first, last, name = self.ranges[i]
+        return (name, line - first) if line <= last else None
+
+
+def covering_tests(info: dict, tests_by_line: dict, executable_lines: set) -> Union[set, None]:
+    """Tests that execute a line of the mutation described by `info` (a `Mutation.info()`).
+
+    None if line coverage can't tell, and all tests of the function have to run: mutations in the signature (like
+    default values) take effect when the function is defined, and some nodes have no bytecode on their own lines."""
+    function_line = info.get('function_line')
+    body_line = info.get('body_line')
+    start_line = info.get('start_line')
+    end_line = info.get('end_line') or start_line
+    if function_line is None or body_line is None or start_line is None or start_line < body_line:
+        return None
+    offsets = range(start_line - function_line, end_line - function_line + 1)
+    if executable_lines.isdisjoint(offsets):
+        return None
+    return set().union(*(tests_by_line.get(offset, ()) for offset in offsets))
@@ -0,0 +1,113 @@
+"""Fill the mutants/ tree without copying more than needed.
+
+Files mutmut never rewrites are hard linked. Files that must be independent copies (tests and their data, which
+a test run may modify) are reflinked where the file system supports it, and copied otherwise. Destinations that
+already match their source by size and mtime are left alone, so re-runs only touch what changed.
+"""
+import os
+import shutil
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# _IOW(0x94, 9, int) from linux/fs.h: share the extents of another file (btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+
+PathLike = Union[str, Path]
+
+
+def is_link_to(src: PathLike, dst: PathLike) -> bool:
+    try:
+        return os.path.samefile(src, dst)
+    except FileNotFoundError:
+        return False
+
+
+def up_to_date(src: PathLike, dst: PathLike) -> bool:
+    """Whether `dst` is a copy of the current `src`. A hard link to `src` is not: writing to it changes `src`, so a
+    file an earlier run linked is copied again once it has to be a copy."""
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src)
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        return False
+    return src_stat.st_size == dst_stat.st_size and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+
+def _tmp_path(dst: PathLike) -> str:
+    return f'{dst}.mutmut-tmp'
+
+
+def _remove(path: str) -> None:
+    if os.path.lexists(path):
+        os.unlink(path)
+
+
+def reflink(src: PathLike, dst: PathLike) -> bool:
+    """Create `dst` as a copy-on-write clone of `src`. Returns False if the file system can't do that."""
+    if fcntl is None:
+        return False
+    try:
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        _remove(str(dst))
+        return False
+
+
+def copy_file(src: PathLike, dst: PathLike) -> str:
+    """Make `dst` an independent copy of `src`: a reflink if possible, otherwise a byte copy."""
+    if up_to_date(src, dst):
+        return 'unchanged'
+    tmp = _tmp_path(dst)
+    _remove(tmp)
+    how = 'reflinked' if reflink(src, tmp) else 'copied'
+    if how == 'copied':
+        shutil.copyfile(src, tmp)
+    # the mtime is what tells the next run this file is up to date
+    shutil.copystat(src, tmp)
+    os.replace(tmp, dst)
+    return how
+
+
+def link_file(src: PathLike, dst: PathLike) -> str:
+    """Hard link `src` to `dst`, falling back to `copy_file` across file systems.
+
+    `dst` is replaced, never written to: it may be a mutated file from a previous run, or a link to the original."""
+    if is_link_to(src, dst) or up_to_date(src, dst):
+        return 'unchanged'
+    tmp = _tmp_path(dst)
+    try:
+        _remove(tmp)
+        os.link(src, tmp)
+    except OSError:
+        return copy_file(src, dst)
+    os.replace(tmp, dst)
+    return 'linked'
+
+
+def materialize_tree(
+    src_dir: PathLike,
+    dst_dir: PathLike,
+    place_file: Callable[[PathLike, PathLike], str],
+    skip: Callable[[Path], bool] = None,
+) -> Counter:
+    """Mirror `src_dir` into `dst_dir` with `place_file` (`link_file` or `copy_file`). Returns how many files were placed how."""
+    counts = Counter()
+    for root, dirs, files in os.walk(src_dir, followlinks=True):
+        out_root = Path(dst_dir) / os.path.relpath(root, src_dir)
+        os.makedirs(out_root, exist_ok=True)
+        for filename in files:
+            path = Path(root) / filename
+            if skip is not None and skip(path):
+                continue
+            counts[place_file(path, out_root / filename)] += 1
+    return counts
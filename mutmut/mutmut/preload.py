@@ -0,0 +1,70 @@
+"""Import the mutated modules and the test modules in the parent, so that the forked children start with them.
+
+A child gets the modules of the parent copy-on-write, already compiled and executed, instead of importing them again
+for every mutant. That is only safe for modules without state that outlives a test: a module that caches results,
+starts threads or opens connections when it is imported should be imported by each child on its own, so it goes
+in the denylist.
+
+Patterns are `fnmatch` patterns of module names, and also match the submodules of what they match. Modules under
+`mutants/` are matched by their name in the project (like `my_lib.cache` or `tests.test_cache`), whatever name the
+test runner imported them as.
+"""
+import fnmatch
+import importlib
+import os
+import sys
+from typing import Dict, Iterable, List, Sequence
+
+from mutmut.diff_targeting import module_name_for_path
+
+
+def matches(module_name: str, patterns: Sequence[str]) -> bool:
+    return any(
+        fnmatch.fnmatchcase(module_name, pattern) or fnmatch.fnmatchcase(module_name, pattern + '.*')
+        for pattern in patterns
+    )
+
+
+def is_preloadable(module_name: str, allowlist: Sequence[str], denylist: Sequence[str]) -> bool:
+    """An empty `allowlist` allows all modules."""
+    return (not allowlist or matches(module_name, allowlist)) and not matches(module_name, denylist)
+
+
+def preload_modules(module_names: Iterable[str], allowlist: Sequence[str], denylist: Sequence[str]) -> Dict[str, Exception]:
+    """Import the preloadable `module_names`. Returns the errors of those that failed: the children import them
+    again, and report the error where it matters."""
+    errors = {}
+    for module_name in module_names:
+        if not is_preloadable(module_name, allowlist, denylist):
+            continue
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            errors[module_name] = e
+    return errors
+
+
+def project_module_name(name: str, module, mutants_dir: str) -> str:
+    """The name a module is matched by: its path under `mutants_dir` if it is from there, else `name`."""
+    filename = getattr(module, '__file__', None)
+    if filename:
+        relative_path = os.path.relpath(os.path.abspath(filename), mutants_dir)
+        if not relative_path.startswith(os.pardir):
+            return module_name_for_path(relative_path)
+    return name
+
+
+def unload_denied(denylist: Sequence[str], mutants_dir: str = 'mutants') -> List[str]:
+    """Remove the modules in `denylist` from `sys.modules`, also those that earlier test runs in the parent imported,
+    so every child imports them again. Returns their names."""
+    if not denylist:
+        return []
+    mutants_dir = os.path.abspath(mutants_dir)
+    unloaded = [
+        name
+        for name, module in list(sys.modules.items())
+        if module is not None and matches(project_module_name(name, module, mutants_dir), denylist)
+    ]
+    for name in unloaded:
+        del sys.modules[name]
+    return unloaded
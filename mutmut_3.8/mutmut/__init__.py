@@ -9,13 +9,29 @@ config = None
 
 _stats = set()
 tests_by_mangled_function_name = defaultdict(set)
+# with line coverage: mangled function name -> line offset from its `def` -> tests
+tests_by_function_line = defaultdict(lambda: defaultdict(set))
+executable_lines_by_function = {}
+# hash of the source of each function when its lines were collected, offsets of another version of it don't fit
+line_stats_hash_by_function = {}
+# with the infection check: mutant key -> tests in which it computes another value, and the tests that ran with probes
+infected_tests_by_key = defaultdict(set)
+probed_tests = set()
+# hash of the probe copy of each function when its tests ran with it
+probe_hash_by_function = {}
 
 
 def _reset_globals():
-    global duration_by_test, stats_time, config, _stats, tests_by_mangled_function_name
+    global duration_by_test, stats_time, config, _stats, tests_by_mangled_function_name, tests_by_function_line, executable_lines_by_function, line_stats_hash_by_function, infected_tests_by_key, probed_tests, probe_hash_by_function
 
     duration_by_test = {}
     stats_time = None
     config = None
     _stats = set()
     tests_by_mangled_function_name = defaultdict(set)
+    tests_by_function_line = defaultdict(lambda: defaultdict(set))
+    executable_lines_by_function = {}
+    line_stats_hash_by_function = {}
+    infected_tests_by_key = defaultdict(set)
+    probed_tests = set()
+    probe_hash_by_function = {}
@@ -0,0 +1,179 @@
+"""An index of all mutants in `mutants/mutmut-index.sqlite`, to find a mutant without loading every `.meta` file.
+
+It is written when the mutants are generated and updated with every result. The `.meta` files stay the source of
+truth: an index that is missing, or doesn't know a mutant, just means looking through them like before.
+"""
+import ast
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+from mutmut.trampoline_templates import CLASS_NAME_SEPARATOR
+
+INDEX_PATH = Path('mutants') / 'mutmut-index.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mutants (
+    name TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    function TEXT NOT NULL,
+    start_line INTEGER,
+    end_line INTEGER,
+    exit_code INTEGER,
+    start_byte INTEGER,
+    end_byte INTEGER,
+    orig_start_byte INTEGER,
+    orig_end_byte INTEGER
+);
+CREATE INDEX IF NOT EXISTS mutants_by_path ON mutants (path);
+"""
+
+
+@dataclass
+class IndexEntry:
+    name: str
+    # the source file, relative to the project like `SourceFileMutationData.path`
+    path: str
+    # mangled name of the function, like the keys of `tests_by_mangled_function_name`
+    function: str
+    start_line: Union[int, None] = None
+    end_line: Union[int, None] = None
+    exit_code: Union[int, None] = None
+    # where the mutated copy of the function is in the mutated file, from the start of its first line
+    start_byte: Union[int, None] = None
+    end_byte: Union[int, None] = None
+    # where the `__mutmut_orig` copy of the function is in the mutated file
+    orig_start_byte: Union[int, None] = None
+    orig_end_byte: Union[int, None] = None
+
+
+FIELDS = tuple(IndexEntry.__dataclass_fields__)
+
+
+class MutantIndex:
+    def __init__(self, path: Union[str, Path] = INDEX_PATH):
+        self.path = Path(path)
+        self.connection = sqlite3.connect(str(self.path))
+        # the index can be rebuilt from the .meta files, so losing the last writes in a crash is fine
+        self.connection.execute('PRAGMA synchronous = OFF')
+        columns = tuple(row[1] for row in self.connection.execute('PRAGMA table_info(mutants)'))
+        if columns and columns != FIELDS:
+            # written by another version of mutmut: the next run fills it again
+            self.connection.execute('DROP TABLE mutants')
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def replace_files(self, entries_by_path: Dict[str, List[IndexEntry]], complete: bool = False) -> None:
+        """Replace the mutants of the files in `entries_by_path`. With `complete`, also drop all other files."""
+        with self.connection:
+            if complete:
+                self.connection.execute('DELETE FROM mutants')
+            else:
+                self.connection.executemany('DELETE FROM mutants WHERE path = ?', [(path,) for path in entries_by_path])
+            self.connection.executemany(
+                f'INSERT OR REPLACE INTO mutants ({", ".join(FIELDS)}) VALUES ({", ".join("?" for _ in FIELDS)})',
+                [tuple(getattr(entry, field) for field in FIELDS) for entries in entries_by_path.values() for entry in entries],
+            )
+
+    def set_exit_codes(self, exit_code_by_key: Dict[str, Union[int, None]]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                'UPDATE mutants SET exit_code = ? WHERE name = ?',
+                [(exit_code, key) for key, exit_code in exit_code_by_key.items()],
+            )
+
+    def get(self, name: str) -> Union[IndexEntry, None]:
+        row = self.connection.execute(f'SELECT {", ".join(FIELDS)} FROM mutants WHERE name = ?', (name,)).fetchone()
+        return IndexEntry(*row) if row is not None else None
+
+    def entries(self) -> Iterable[IndexEntry]:
+        """All mutants, by file and in the order they were generated."""
+        for row in self.connection.execute(f'SELECT {", ".join(FIELDS)} FROM mutants ORDER BY path, rowid'):
+            yield IndexEntry(*row)
+
+
+_index_by_path: Dict[str, MutantIndex] = {}
+
+
+def mutant_index(path: Union[str, Path] = INDEX_PATH) -> MutantIndex:
+    """The index at `path`, opened once per process."""
+    key = os.path.abspath(path)
+    if key not in _index_by_path:
+        _index_by_path[key] = MutantIndex(path)
+    return _index_by_path[key]
+
+
+def existing_mutant_index(path: Union[str, Path] = INDEX_PATH) -> Union[MutantIndex, None]:
+    """Like `mutant_index`, but None instead of creating an index that isn't there."""
+    if not Path(path).exists():
+        return None
+    return mutant_index(path)
+
+
+def read_function_copies(entry: IndexEntry, mutated_path: Union[str, Path]) -> Union[Tuple[str, str], None]:
+    """The original and the mutated copy of the function of `entry`, sliced from the mutated file without parsing it,
+    and renamed back to the name of the function. Methods keep their indentation.
+
+    None if the index has no byte ranges for the mutant, or they don't point at its function copies any more."""
+    if None in (entry.start_byte, entry.end_byte, entry.orig_start_byte, entry.orig_end_byte):
+        return None
+    module_and_mangled_name, _, mutant_number = entry.name.rpartition('__mutmut_')
+    mangled_name = module_and_mangled_name.rpartition('.')[-1]
+    name = mangled_name.rpartition(CLASS_NAME_SEPARATOR)[-1] if CLASS_NAME_SEPARATOR in mangled_name else mangled_name[len('x_'):]
+
+    result = []
+    with open(mutated_path, 'rb') as f:
+        for start, end, copy_name in (
+            (entry.orig_start_byte, entry.orig_end_byte, f'{mangled_name}__mutmut_orig'),
+            (entry.start_byte, entry.end_byte, f'{mangled_name}__mutmut_{mutant_number}'),
+        ):
+            code = _read_lines(f, start, end)
+            if code is None or not re.match(rf'[ \t]*(async[ \t]+)?def {re.escape(copy_name)}\(', code):
+                return None
+            result.append(code.replace(f'def {copy_name}(', f'def {name}(', 1))
+    return result[0], result[1]
+
+
+def _read_lines(f, start: int, end: int) -> Union[str, None]:
+    """The text from `start` to `end`, if that is a range of whole lines (without the last line break)."""
+    f.seek(start - 1 if start else 0)
+    data = f.read(end - start + 2)
+    if start:
+        if data[:1] not in (b'\n', b'\r'):
+            return None
+        data = data[1:]
+    if data[end - start:end - start + 1] not in (b'', b'\n', b'\r'):
+        return None
+    return data[:end - start].decode()
+
+
+def dedent_function(code: str) -> str:
+    """Remove the indentation of the `def` line from the lines of a method that have it.
+
+    Unlike `textwrap.dedent`, this leaves the content of multi-line strings that start further left alone."""
+    indent = code[:len(code) - len(code.lstrip(' \t'))]
+    return '\n'.join(line[len(indent):] if line.startswith(indent) else line for line in code.split('\n'))
+
+
+def function_byte_ranges(tree: ast.Module, source: bytes) -> Dict[str, Tuple[int, int]]:
+    """(start, end) byte offsets of the top-level functions and methods in `source`, parsed to `tree`.
+
+    Ranges are whole lines, from the beginning of the `def` line, so methods keep their indentation, to the end of
+    the last line of the body, so a comment after its last statement is included."""
+    lines = source.splitlines(keepends=True)
+    line_starts = [0]
+    for line in lines:
+        line_starts.append(line_starts[-1] + len(line))
+
+    result = {}
+    for node in tree.body:
+        for function in (node.body if isinstance(node, ast.ClassDef) else [node]):
+            if isinstance(function, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                last_line = lines[function.end_lineno - 1]
+                result[function.name] = (line_starts[function.lineno - 1], line_starts[function.end_lineno - 1] + len(last_line.rstrip(b'\r\n')))
+    return result
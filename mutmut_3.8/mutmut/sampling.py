@@ -0,0 +1,109 @@
+"""Estimate the mutation score from a random sample of the mutants."""
+import random
+from collections import defaultdict
+from math import sqrt
+from typing import Dict, Hashable, List, Sequence, Tuple, TypeVar, Union
+
+T = TypeVar('T')
+
+DETECTED_STATUSES = {'killed', 'timeout', 'segfault', 'suspicious'}
+UNDETECTED_STATUSES = {'survived', 'no tests', 'not infected'}
+
+# don't stop on an interval that is narrow by chance
+MIN_SAMPLES_BEFORE_STOP = 30
+
+
+def sample_size(sample: str, population: int) -> int:
+    """`sample` is a count ("200"), a fraction ("0.1") or a percentage ("10%") of `population`."""
+    sample = sample.strip()
+    if sample.endswith('%'):
+        fraction = float(sample[:-1]) / 100
+    elif '.' in sample:
+        fraction = float(sample)
+    else:
+        fraction = None
+    if fraction is None:
+        size = int(sample)
+    else:
+        size = max(1, round(population * fraction)) if fraction > 0 else 0
+    if size <= 0:
+        raise ValueError(f'sample size must be positive: {sample}')
+    return min(size, population)
+
+
+def stratified_order(items: Sequence[T], stratum_of, rng: random.Random) -> List[T]:
+    """`items` in random order such that every prefix has about as many items of each stratum as a proportional
+    stratified sample of that size would have.
+
+    Each stratum is shuffled, and its i-th item of n is placed at a random point between i/n and (i+1)/n."""
+    by_stratum: Dict[Hashable, List[T]] = defaultdict(list)
+    for item in items:
+        by_stratum[stratum_of(item)].append(item)
+    keyed = []
+    for stratum in sorted(by_stratum, key=repr):
+        members = by_stratum[stratum]
+        rng.shuffle(members)
+        n = len(members)
+        keyed.extend(((i + rng.random()) / n, member) for i, member in enumerate(members))
+    keyed.sort(key=lambda x: x[0])
+    return [member for _, member in keyed]
+
+
+def wilson_interval(successes: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval of a proportion, 95% by default."""
+    if not n:
+        return 0.0, 1.0
+    p = successes / n
+    denominator = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denominator
+    half_width = z * sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+class ScoreEstimate:
+    """Mutation score of the mutants that have a result, in the order they were sampled.
+
+    Only the longest prefix of the sample in which every mutant has a result is counted: results come in out of
+    order from parallel children, and counting them as they come would favor mutants that are fast to check."""
+
+    def __init__(self, ordered_keys: Sequence[str]):
+        self.ordered_keys = ordered_keys
+        self.position = 0
+        self.detected = 0
+        self.undetected = 0
+
+    def advance(self, status_by_key) -> None:
+        """Count the results of the next keys, as long as `status_by_key(key)` has one (is not None)."""
+        while self.position < len(self.ordered_keys):
+            status = status_by_key(self.ordered_keys[self.position])
+            if status is None:
+                break
+            if status in DETECTED_STATUSES:
+                self.detected += 1
+            elif status in UNDETECTED_STATUSES:
+                self.undetected += 1
+            self.position += 1
+
+    @property
+    def n(self) -> int:
+        return self.detected + self.undetected
+
+    @property
+    def score(self) -> Union[float, None]:
+        return self.detected / self.n if self.n else None
+
+    def interval(self) -> Tuple[float, float]:
+        return wilson_interval(self.detected, self.n)
+
+    def is_precise_enough(self, ci_width: Union[float, None]) -> bool:
+        if ci_width is None or self.n < MIN_SAMPLES_BEFORE_STOP:
+            return False
+        low, high = self.interval()
+        return high - low < ci_width
+
+    def describe(self) -> str:
+        if not self.n:
+            return 'no sampled mutants checked'
+        low, high = self.interval()
+        return f'{self.score:.1%} (95% CI {low:.1%} - {high:.1%}, {self.n} sampled mutants)'
+
@@ -1,9 +1,12 @@
 CLASS_NAME_SEPARATOR = 'ǁ'
 
-def build_trampoline(*, orig_name, mutants, class_name, is_generator):
+def build_trampoline(*, orig_name, mutants, class_name, is_generator, probe=None):
     mangled_name = mangle_function_name(name=orig_name, class_name=class_name)
 
-    mutants_dict = f'{mangled_name}__mutmut_mutants : ClassVar[MutantDict] = {{\n' + ', \n    '.join(f'{repr(m)}: {m}' for m in mutants) + '\n}'
+    entries = [f'{repr(m)}: {m}' for m in mutants]
+    if probe is not None:
+        entries.append(f"'probe': {probe}")
+    mutants_dict = f'{mangled_name}__mutmut_mutants : ClassVar[MutantDict] = {{\n' + ', \n    '.join(entries) + '\n}'
     access_prefix = ''
     access_suffix = ''
     self_arg = ''
@@ -64,10 +67,17 @@ def _mutmut_trampoline(orig, mutants, call_args, call_kwargs, self_arg = None):
         result = orig(*call_args, **call_kwargs)
         return result  # for the yield case
     prefix = orig.__module__ + '.' + orig.__name__ + '__mutmut_'
-    if not mutant_under_test.startswith(prefix):
+    if ',' in mutant_under_test:
+        # a bundle of mutants without shared tests, so at most one of them is in this function
+        mutant_under_test = next((x for x in mutant_under_test.split(',') if x.startswith(prefix)), '')
+    if mutant_under_test == 'probe' and 'probe' in mutants:
+        # the original code, recording which of the mutants compute another value
+        mutant_name = 'probe'
+    elif not mutant_under_test.startswith(prefix):
         result = orig(*call_args, **call_kwargs)
         return result  # for the yield case
-    mutant_name = mutant_under_test.rpartition('.')[-1]
+    else:
+        mutant_name = mutant_under_test.rpartition('.')[-1]
     if self_arg:
         # call to a class method where self is not bound
         result = mutants[mutant_name](self_arg, *call_args, **call_kwargs)
@@ -1,4 +1,7 @@
+import ast
+import importlib.util
 import os
+import sys
 from unittest.mock import Mock, patch
 import pytest
 from libcst import parse_statement
@@ -12,9 +15,21 @@ from mutmut.__main__ import (
     Config,
     MutmutProgrammaticFailException,
     CatchOutput,
+    drop_stale_infections,
+    drop_stale_line_stats,
+    forget_mutants,
+    precompile,
 )
 from mutmut.trampoline_templates import trampoline_impl, yield_from_trampoline_impl, mangle_function_name
 from mutmut.file_mutation import create_mutations, mutate_file_contents, is_generator
+from mutmut.materialize import copy_file, link_file, materialize_tree
+from mutmut.diff_targeting import parse_changed_lines, mutate_lines_for_path, module_name_for_path, find_test_files_importing
+from mutmut.bundling import plan_bundles, split_bundle, attribute_failures
+from mutmut.sampling import sample_size, stratified_order, wilson_interval, ScoreEstimate
+from mutmut.line_coverage import LineCollector, OrigFunctions, covering_tests
+from mutmut.infection import infecting_tests, take_infected
+from mutmut.mutant_index import IndexEntry, MutantIndex, dedent_function, function_byte_ranges, read_function_copies
+from mutmut.preload import is_preloadable, preload_modules, unload_denied
 
 def mutants_for_source(source: str) -> list[str]:
     module, mutated_nodes = create_mutations(source)
@@ -433,6 +448,452 @@ class Foo:
 '''.strip()
 
 
+def test_mutation_info_has_positions_and_snippets():
+    source = """
+def foo(a, b):
+    return bar(
+        a < b,
+    )
+""".strip()
+
+    _, mutant_names, mutation_info_by_name = mutate_file_contents('filename', source)
+
+    swap = [mutation_info_by_name[x] for x in mutant_names if mutation_info_by_name[x]['operator'] == 'operator_swap_op']
+    assert len(swap) == 1
+    assert swap[0]['start_line'] == 3
+    assert swap[0]['end_line'] == 3
+    assert swap[0]['original_snippet'].strip() == '<'
+    assert swap[0]['mutated_snippet'].strip() == '<='
+    assert swap[0]['mutation_desc'].startswith('Line 3:')
+
+    call = [mutation_info_by_name[x] for x in mutant_names if mutation_info_by_name[x]['operator'] == 'operator_arg_removal']
+    assert call
+    assert all((x['start_line'], x['end_line']) == (2, 4) for x in call)
+
+
+def test_equivalent_and_duplicate_mutants_are_detected():
+    source = """
+def foo(a):
+    return 2 ** 2 + a
+
+def bar():
+    return 0 + 0
+""".strip()
+
+    _, mutant_names, mutation_info_by_name = mutate_file_contents('filename', source)
+    equivalent_to = [
+        (x, mutation_info_by_name[x]['mutated_snippet'].strip(), mutation_info_by_name[x]['equivalent_to'])
+        for x in mutant_names
+    ]
+
+    assert equivalent_to == [
+        ('x_foo__mutmut_1', '3', None),
+        # constant folding makes 2 * 2 the same bytecode as 2 ** 2
+        ('x_foo__mutmut_2', '*', 'original'),
+        ('x_foo__mutmut_3', '3', None),
+        ('x_foo__mutmut_4', '-', None),
+        ('x_bar__mutmut_1', '1', None),
+        ('x_bar__mutmut_2', '-', 'original'),
+        # 1 + 0 and 0 + 1 both fold to 1
+        ('x_bar__mutmut_3', '1', 'x_bar__mutmut_1'),
+    ]
+
+
+def test_parse_changed_lines_per_file():
+    diff = """
+diff --git a/src/foo.py b/src/foo.py
+--- a/src/foo.py
++++ b/src/foo.py
+@@ -1,3 +1,4 @@
+ a = 1
+-b = 2
++b = 3
++c = 4
+ d = 5
+diff --git a/src/old.py b/src/new.py
+similarity index 90%
+rename from src/old.py
+rename to src/new.py
+--- a/src/old.py
++++ b/src/new.py
+@@ -10,0 +11 @@
++e = 6
+diff --git a/src/gone.py b/src/gone.py
+deleted file mode 100644
+--- a/src/gone.py
++++ /dev/null
+@@ -1 +0,0 @@
+-f = 7
+diff --git a/src/doc.py b/src/doc.py
+--- a/src/doc.py
++++ b/src/doc.py
+@@ -1,2 +1,3 @@
+---- removed text that looks like a header
++++ added text that looks like a header
+ x = 1
++y = 2
+\\ No newline at end of file
+"""
+    changed = parse_changed_lines(diff)
+    assert changed == {'src/foo.py': {2, 3}, 'src/new.py': {11}, 'src/doc.py': {1, 3}}
+    assert mutate_lines_for_path(changed, './src/foo.py') == {2, 3}
+    # files the change did not touch get no mutants at all, even on the same line numbers
+    assert mutate_lines_for_path(changed, 'src/bar.py') == set()
+
+    _, mutant_names, _ = mutate_file_contents('src/bar.py', 'def bar():\n    return 1 + 2\n', mutate_lines_for_path(changed, 'src/bar.py'))
+    assert mutant_names == []
+
+
+def test_find_test_files_importing_changed_modules(tmp_path):
+    tests_dir = tmp_path / 'tests'
+    tests_dir.mkdir()
+    (tests_dir / 'test_foo.py').write_text('from pkg.foo import bar\n')
+    (tests_dir / 'test_pkg.py').write_text('import pkg\n')
+    (tests_dir / 'test_other.py').write_text('from other import baz\nimport os\n')
+    (tests_dir / 'helpers.py').write_text('import pkg.foo\n')
+
+    modules = {module_name_for_path('src/pkg/foo.py')}
+    assert modules == {'pkg.foo'}
+    found = find_test_files_importing(modules, [tests_dir])
+    assert [x.rpartition('/')[2] for x in found] == ['test_foo.py', 'test_pkg.py']
+
+    assert module_name_for_path('./src/pkg/__init__.py') == 'pkg'
+
+
+def test_link_file_replaces_instead_of_writing_through(tmp_path):
+    src = tmp_path / 'src.py'
+    src.write_text('a = 1\n')
+    dst = tmp_path / 'dst.py'
+    dst.write_text('mutated by a previous run\n')
+
+    assert link_file(src, dst) == 'linked'
+    assert dst.read_text() == 'a = 1\n'
+    assert os.path.samefile(src, dst)
+    # linking again is a no-op and leaves no temp file behind
+    assert link_file(src, dst) == 'unchanged'
+    assert sorted(x.name for x in tmp_path.iterdir()) == ['dst.py', 'src.py']
+
+
+def test_copy_file_skips_unchanged_files(tmp_path):
+    src_dir = tmp_path / 'fixtures'
+    (src_dir / 'sub').mkdir(parents=True)
+    (src_dir / 'a.txt').write_text('a')
+    (src_dir / 'sub' / 'b.txt').write_text('b')
+    dst_dir = tmp_path / 'mutants' / 'fixtures'
+
+    counts = materialize_tree(src_dir, dst_dir, copy_file)
+    assert sum(counts.values()) == 2 and not counts['unchanged']
+    assert (dst_dir / 'sub' / 'b.txt').read_text() == 'b'
+    # copies, not links: a test writing to its data must not change the originals
+    assert not os.path.samefile(src_dir / 'a.txt', dst_dir / 'a.txt')
+
+    assert materialize_tree(src_dir, dst_dir, copy_file) == {'unchanged': 2}
+
+    (src_dir / 'a.txt').write_text('changed')
+    assert materialize_tree(src_dir, dst_dir, copy_file)['unchanged'] == 1
+    assert (dst_dir / 'a.txt').read_text() == 'changed'
+
+    # linked by an earlier run, and a copy now
+    (dst_dir / 'a.txt').unlink()
+    assert link_file(src_dir / 'a.txt', dst_dir / 'a.txt') == 'linked'
+    assert link_file(src_dir / 'a.txt', dst_dir / 'a.txt') == 'unchanged'
+    assert copy_file(src_dir / 'a.txt', dst_dir / 'a.txt') != 'unchanged'
+    assert not os.path.samefile(src_dir / 'a.txt', dst_dir / 'a.txt')
+
+
+def test_plan_bundles_only_combines_mutants_without_shared_tests():
+    tests_by_key = {
+        'a.x_f__mutmut_1': {'test_f'},
+        'a.x_f__mutmut_2': {'test_f'},
+        'a.x_g__mutmut_1': {'test_g', 'test_gh'},
+        'b.x_h__mutmut_1': {'test_h', 'test_gh'},
+        'b.x_i__mutmut_1': {'test_i'},
+    }
+    assert plan_bundles(tests_by_key, max_bundle_size=3) == [
+        ['a.x_f__mutmut_1', 'a.x_g__mutmut_1', 'b.x_i__mutmut_1'],
+        ['a.x_f__mutmut_2', 'b.x_h__mutmut_1'],
+    ]
+    assert plan_bundles(tests_by_key, max_bundle_size=1) == [[key] for key in tests_by_key]
+    assert split_bundle(['a', 'b', 'c']) == [['a', 'b'], ['c']]
+
+
+def test_plan_bundles_never_combines_mutants_of_one_function():
+    # line coverage can give mutants of one function disjoint tests, but only one of them can be active
+    tests_by_key = {
+        'a.x_f__mutmut_1': {'test_first_line'},
+        'a.x_f__mutmut_2': {'test_second_line'},
+        'a.x_g__mutmut_1': {'test_g'},
+    }
+    assert plan_bundles(tests_by_key, max_bundle_size=3) == [
+        ['a.x_f__mutmut_1', 'a.x_g__mutmut_1'],
+        ['a.x_f__mutmut_2'],
+    ]
+
+
+def test_attribute_failures_of_a_bundle():
+    tests_by_key = {'f__mutmut_1': {'test_f'}, 'g__mutmut_1': {'test_g1', 'test_g2'}}
+    assert attribute_failures(tests_by_key, {'test_g2'}, exit_code=1) == {'f__mutmut_1': 0, 'g__mutmut_1': 1}
+    assert attribute_failures(tests_by_key, set(), exit_code=0) == {'f__mutmut_1': 0, 'g__mutmut_1': 0}
+    # can't tell which mutant caused these: the bundle has to be split
+    assert attribute_failures(tests_by_key, {'tests/test_broken.py'}, exit_code=1) is None
+    assert attribute_failures(tests_by_key, set(), exit_code=2) is None
+
+
+def test_sample_size():
+    assert sample_size('200', 1000) == 200
+    assert sample_size('0.1', 1000) == 100
+    assert sample_size('10%', 1000) == 100
+    assert sample_size('5000', 1000) == 1000
+    # a tiny fraction still samples something
+    assert sample_size('0.001', 10) == 1
+    with pytest.raises(ValueError):
+        sample_size('0', 1000)
+
+
+def test_stratified_order_keeps_strata_proportional_in_every_prefix():
+    import random
+    items = [('a', i) for i in range(30)] + [('b', i) for i in range(10)]
+    ordered = stratified_order(items, lambda x: x[0], random.Random(0))
+    assert sorted(ordered) == sorted(items)
+    for size in (4, 8, 20):
+        assert abs(sum(x[0] == 'b' for x in ordered[:size]) - size / 4) <= 1
+    assert ordered == stratified_order(items, lambda x: x[0], random.Random(0))
+
+
+def test_wilson_interval_and_score_estimate():
+    low, high = wilson_interval(80, 100)
+    assert 0.70 < low < 0.8 < high < 0.88
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+    statuses = {'m1': 'killed', 'm2': None, 'm3': 'survived', 'm4': 'skipped'}
+    estimate = ScoreEstimate(['m1', 'm2', 'm3', 'm4'])
+    estimate.advance(statuses.get)
+    # m3 is not counted until m2, which comes before it in the sample, has a result
+    assert (estimate.detected, estimate.undetected) == (1, 0)
+    statuses['m2'] = 'no tests'
+    estimate.advance(statuses.get)
+    assert (estimate.detected, estimate.undetected) == (1, 2)
+    assert not estimate.is_precise_enough(0.9)
+
+
+def test_line_coverage_maps_executed_lines_to_mutants(tmp_path, monkeypatch):
+    (tmp_path / 'lc_target.py').write_text("""
+def x_f__mutmut_orig(n):
+    if n <= 1:
+        return n
+    return n - 1
+""".lstrip())
+    monkeypatch.syspath_prepend(str(tmp_path))
+    path = str(tmp_path / 'lc_target.py')
+    orig_functions = OrigFunctions(path, 'lc_target.py')
+    assert orig_functions.executable_lines_by_function == {'lc_target.x_f': {0, 1, 2, 3}}
+
+    collector = LineCollector([path])
+    collector.start()
+    try:
+        import lc_target
+        collector.take()
+        lc_target.x_f__mutmut_orig(1)
+        executed = {orig_functions.find(line) for _, line in collector.take()}
+    finally:
+        collector.stop()
+    assert executed == {('lc_target.x_f', 1), ('lc_target.x_f', 2)}
+
+    tests_by_line = {1: {'test_small'}, 2: {'test_small'}}
+    info = dict(function_line=10, body_line=11, start_line=12, end_line=12)
+    assert covering_tests(info, tests_by_line, {0, 1, 2, 3}) == {'test_small'}
+    # no test reaches the last line
+    assert covering_tests(dict(info, start_line=13, end_line=13), tests_by_line, {0, 1, 2, 3}) == set()
+    # a default value in the signature: line coverage can't tell
+    assert covering_tests(dict(info, start_line=10, end_line=10), tests_by_line, {0, 1, 2, 3}) is None
+
+
+def test_drop_stale_line_stats_of_changed_functions():
+    mutmut._reset_globals()
+    for function in ['a.x_changed', 'a.x_same', 'b.x_not_mutated']:
+        mutmut.tests_by_function_line[function][1].add('test_a')
+        mutmut.executable_lines_by_function[function] = {0, 1}
+        mutmut.line_stats_hash_by_function[function] = 'old'
+    mutmut.line_stats_hash_by_function['a.x_same'] = 'same'
+    # collected before the hashes were stored
+    mutmut.executable_lines_by_function['a.x_unhashed'] = {0, 1}
+
+    changed = drop_stale_line_stats({'a.x_changed': 'new', 'a.x_same': 'same', 'a.x_unhashed': 'new', 'a.x_new': 'new'})
+
+    assert changed == {'a.x_changed', 'a.x_unhashed'}
+    assert set(mutmut.tests_by_function_line) == {'a.x_same', 'b.x_not_mutated'}
+    assert set(mutmut.executable_lines_by_function) == {'a.x_same', 'b.x_not_mutated'}
+    assert mutmut.line_stats_hash_by_function == {'a.x_same': 'same', 'b.x_not_mutated': 'old'}
+    mutmut._reset_globals()
+
+
+def test_infection_probes_record_mutants_that_compute_another_value(monkeypatch):
+    source = """
+def foo(a, b):
+    return a + b > 0
+
+def bar(x):
+    return len(x) + 1
+""".strip()
+
+    mutated_code, mutant_names, mutation_info_by_name = mutate_file_contents('filename', source, infection_probes=True)
+    # the + of bar can't be probed, as evaluating it twice would call len() twice
+    assert [x for x in mutant_names if mutation_info_by_name[x]['infection_probe']] == [
+        'x_foo__mutmut_1', 'x_foo__mutmut_2', 'x_foo__mutmut_3', 'x_bar__mutmut_2',
+    ]
+
+    namespace = {'__name__': 'probed'}
+    exec(mutated_code, namespace)
+    monkeypatch.setenv('MUTANT_UNDER_TEST', 'probe')
+    take_infected()
+    # 5 + 0 == 5 - 0 and 5 > 0 == 5 >= 0, only the constant is another one
+    assert namespace['foo'](5, 0) is True
+    assert take_infected() == {'probed.x_foo__mutmut_3'}
+    assert namespace['foo'](1, -1) is False
+    assert take_infected() == {'probed.x_foo__mutmut_1', 'probed.x_foo__mutmut_2', 'probed.x_foo__mutmut_3'}
+    assert namespace['bar']('ab') == 3
+    assert take_infected() == {'probed.x_bar__mutmut_2'}
+
+    info = mutation_info_by_name['x_foo__mutmut_1']
+    assert infecting_tests(info, {'test_a', 'test_b', 'test_new'}, {'test_a'}, {'test_a', 'test_b'}) == {'test_a', 'test_new'}
+    assert infecting_tests(mutation_info_by_name['x_bar__mutmut_1'], {'test_a', 'test_b'}, set(), {'test_a', 'test_b'}) == {'test_a', 'test_b'}
+
+
+def test_drop_stale_infections_of_changed_probe_copies():
+    mutmut._reset_globals()
+    mutmut.tests_by_mangled_function_name.update({'a.x_changed': {'test_a'}, 'a.x_same': {'test_b'}, 'a.x_new': {'test_c'}})
+    mutmut.infected_tests_by_key.update({'a.x_changed__mutmut_1': {'test_a'}, 'a.x_same__mutmut_1': {'test_a', 'test_b'}})
+    mutmut.probed_tests.update({'test_a', 'test_b', 'test_c'})
+    mutmut.probe_hash_by_function.update({'a.x_changed': 'old', 'a.x_same': 'same'})
+
+    # test_c ran with the probes of other functions, but not with those of the new function
+    changed = drop_stale_infections({'a.x_changed': 'new', 'a.x_same': 'same', 'a.x_new': 'new'})
+
+    assert changed == {'a.x_changed', 'a.x_new'}
+    assert dict(mutmut.infected_tests_by_key) == {'a.x_same__mutmut_1': {'test_a', 'test_b'}}
+    assert mutmut.probed_tests == {'test_b'}
+    assert mutmut.probe_hash_by_function == {'a.x_changed': 'new', 'a.x_same': 'same', 'a.x_new': 'new'}
+    mutmut._reset_globals()
+
+
+def test_mutant_index(tmp_path):
+    source = "def f():\n    return 'ä'\n\nclass A:\n    def g(self):\n        return 1\n".encode()
+    ranges = function_byte_ranges(ast.parse(source), source)
+    assert source[slice(*ranges['f'])] == "def f():\n    return 'ä'".encode()
+    assert source[slice(*ranges['g'])] == b'    def g(self):\n        return 1'
+
+    index = MutantIndex(tmp_path / 'index.sqlite')
+    index.replace_files({
+        'a.py': [IndexEntry(name='a.x_f__mutmut_1', path='a.py', function='a.x_f', start_line=2, end_line=2, start_byte=0, end_byte=10)],
+        'b.py': [IndexEntry(name='b.x_g__mutmut_1', path='b.py', function='b.x_g')],
+    })
+    index.set_exit_codes({'a.x_f__mutmut_1': 0, 'not.indexed__mutmut_1': 1})
+    assert index.get('a.x_f__mutmut_1') == IndexEntry(name='a.x_f__mutmut_1', path='a.py', function='a.x_f', start_line=2, end_line=2, exit_code=0, start_byte=0, end_byte=10)
+    assert index.get('not.indexed__mutmut_1') is None
+
+    # regenerating a file replaces its mutants, and leaves the other files alone
+    index.replace_files({'a.py': [IndexEntry(name='a.x_f__mutmut_2', path='a.py', function='a.x_f')]})
+    assert [x.name for x in index.entries()] == ['a.x_f__mutmut_2', 'b.x_g__mutmut_1']
+    index.replace_files({'a.py': []}, complete=True)
+    assert list(index.entries()) == []
+    index.close()
+
+
+def test_forget_mutants_of_linked_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'mutants' / 'src').mkdir(parents=True)
+    (tmp_path / 'mutants' / 'src' / 'linked.py.meta').write_text('{}')
+    (tmp_path / 'mutants' / 'src' / 'mutated.py.meta').write_text('{}')
+    index = MutantIndex()
+    index.replace_files({
+        'src/linked.py': [IndexEntry(name='linked.x_f__mutmut_1', path='src/linked.py', function='linked.x_f')],
+        'src/mutated.py': [IndexEntry(name='mutated.x_f__mutmut_1', path='src/mutated.py', function='mutated.x_f')],
+    })
+    index.close()
+
+    forget_mutants(['src/linked.py'])
+
+    assert not (tmp_path / 'mutants' / 'src' / 'linked.py.meta').exists()
+    assert (tmp_path / 'mutants' / 'src' / 'mutated.py.meta').exists()
+    index = MutantIndex()
+    assert [entry.name for entry in index.entries()] == ['mutated.x_f__mutmut_1']
+    index.close()
+
+
+def test_function_copies_are_sliced_by_byte_range(tmp_path):
+    source = """
+class Foo:
+    def bar(self):
+        \"""
+Docstring
+\"""
+        return 1  # the end
+""".strip()
+    mutants_source, mutant_names, _ = mutate_file_contents('filename', source)
+    (tmp_path / 'mutated.py').write_text(mutants_source)
+    mutated = mutants_source.encode()
+    ranges = function_byte_ranges(ast.parse(mutated), mutated)
+    entry = IndexEntry(name=f'foo.{mutant_names[0]}', path='foo.py', function=f'foo.x{CLASS_NAME_SEPARATOR}Foo{CLASS_NAME_SEPARATOR}bar')
+    assert read_function_copies(entry, tmp_path / 'mutated.py') is None
+    entry.start_byte, entry.end_byte = ranges[mutant_names[0]]
+    entry.orig_start_byte, entry.orig_end_byte = ranges[f'x{CLASS_NAME_SEPARATOR}Foo{CLASS_NAME_SEPARATOR}bar__mutmut_orig']
+
+    orig_code, mutant_code = read_function_copies(entry, tmp_path / 'mutated.py')
+    # as it is in the source, so apply can replace it there
+    assert orig_code == source[len('class Foo:\n'):]
+    assert dedent_function(mutant_code) == 'def bar(self):\n    \"""\nDocstring\n\"""\n    return 2  # the end'
+
+    # ranges of another version of the file
+    entry.start_byte += 1
+    assert read_function_copies(entry, tmp_path / 'mutated.py') is None
+
+
+def test_precompile_writes_the_bytecode_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'pycache_prefix', str(tmp_path / 'pycache'))
+    path = tmp_path / 'mutants' / 'mutated.py'
+    path.parent.mkdir()
+    path.write_text('x = 1\n')
+    cache_path = importlib.util.cache_from_source(str(path))
+    assert cache_path.startswith(str(tmp_path / 'pycache'))
+
+    monkeypatch.setattr(sys, 'dont_write_bytecode', True)
+    precompile(path)
+    assert not os.path.exists(cache_path)
+
+    monkeypatch.setattr(sys, 'dont_write_bytecode', False)
+    precompile(path)
+    assert os.path.exists(cache_path)
+    assert not (path.parent / '__pycache__').exists()
+
+
+def test_preload_modules(tmp_path, monkeypatch):
+    assert is_preloadable('my_lib.cache', allowlist=[], denylist=[])
+    assert is_preloadable('my_lib.cache', allowlist=['my_lib'], denylist=['my_lib.other*'])
+    assert not is_preloadable('my_lib.cache', allowlist=['other_lib'], denylist=[])
+    assert not is_preloadable('my_lib.cache', allowlist=['my_lib'], denylist=['my_lib.cache'])
+    assert not is_preloadable('my_lib.cache.sub', allowlist=[], denylist=['my_lib.cache'])
+
+    (tmp_path / 'mutants' / 'tests').mkdir(parents=True)
+    (tmp_path / 'mutants' / 'tests' / 'test_preloaded.py').write_text('x = 1\n')
+    (tmp_path / 'mutants' / 'tests' / 'test_denied.py').write_text('x = 2\n')
+    (tmp_path / 'mutants' / 'tests' / 'test_broken.py').write_text('raise ValueError\n')
+    monkeypatch.syspath_prepend(str(tmp_path / 'mutants' / 'tests'))
+    monkeypatch.chdir(tmp_path)
+    for name in ('test_preloaded', 'test_denied', 'test_broken'):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    errors = preload_modules(['test_preloaded', 'test_denied', 'test_broken'], allowlist=[], denylist=['test_denied'])
+    assert set(errors) == {'test_broken'}
+    assert 'test_preloaded' in sys.modules
+    assert 'test_denied' not in sys.modules
+
+    # imported under another name by an earlier test run: matched by its path under mutants/
+    import test_denied
+    assert unload_denied(['tests.test_denied']) == ['test_denied']
+    assert 'test_denied' not in sys.modules
+    assert sys.modules.pop('test_preloaded').x == 1
+
+
 def test_from_future_still_first():
     source = """
 from __future__ import annotations
@@ -547,6 +1008,27 @@ def test_run_forced_fail_test_with_all_tests_passing(_start, _stop, _dump_output
     assert 'FAILED: Unable to force test failures' in out
 
 
+@patch.object(mutmut, 'config', Mock(debug=False))
+def test_catch_output_catches_file_descriptor_writes(capfd):
+    with CatchOutput() as catcher:
+        print('from print')
+        os.write(1, b'from fd 1\n')
+        os.write(2, b'from fd 2\n')
+        assert capfd.readouterr().out == ''
+        stream = sys.stdout
+        catcher.dump_output()
+
+    out, err = capfd.readouterr()
+    assert out == 'from print\nfrom fd 1\nfrom fd 2\n'
+    assert stream.closed
+
+    with CatchOutput(discard=True) as catcher:
+        os.write(1, b'discarded\n')
+        catcher.dump_output()
+
+    assert capfd.readouterr() == ('', '')
+
+
 def _mocked_runner_run_forced_failed(return_value=None, side_effect=None):
     runner = Mock()
     runner.run_forced_fail = Mock(
@@ -0,0 +1,145 @@
+import math
+import re
+import subprocess
+from typing import Dict, Any, List, Set
+
+from diff_utils import lines_for_path, match_path
+from prompt_builder import mutated_line_number
+
+# How likely a surviving mutant of each kind points at a real gap in the tests
+OPERATOR_WEIGHTS = {
+    "comparison": 1.0,
+    "boolean": 0.9,
+    "arithmetic": 0.8,
+    "return_value": 0.6,
+    "number": 0.5,
+    "call_argument": 0.4,
+    "string": 0.2,
+    "other": 0.3,
+}
+
+# Category of each mutmut operator. operator_swap_op covers comparisons, arithmetic and boolean operators alike,
+# so those survivors are still classified from the mutation diff.
+OPERATOR_CATEGORIES = {
+    "operator_number": "number",
+    "operator_string": "string",
+    "operator_string_methods_swap": "string",
+    "operator_name": "boolean",
+    "operator_remove_unary_ops": "boolean",
+    "operator_assignment": "return_value",
+    "operator_lambda": "return_value",
+    "operator_augmented_assignment": "arithmetic",
+    "operator_arg_removal": "call_argument",
+    "operator_dict_arguments": "call_argument",
+    "operator_keywords": "other",
+    "operator_match": "other",
+}
+
+_COMPARISON_RE = re.compile(r"<=|>=|==|!=|<|>|\bis\b|\bin\b")
+_BOOLEAN_RE = re.compile(r"\b(and|or|not|True|False)\b")
+_ARITHMETIC_RE = re.compile(r"[-+*/%&|^]|<<|>>|\*\*|//")
+_NUMBER_RE = re.compile(r"\b\d+(\.\d+)?\b")
+_STRING_RE = re.compile(r"XX|['\"]")
+
+
+def _changed_tokens(original: str, mutated: str) -> str:
+    a, b = original.split(), mutated.split()
+    return " ".join([x for x in a if x not in b] + [x for x in b if x not in a])
+
+
+def classify_mutation(rec: Dict[str, Any]) -> str:
+    """Category of the mutation operator, guessed from the removed/added lines of the mutation diff when needed."""
+    if rec.get("operator") in OPERATOR_CATEGORIES:
+        return OPERATOR_CATEGORIES[rec["operator"]]
+
+    original = mutated = ""
+    for line in rec.get("mutation_desc", "").splitlines():
+        if line.startswith('-') and not line.startswith('---'):
+            original = line[1:].strip()
+        elif line.startswith('+') and not line.startswith('+++'):
+            mutated = line[1:].strip()
+    if not original and not mutated:
+        return "other"
+
+    changed = _changed_tokens(original, mutated)
+    if "None" in mutated and "None" not in original:
+        return "return_value" if original.startswith("return") else "call_argument"
+    if _STRING_RE.search(changed):
+        return "string"
+    if _COMPARISON_RE.search(changed):
+        return "comparison"
+    if _BOOLEAN_RE.search(changed):
+        return "boolean"
+    if _NUMBER_RE.search(changed):
+        return "number"
+    if _ARITHMETIC_RE.search(changed):
+        return "arithmetic"
+    if original.startswith(("return", "break", "continue")):
+        return "return_value"
+    return "other"
+
+
+def file_churn(paths: Set[str], repo_path: str, max_commits: int = 200) -> Dict[str, int]:
+    """Lines added plus deleted per file over the last `max_commits` commits of `repo_path`, the checkout mutmut ran
+    in, read with a single `git log`.
+
+    Churn is tracked per file: git cannot attribute history to functions cheaply, and survivors in a busy file
+    are a good enough proxy for survivors in a busy function."""
+    if not paths:
+        return {}
+    try:
+        output = subprocess.run(
+            ["git", "log", f"-{max_commits}", "--numstat", "--format="],
+            cwd=repo_path, capture_output=True, text=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    churn: Dict[str, int] = {}
+    for line in output.splitlines():
+        parts = line.split("\t")
+        if len(parts) != 3 or not parts[0].isdigit() or not parts[1].isdigit():
+            continue
+        churn[parts[2]] = churn.get(parts[2], 0) + int(parts[0]) + int(parts[1])
+
+    # git reports paths relative to the repository root, survivors relative to the mutmut working directory
+    result = {}
+    for path in paths:
+        churn_path = match_path(churn, path)
+        if churn_path is not None:
+            result[path] = churn[churn_path]
+    return result
+
+
+def score_survivor(rec: Dict[str, Any], changed_lines: Dict[str, Set[int]], churn: Dict[str, int], max_churn: int) -> float:
+    score = 0.0
+
+    line = mutated_line_number(rec)
+    if line is not None and line in lines_for_path(changed_lines, rec.get("source_file", "")):
+        score += 3.0
+
+    # Covered survivors show a weak assertion, which is what the explanation can fix best.
+    # Uncovered ones still matter, but they are explained with the no-coverage prompt.
+    score += 1.0 if rec.get("tests") else 0.5
+
+    score += OPERATOR_WEIGHTS[classify_mutation(rec)]
+
+    if max_churn:
+        score += math.log1p(churn.get(rec.get("source_file", ""), 0)) / math.log1p(max_churn)
+
+    return round(score, 3)
+
+
+def prioritize(records: List[Dict[str, Any]], changed_lines: Dict[str, Set[int]] = None, repo_path: str = None) -> List[Dict[str, Any]]:
+    """Return `records` sorted by descending priority, with the score stored under "priority".
+
+    Churn only counts with the `repo_path` of the checkout mutmut ran in."""
+    changed_lines = changed_lines or {}
+    churn = file_churn({r.get("source_file", "") for r in records}, repo_path) if repo_path else {}
+    max_churn = max(churn.values(), default=0)
+
+    for rec in records:
+        rec["priority"] = score_survivor(rec, changed_lines, churn, max_churn)
+
+    # stable sort keeps file order between equally ranked survivors
+    return sorted(records, key=lambda r: -r["priority"])
@@ -0,0 +1,199 @@
+import ast
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+DEFAULT_TOKEN_BUDGET = 768
+
+# Roughly how code tokenizers split source: identifiers/numbers, single punctuation characters
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+INSTRUCTIONS = (
+    "You are a mutation testing expert. Analyze the mutation and suggest how to detect it with a test.\n"
+    "Reply ONLY in valid JSON format using these keys:\n"
+    "- why: explain why this mutant survived\n"
+    "- how to kill: describe what kind of test or code change would kill this mutant\n"
+    "- example_test: write a complete pytest-style test function that would kill this mutant\n"
+)
+
+
+def count_tokens(text: str) -> int:
+    return len(_TOKEN_RE.findall(text))
+
+
+def mutated_line_number(rec: Dict[str, Any]) -> Optional[int]:
+    if rec.get("start_line"):
+        return int(rec["start_line"])
+    match = re.search(r"Line (\d+):", rec.get("mutation_desc", ""))
+    return int(match.group(1)) if match else None
+
+
+def diff_lines(mutation_desc: str) -> Tuple[List[str], List[str]]:
+    removed, added = [], []
+    for line in mutation_desc.splitlines():
+        if line.startswith('-') and not line.startswith('---'):
+            removed.append(line[1:].rstrip())
+        elif line.startswith('+') and not line.startswith('+++'):
+            added.append(line[1:].rstrip())
+    return removed, added
+
+
+def diff_original_context(mutation_desc: str) -> Tuple[List[str], int]:
+    """Original-side lines of the diff in `mutation_desc` and the index of the first mutated line among them."""
+    lines, focus = [], None
+    for line in mutation_desc.splitlines():
+        if line.startswith('-') and not line.startswith('---'):
+            if focus is None:
+                focus = len(lines)
+            lines.append(line[1:])
+        elif line.startswith(' '):
+            lines.append(line[1:])
+    return lines, focus if focus is not None else 0
+
+
+def enclosing_function(source: str, line: int) -> Optional[Tuple[str, int, List[str]]]:
+    """Return (name, first line number, source lines) of the innermost function containing `line`."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    best = None
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.lineno <= line <= node.end_lineno:
+            if best is None or node.lineno >= best.lineno:
+                best = node
+    if best is None:
+        return None
+    lines = source.splitlines()[best.lineno - 1:best.end_lineno]
+    return best.name, best.lineno, lines
+
+
+def fit_lines_around(lines: List[str], first_lineno: int, focus: int, budget: int) -> List[str]:
+    """Keep the signature, the mutated line, and the lines closest to it that fit in `budget` tokens.
+
+    Gaps between kept lines are shown as "..."."""
+    if not lines:
+        return []
+    costs = [count_tokens(x) + 1 for x in lines]
+    focus_idx = min(max(focus - first_lineno, 0), len(lines) - 1)
+    keep = {0, focus_idx}
+    used = sum(costs[i] for i in keep)
+    for idx in sorted(range(len(lines)), key=lambda i: (abs(i - focus_idx), i)):
+        if idx in keep:
+            continue
+        if used + costs[idx] > budget:
+            break
+        keep.add(idx)
+        used += costs[idx]
+
+    result = []
+    prev = None
+    for idx in sorted(keep):
+        if prev is not None and idx != prev + 1:
+            result.append("    ...")
+        result.append(lines[idx])
+        prev = idx
+    if prev != len(lines) - 1:
+        result.append("    ...")
+    return result
+
+
+def test_relevance(test: Dict[str, Any], function_name: str) -> Tuple[int, int]:
+    """Sort key for covering tests: tests that mention the mutated function by name are the best candidates to extend."""
+    name = test.get("test_name", "")
+    code = test.get("test_code") or ""
+    return (
+        0 if function_name and function_name in name else 1 if function_name and function_name in code else 2,
+        count_tokens(code),
+    )
+
+
+def nearest_assertions(test_code: str, function_name: str, budget: int) -> List[str]:
+    """Signature of the test plus its assertions, preferring the ones that reference the mutated function."""
+    lines = test_code.splitlines()
+    if not lines:
+        return []
+    result = [lines[0].strip()]
+    used = count_tokens(result[0])
+    asserts = [x.strip() for x in lines[1:] if x.strip().startswith(("assert", "self.assert", "pytest.raises", "with pytest.raises"))]
+    asserts.sort(key=lambda x: 0 if function_name and function_name in x else 1)
+    for line in asserts:
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            break
+        result.append("    " + line)
+        used += cost
+    return result
+
+
+class PromptBuilder:
+    """Build explainer prompts that stay inside a token budget.
+
+    Context is added in order of usefulness: the mutation itself, the mutated function trimmed around the
+    mutated line, and then the covering tests most likely to be extended into a killing test, each reduced to
+    its signature and nearest assertions."""
+
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, max_tests: int = 3):
+        self.token_budget = token_budget
+        self.max_tests = max_tests
+
+    def read_source(self, path: str) -> Optional[str]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def build(self, rec: Dict[str, Any]) -> str:
+        parts = [INSTRUCTIONS]
+        line = mutated_line_number(rec)
+        removed, added = diff_lines(rec.get("mutation_desc", ""))
+        if not removed and not added and (rec.get("original_snippet") or rec.get("mutated_snippet")):
+            removed, added = [rec.get("original_snippet", "")], [rec.get("mutated_snippet", "")]
+
+        location = f"{rec.get('source_file', 'unknown')}" + (f", line {line}" if line else "")
+        mutation = [f"File: {location}", "Mutation:"]
+        mutation += [f"- {x.strip()}" for x in removed] + [f"+ {x.strip()}" for x in added]
+        parts.append("\n".join(mutation) + "\n")
+
+        remaining = self.token_budget - sum(count_tokens(x) for x in parts)
+
+        function_name = ""
+        source = self.read_source(rec.get("source_file", "")) if line else None
+        func = enclosing_function(source, line) if source else None
+        if func:
+            function_name, first_lineno, func_lines = func
+            section = fit_lines_around(func_lines, first_lineno, line, budget=max(remaining * 3 // 5, 0))
+            if section:
+                text = "Mutated function (original code):\n" + "\n".join(section) + "\n"
+                parts.append(text)
+                remaining -= count_tokens(text)
+        else:
+            # source not available here (e.g. the explainer runs outside the checkout): use the diff context
+            context, focus = diff_original_context(rec.get("mutation_desc", ""))
+            if context:
+                section = fit_lines_around(context, 0, focus, budget=max(remaining * 3 // 5, 0))
+                text = "Original code around the mutation:\n" + "\n".join(section) + "\n"
+                parts.append(text)
+                remaining -= count_tokens(text)
+
+        tests = [t for t in rec.get("tests", []) if t.get("test_name")]
+        if not tests:
+            text = "No existing tests cover this code path. The example test must call this code directly.\n"
+            parts.append(text)
+            return "\n".join(parts)
+
+        tests = sorted(tests, key=lambda t: test_relevance(t, function_name))[:self.max_tests]
+        header = "Existing tests that reach this code but do not kill the mutant:\n"
+        remaining -= count_tokens(header)
+        per_test = max(remaining // len(tests), 0)
+        test_parts = []
+        for t in tests:
+            snippet = nearest_assertions(t.get("test_code") or "", function_name, per_test)
+            entry = f"# {t['test_name']}\n" + "\n".join(snippet)
+            if test_parts and count_tokens(entry) > remaining:
+                break
+            test_parts.append(entry)
+            remaining -= count_tokens(entry)
+        parts.append(header + "\n".join(test_parts) + "\n")
+
+        return "\n".join(parts)
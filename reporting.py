@@ -0,0 +1,373 @@
+import argparse
+import html
+import json
+import os
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Optional, TextIO
+from xml.sax.saxutils import quoteattr, escape
+
+from mutmut.__main__ import status_by_exit_code, mangled_name_from_mutant_name
+
+from generate_report import iter_records, to_diagnostic, summarize_record
+
+# Statuses that point at a gap in the tests, and how loudly each format reports them
+PROBLEM_LEVELS = {
+    "survived": "warning",
+    "no tests": "warning",
+    "not infected": "warning",
+    "timeout": "note",
+    "suspicious": "note",
+}
+UNDETECTED_STATUSES = ("survived", "no tests", "not infected")
+NOT_RUN_STATUSES = {"skipped", "equivalent", "not checked", "check was interrupted by user"}
+
+EXPLANATION_KEYS = ("why", "how to kill", "example_test", "explanation_status")
+
+
+@dataclass
+class MutantResult:
+    name: str
+    source_file: str
+    exit_code: Optional[int]
+    status: str
+    info: Dict[str, Any] = field(default_factory=dict)
+    tests: List[str] = field(default_factory=list)
+    explanation: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def start_line(self) -> int:
+        return self.info.get("start_line") or 1
+
+    def to_record(self) -> Dict[str, Any]:
+        """Same shape as an entry of survived_mutants(_with_explanations).json"""
+        record = {
+            "mutant_name": self.name,
+            "source_file": self.source_file,
+            "status": self.status,
+            "mutation_desc": self.info.get("mutation_desc", ""),
+            "operator": self.info.get("operator", ""),
+            "start_line": self.info.get("start_line"),
+            "start_column": self.info.get("start_column"),
+            "end_line": self.info.get("end_line"),
+            "end_column": self.info.get("end_column"),
+            "original_snippet": self.info.get("original_snippet", ""),
+            "mutated_snippet": self.info.get("mutated_snippet", ""),
+            "tests": [{"test_name": t} for t in self.tests],
+        }
+        record.update(self.explanation)
+        return record
+
+
+class ResultIndex:
+    """Results of every mutant of a run, read once from the .meta files and mutmut-stats.json in `mutants_dir`.
+
+    Results are ordered by source file and line, and counts per status are kept overall and per file, so every
+    emitter can write its headers before the results are streamed through it."""
+
+    def __init__(self, mutants_dir: str = "mutants"):
+        self.mutants_dir = mutants_dir
+        self.results: List[MutantResult] = []
+        self.counts: Counter = Counter()
+        self.counts_by_file: Dict[str, Counter] = defaultdict(Counter)
+
+    def load(self) -> "ResultIndex":
+        tests_by_function = self._load_tests()
+        meta_paths = []
+        for root, dirs, files in os.walk(self.mutants_dir):
+            dirs.sort()
+            meta_paths += [os.path.join(root, f) for f in sorted(files) if f.endswith(".py.meta")]
+
+        for meta_path in meta_paths:
+            source_file = os.path.relpath(meta_path, self.mutants_dir)[:-len(".meta")].replace(os.sep, "/")
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            info_by_key = meta.get("mutation_info_by_key", {})
+            results = []
+            for name, exit_code in meta.get("exit_code_by_key", {}).items():
+                results.append(MutantResult(
+                    name=name,
+                    source_file=source_file,
+                    exit_code=exit_code,
+                    status=status_by_exit_code.get(exit_code, "suspicious"),
+                    info=info_by_key.get(name, {}),
+                    tests=sorted(tests_by_function.get(mangled_name_from_mutant_name(name), [])),
+                ))
+            results.sort(key=lambda r: (r.start_line, r.name))
+            for r in results:
+                self.counts[r.status] += 1
+                self.counts_by_file[source_file][r.status] += 1
+            self.results += results
+        return self
+
+    def _load_tests(self) -> Dict[str, List[str]]:
+        try:
+            with open(os.path.join(self.mutants_dir, "mutmut-stats.json"), encoding="utf-8") as f:
+                return json.load(f).get("tests_by_mangled_function_name", {})
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def attach_explanations(self, path: str) -> None:
+        """Add the explainer's answers (JSON array or .jsonl journal) to the matching results."""
+        by_name = {r.name: r for r in self.results}
+        for record in iter_records(path):
+            result = by_name.get(record.get("mutant_name"))
+            if result is not None:
+                result.explanation = {k: record[k] for k in EXPLANATION_KEYS if k in record}
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+
+class Emitter(ABC):
+    """Writes one report format while results are streamed through it: begin, emit per result, end."""
+
+    def __init__(self, f: TextIO):
+        self.f = f
+
+    def begin(self, index: ResultIndex) -> None:
+        pass
+
+    @abstractmethod
+    def emit(self, result: MutantResult) -> None:
+        """Write one result."""
+
+    def end(self, index: ResultIndex) -> None:
+        pass
+
+
+class RdjsonEmitter(Emitter):
+    """reviewdog diagnostics for survivors: one per line with `lines` (rdjsonl), otherwise an rdjson document."""
+
+    def __init__(self, f: TextIO, lines: bool = True):
+        super().__init__(f)
+        self.lines = lines
+        self.count = 0
+
+    def begin(self, index):
+        if not self.lines:
+            self.f.write('{\n  "diagnostics": [')
+
+    def emit(self, result):
+        if result.status not in PROBLEM_LEVELS:
+            return
+        diagnostic = to_diagnostic(result.to_record())
+        diagnostic["severity"] = PROBLEM_LEVELS[result.status].upper().replace("NOTE", "INFO")
+        text = json.dumps(diagnostic, ensure_ascii=False)
+        if self.lines:
+            self.f.write(text + "\n")
+        else:
+            self.f.write((",\n    " if self.count else "\n    ") + text)
+        self.count += 1
+
+    def end(self, index):
+        if not self.lines:
+            self.f.write("\n  ]\n}\n")
+
+
+SARIF_RULES = {
+    "survived": ("survived-mutant", "A mutant survived: no test failed when this code was changed"),
+    "no tests": ("untested-mutant", "No test covers the mutated code"),
+    "not infected": ("uninfected-mutant", "The tests reach the mutated code, but it never computes another value in them"),
+    "timeout": ("timeout-mutant", "The tests timed out on the mutated code"),
+    "suspicious": ("suspicious-mutant", "The tests were much slower on the mutated code"),
+}
+
+
+class SarifEmitter(Emitter):
+    def __init__(self, f: TextIO):
+        super().__init__(f)
+        self.count = 0
+
+    def begin(self, index):
+        rules = [
+            {"id": rule_id, "shortDescription": {"text": text}}
+            for rule_id, text in SARIF_RULES.values()
+        ]
+        tool = {"driver": {"name": "CAMILA", "informationUri": "https://github.com/boxed/mutmut", "rules": rules}}
+        self.f.write('{"$schema": "https://json.schemastore.org/sarif-2.1.0.json", "version": "2.1.0", '
+                     '"runs": [{"tool": ' + json.dumps(tool) + ', "results": [')
+
+    def emit(self, result):
+        if result.status not in PROBLEM_LEVELS:
+            return
+        record = result.to_record()
+        start_line = result.start_line
+        region = {"startLine": start_line, "endLine": record["end_line"] or start_line}
+        if record["start_column"] is not None:
+            region["startColumn"] = record["start_column"] + 1
+        if record["end_column"] is not None:
+            region["endColumn"] = record["end_column"] + 1
+
+        text = f"{result.name}: {summarize_record(record)}"
+        if result.explanation.get("why"):
+            text += f"\nWhy: {result.explanation['why']}"
+        if result.explanation.get("how to kill"):
+            text += f"\nHow to kill: {result.explanation['how to kill']}"
+
+        sarif_result = {
+            "ruleId": SARIF_RULES[result.status][0],
+            "level": PROBLEM_LEVELS[result.status],
+            "message": {"text": text},
+            "locations": [{"physicalLocation": {
+                "artifactLocation": {"uri": result.source_file},
+                "region": region,
+            }}],
+            "properties": {"mutant": result.name, "operator": record["operator"], "tests": len(result.tests)},
+        }
+        self.f.write(("," if self.count else "") + "\n" + json.dumps(sarif_result, ensure_ascii=False))
+        self.count += 1
+
+    def end(self, index):
+        self.f.write("\n]}]}\n")
+
+
+class JUnitEmitter(Emitter):
+    """One test suite per source file and one test case per mutant: survivors fail, mutants that were not run are skipped."""
+
+    def __init__(self, f: TextIO):
+        super().__init__(f)
+        self.current_file = None
+
+    @staticmethod
+    def _totals(counts: Counter) -> str:
+        failures = sum(counts[s] for s in UNDETECTED_STATUSES)
+        skipped = sum(counts[s] for s in NOT_RUN_STATUSES)
+        return f'tests="{sum(counts.values())}" failures="{failures}" errors="0" skipped="{skipped}"'
+
+    def begin(self, index):
+        self.f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        self.f.write(f'<testsuites name="mutmut" {self._totals(index.counts)}>\n')
+        self.index = index
+
+    def emit(self, result):
+        if result.source_file != self.current_file:
+            if self.current_file is not None:
+                self.f.write('  </testsuite>\n')
+            self.current_file = result.source_file
+            self.f.write(f'  <testsuite name={quoteattr(result.source_file)} {self._totals(self.index.counts_by_file[result.source_file])}>\n')
+
+        case = f'    <testcase classname={quoteattr(result.source_file)} name={quoteattr(result.name)}'
+        if result.status in UNDETECTED_STATUSES:
+            record = result.to_record()
+            self.f.write(f'{case}>\n      <failure message={quoteattr(result.status)}>{escape(summarize_record(record))}</failure>\n    </testcase>\n')
+        elif result.status in NOT_RUN_STATUSES:
+            self.f.write(f'{case}>\n      <skipped message={quoteattr(result.status)}/>\n    </testcase>\n')
+        else:
+            self.f.write(f'{case}/>\n')
+
+    def end(self, index):
+        if self.current_file is not None:
+            self.f.write('  </testsuite>\n')
+        self.f.write('</testsuites>\n')
+
+
+HTML_STYLE = """
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; margin-bottom: 2em; }
+td, th { border: 1px solid #ccc; padding: 4px 8px; text-align: left; vertical-align: top; }
+code { white-space: pre-wrap; }
+.survived, .no-tests, .not-infected { background: #fdd; }
+.killed { background: #dfd; }
+.timeout, .suspicious { background: #ffd; }
+"""
+
+
+class HtmlEmitter(Emitter):
+    """Static dashboard: totals, a table per source file, and a row per mutant."""
+
+    def begin(self, index):
+        total = len(index) or 1
+        killed = index.counts["killed"]
+        self.f.write(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Mutation testing report</title>'
+                     f'<style>{HTML_STYLE}</style></head><body>\n')
+        self.f.write(f'<h1>Mutation testing report</h1>\n<p>{len(index)} mutants, {killed} killed ({100 * killed / total:.1f}%)</p>\n')
+        self.f.write('<table><tr><th>Status</th><th>Mutants</th></tr>\n')
+        for status, count in index.counts.most_common():
+            self.f.write(f'<tr class="{self._css(status)}"><td>{html.escape(status)}</td><td>{count}</td></tr>\n')
+        self.f.write('</table>\n')
+        self.current_file = None
+
+    @staticmethod
+    def _css(status: str) -> str:
+        return status.replace(" ", "-")
+
+    def emit(self, result):
+        if result.source_file != self.current_file:
+            if self.current_file is not None:
+                self.f.write('</table>\n')
+            self.current_file = result.source_file
+            self.f.write(f'<h2>{html.escape(result.source_file)}</h2>\n'
+                         '<table><tr><th>Line</th><th>Mutant</th><th>Status</th><th>Change</th><th>Tests</th><th>Explanation</th></tr>\n')
+
+        record = result.to_record()
+        explanation = ""
+        if result.explanation.get("why"):
+            explanation = f'<details><summary>{html.escape(str(result.explanation["why"]))}</summary>' \
+                          f'<code>{html.escape(str(result.explanation.get("how to kill", "")))}</code></details>'
+        self.f.write(
+            f'<tr class="{self._css(result.status)}"><td>{result.start_line}</td><td>{html.escape(result.name)}</td>'
+            f'<td>{html.escape(result.status)}</td><td><code>{html.escape(summarize_record(record))}</code></td>'
+            f'<td>{len(result.tests)}</td><td>{explanation}</td></tr>\n'
+        )
+
+    def end(self, index):
+        if self.current_file is not None:
+            self.f.write('</table>\n')
+        self.f.write('</body></html>\n')
+
+
+def render(index: ResultIndex, emitters: Iterable[Emitter]) -> None:
+    """Write every report in a single pass over the index."""
+    emitters = list(emitters)
+    for emitter in emitters:
+        emitter.begin(index)
+    for result in index:
+        for emitter in emitters:
+            emitter.emit(result)
+    for emitter in emitters:
+        emitter.end(index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write SARIF, JUnit XML, rdjson(l) and HTML reports from one mutmut run")
+    parser.add_argument("--mutants", default="mutants", help="mutmut's output directory with the .meta files and mutmut-stats.json")
+    parser.add_argument("--explanations", default=None, help="Explainer output (JSON array or .jsonl journal) to include")
+    parser.add_argument("--sarif", default=None)
+    parser.add_argument("--junit", default=None)
+    parser.add_argument("--rdjson", default=None, help="reviewdog report, line-delimited unless the path ends in .rdjson")
+    parser.add_argument("--html", default=None)
+    args = parser.parse_args()
+
+    index = ResultIndex(args.mutants).load()
+    if args.explanations and os.path.exists(args.explanations):
+        index.attach_explanations(args.explanations)
+
+    files = []
+    emitters = []
+    try:
+        for path, make in [
+            (args.sarif, SarifEmitter),
+            (args.junit, JUnitEmitter),
+            (args.rdjson, lambda f: RdjsonEmitter(f, lines=not args.rdjson.endswith(".rdjson"))),
+            (args.html, HtmlEmitter),
+        ]:
+            if path:
+                f = open(path, "w", encoding="utf-8")
+                files.append(f)
+                emitters.append(make(f))
+        render(index, emitters)
+    finally:
+        for f in files:
+            f.close()
+
+    summary = ", ".join(f"{count} {status}" for status, count in index.counts.most_common())
+    print(f"📝 Reported {len(index)} mutants ({summary}) in {len(emitters)} format(s)")
+
+
+if __name__ == "__main__":
+    main()
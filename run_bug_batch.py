@@ -0,0 +1,212 @@
+import argparse
+import csv
+import glob
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Optional, Tuple
+
+from reporting import ResultIndex
+
+BUGS_REPO_PATH = "BugsInPy"
+WORK_ROOT = "/tmp/bug-batch"
+
+# Statuses that count as detected / undetected for the mutation score. Skipped and unchecked mutants count as neither.
+DETECTED = ("killed", "timeout", "segfault", "suspicious")
+UNDETECTED = ("survived", "no tests", "not infected")
+
+COLUMNS = ["project", "bug_id", "status", "mutants", "killed", "survived", "no_tests", "timeout", "score", "seconds"]
+
+
+def discover_bugs(bugsinpy: str, projects: List[str] = None) -> List[Tuple[str, int]]:
+    """(project, bug id) for every BugsInPy/projects/*/bugs/* directory, in project and numeric bug order."""
+    bugs = []
+    for bug_dir in glob.glob(os.path.join(bugsinpy, "projects", "*", "bugs", "*")):
+        project = bug_dir.split(os.sep)[-3]
+        bug_id = os.path.basename(bug_dir)
+        if bug_id.isdigit() and (not projects or project in projects):
+            bugs.append((project, int(bug_id)))
+    return sorted(bugs)
+
+
+def read_info(path: str) -> Dict[str, str]:
+    """key="value" lines of a BugsInPy bug.info / project.info file."""
+    info = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                key, sep, value = line.partition("=")
+                if sep:
+                    info[key.strip()] = value.strip().strip('"')
+    except OSError:
+        pass
+    return info
+
+
+def tests_dir_for(test_file: str) -> str:
+    """Directory holding a bug's tests: the path up to the first test/tests component of its test file."""
+    parts = test_file.split("/")[:-1]
+    for i, part in enumerate(parts):
+        if part in ("test", "tests"):
+            return "/".join(parts[:i + 1])
+    return "/".join(parts) or "tests"
+
+
+def guess_layout(bugsinpy: str, project: str, bug_id: int) -> Tuple[Optional[str], str]:
+    """Code to mutate (a package directory or a top-level module) and tests directory of a bug,
+    from the files touched by its fix patch and its test_file."""
+    bug_dir = os.path.join(bugsinpy, "projects", project, "bugs", str(bug_id))
+    test_file = read_info(os.path.join(bug_dir, "bug.info")).get("test_file", "").split(";")[0]
+    tests_dir = tests_dir_for(test_file)
+
+    package_dir = None
+    try:
+        with open(os.path.join(bug_dir, "bug_patch.txt"), "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                match = re.match(r"\+\+\+ b/(\S+\.py)", line)
+                if match and not match.group(1).startswith(tests_dir + "/"):
+                    package_dir = match.group(1).split("/")[0]
+                    break
+    except OSError:
+        pass
+    return package_dir, tests_dir
+
+
+def summarize(mutants_dir: Optional[str]) -> Dict[str, Any]:
+    if mutants_dir is None:
+        return {}
+    index = ResultIndex(mutants_dir).load()
+    detected = sum(index.counts[s] for s in DETECTED)
+    undetected = sum(index.counts[s] for s in UNDETECTED)
+    return {
+        "mutants": len(index),
+        "killed": index.counts["killed"],
+        "survived": index.counts["survived"],
+        "no_tests": index.counts["no tests"],
+        "timeout": index.counts["timeout"],
+        "score": round(detected / (detected + undetected), 3) if detected + undetected else None,
+    }
+
+
+def find_mutants_dir(work_dir: str) -> Optional[str]:
+    for root, dirs, files in os.walk(work_dir):
+        if "mutmut-stats.json" in files:
+            return root
+        dirs[:] = [d for d in dirs if d != ".git"]
+    return None
+
+
+def run_job(project: str, bug_id: int, args) -> Dict[str, Any]:
+    """Check out and mutate one bug in its own work directory, with run_bug_test.py in a subprocess."""
+    job_dir = os.path.join(os.path.abspath(args.work_root), f"{project}-{bug_id}")
+    checkout_dir = os.path.join(job_dir, "checkout")
+    os.makedirs(job_dir, exist_ok=True)
+    row = {"project": project, "bug_id": bug_id}
+
+    package_dir, tests_dir = guess_layout(args.bugsinpy, project, bug_id)
+    if package_dir is None:
+        return {**row, "status": "no package dir", "seconds": 0}
+
+    cmd = [
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_bug_test.py"),
+        "--project", project,
+        "--bug-id", str(bug_id),
+        "--package-dir", package_dir,
+        "--tests-dir", tests_dir,
+        "--work-dir", checkout_dir,
+        "--bugsinpy", os.path.abspath(args.bugsinpy),
+        "--max-children", str(args.children_per_job),
+    ]
+    start = time.monotonic()
+    with open(os.path.join(job_dir, "run.log"), "w", encoding="utf-8") as log:
+        # its own process group, so a timeout also stops the mutmut run it started and that run's children
+        proc = subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+        try:
+            returncode = proc.wait(timeout=args.timeout)
+            status = "ok" if returncode == 0 else f"exit {returncode}"
+        except subprocess.TimeoutExpired:
+            os.killpg(proc.pid, signal.SIGKILL)
+            proc.wait()
+            status = "timeout"
+    row["status"] = status
+    row["seconds"] = round(time.monotonic() - start, 1)
+    row.update(summarize(find_mutants_dir(checkout_dir)))
+    return row
+
+
+def write_csv(rows: List[Dict[str, Any]], path: str) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def to_markdown(rows: List[Dict[str, Any]]) -> str:
+    lines = ["| " + " | ".join(COLUMNS) + " |", "|" + "---|" * len(COLUMNS)]
+    for row in rows:
+        lines.append("| " + " | ".join("" if row.get(c) is None else str(row.get(c)) for c in COLUMNS) + " |")
+    scores = [row["score"] for row in rows if row.get("score") is not None]
+    if scores:
+        lines.append("")
+        lines.append(f"Mean mutation score over {len(scores)} bug(s): {sum(scores) / len(scores):.3f}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run diff-based mutation testing over many BugsInPy bugs in parallel")
+    parser.add_argument("--bugsinpy", default=BUGS_REPO_PATH)
+    parser.add_argument("--projects", default=None, help="Comma-separated project names (default: all)")
+    parser.add_argument("--bugs", default=None, help="Comma-separated project:bug_id pairs, instead of discovering them")
+    parser.add_argument("--limit", type=int, default=None, help="Only run the first N bugs")
+    parser.add_argument("--work-root", default=WORK_ROOT, help="Each bug is checked out into its own directory under this one")
+    parser.add_argument("--cpus", type=int, default=os.cpu_count() or 1, help="CPU budget shared by all jobs")
+    parser.add_argument("--children-per-job", type=int, default=2, help="mutmut --max-children of each job")
+    parser.add_argument("--timeout", type=float, default=3600, help="Seconds before a job is killed")
+    parser.add_argument("--csv", default="bug_batch_results.csv")
+    parser.add_argument("--markdown", default="bug_batch_results.md")
+    args = parser.parse_args()
+
+    if args.bugs:
+        bugs = []
+        for pair in args.bugs.split(","):
+            project, _, bug_id = pair.strip().partition(":")
+            bugs.append((project, int(bug_id)))
+    else:
+        projects = [p.strip() for p in args.projects.split(",")] if args.projects else None
+        bugs = discover_bugs(args.bugsinpy, projects)
+    bugs = bugs[:args.limit] if args.limit else bugs
+    if not bugs:
+        print("❌ No bugs to run")
+        return
+
+    # jobs share the CPU budget: each one forks up to children_per_job mutant processes
+    args.children_per_job = max(1, min(args.children_per_job, args.cpus))
+    workers = max(1, args.cpus // args.children_per_job)
+    print(f"🧪 Running {len(bugs)} bug(s), {workers} at a time with {args.children_per_job} CPU(s) each")
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_job, project, bug_id, args): (project, bug_id) for project, bug_id in bugs}
+        for future in as_completed(futures):
+            project, bug_id = futures[future]
+            try:
+                row = future.result()
+            except Exception as e:
+                row = {"project": project, "bug_id": bug_id, "status": f"error: {e}"}
+            rows.append(row)
+            print(f"{'✅' if row['status'] == 'ok' else '❌'} {project} {bug_id}: {row['status']}, score {row.get('score')}")
+
+    rows.sort(key=lambda r: (r["project"], r["bug_id"]))
+    write_csv(rows, args.csv)
+    markdown = to_markdown(rows)
+    with open(args.markdown, "w", encoding="utf-8") as f:
+        f.write(markdown)
+    print(markdown)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,16 @@
+import argparse
 import subprocess
 import os
-import re
+
+from mutmut.diff_targeting import parse_changed_lines, save_changed_lines
 
 # === CONFIGURATION ===
 PROJECT = "PySnooper"
 BUG_ID = 1
+PACKAGE_DIR = "pysnooper"
 BUGS_REPO_PATH = "BugsInPy"
 WORK_DIR = "/tmp/bug-project"  # GitHub runner has access to this temp dir
 
-BUGSINPY_BIN = f"{BUGS_REPO_PATH}/framework/bin"
-
 def run_cmd(cmd, cwd=None):
     print(f"Running: {cmd}")
     result = subprocess.run(cmd, shell=True, cwd=cwd, capture_output=True, text=True)
@@ -18,44 +19,62 @@ def run_cmd(cmd, cwd=None):
         raise RuntimeError(f"Command failed: {cmd}")
     return result.stdout.strip()
 
-def extract_changed_lines_from_diff(diff_output):
-    changed_lines = set()
-    for line in diff_output.splitlines():
-        match = re.match(r"@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@", line)
-        if match:
-            start = int(match.group(1))
-            length = int(match.group(2) or 1)
-            for i in range(start, start + length):
-                changed_lines.add(i)
-    return sorted(changed_lines)
-
 def find_source_path(base_dir):
     for root, dirs, files in os.walk(base_dir):
         if ".git" in dirs and "setup.py" in files:
             return root
     return None
 
-def main():
-    os.environ["PATH"] += f":{os.path.abspath(BUGSINPY_BIN)}"
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Check out one BugsInPy bug and run diff-based mutation testing on it")
+    parser.add_argument("--project", default=PROJECT)
+    parser.add_argument("--bug-id", type=int, default=BUG_ID)
+    parser.add_argument("--package-dir", default=PACKAGE_DIR, help="Package directory (or top-level module) to mutate, relative to the checkout")
+    parser.add_argument("--tests-dir", default="tests")
+    parser.add_argument("--work-dir", default=WORK_DIR, help="Empty directory to check the bug out into")
+    parser.add_argument("--bugsinpy", default=BUGS_REPO_PATH, help="Path of the BugsInPy repository")
+    parser.add_argument("--max-children", type=int, default=None, help="Parallel mutant processes for mutmut (default: all CPUs)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    work_dir = os.path.abspath(args.work_dir)
+    package_dir = args.package_dir.rstrip("/")
+    tests_dir = args.tests_dir.rstrip("/")
+
+    os.environ["PATH"] += f":{os.path.abspath(os.path.join(args.bugsinpy, 'framework', 'bin'))}"
 
-    print(f"📦 Checking out buggy version of {PROJECT}...")
-    run_cmd(f"bugsinpy-checkout -p {PROJECT} -v 0 -i {BUG_ID} -w {WORK_DIR}")
+    print(f"📦 Checking out buggy version of {args.project} (bug {args.bug_id})...")
+    run_cmd(f"bugsinpy-checkout -p {args.project} -v 0 -i {args.bug_id} -w {work_dir}")
 
     print("📂 Directory structure after checkout:")
-    print(run_cmd(f"find {WORK_DIR}"))
+    print(run_cmd(f"find {work_dir}"))
 
     print("📄 Python files under checkout:")
-    print(run_cmd(f"find {WORK_DIR} -name '*.py'"))
+    print(run_cmd(f"find {work_dir} -name '*.py'"))
 
-    source_path = find_source_path(WORK_DIR)
+    source_path = find_source_path(work_dir)
     if not source_path:
         raise RuntimeError("❌ Could not find source folder after checkout.")
 
     os.chdir(source_path)
     print(f"📂 Changed to source path: {source_path}")
+
+    print("🔍 Getting diff...")
+    # commit to commit: the compatibility patch and setup.cfg written below are not part of the bug fix
+    diff_output = run_cmd(f"git diff HEAD~1 HEAD -- {package_dir}")
+    changed_lines = {
+        path: lines
+        for path, lines in parse_changed_lines(diff_output).items()
+        if path.endswith(".py") and lines
+    }
+    print(f"📌 Changed lines: {changed_lines}")
+    if not changed_lines:
+        print("❌ No changed lines found. Skipping mutation.")
+        return
     
     # Fix Python 3.10 compatibility: Mapping moved to collections.abc
-    variables_path = os.path.join("pysnooper", "variables.py")
+    variables_path = os.path.join(package_dir, "variables.py")
     if os.path.exists(variables_path):
         with open(variables_path, "r") as f:
             content = f.read()
@@ -65,32 +84,28 @@ def main():
             f.write(fixed)
         print("✅ Patched variables.py for Python 3.10 compatibility.")
 
-    print("🔍 Getting diff...")
-    diff_output = run_cmd("git diff HEAD HEAD~1")
-    changed_lines = extract_changed_lines_from_diff(diff_output)
-    print(f"📌 Changed lines: {changed_lines}")
-    if not changed_lines:
-        print("❌ No changed lines found. Skipping mutation.")
-        return
-
-    line_str = ",".join(map(str, changed_lines))
-
-    # Make sure we can import `pysnooper`
+    # Make sure we can import the project
     os.environ["PYTHONPATH"] = os.getcwd()
 
     # Ensure mutants directory exists for mutmut output
     mutants_dir = os.path.join(os.getcwd(), "mutants")
     os.makedirs(mutants_dir, exist_ok=True)
 
+    # mutmut mutates these lines, and keeps the file for the explainer and the report (--changed-lines)
+    changed_lines_path = os.path.join(mutants_dir, "changed_lines.json")
+    save_changed_lines(changed_lines, changed_lines_path)
+
     print("🧪 Running mutmut...")
     with open("setup.cfg", "w") as f:
         f.write("[mutmut]\n")
-        f.write("paths_to_mutate = pysnooper/\n")
-        f.write("tests_dir = tests/\n\n")
+        f.write(f"paths_to_mutate = {package_dir}\n")
+        f.write(f"tests_dir = {tests_dir}/\n\n")
         f.write("[tool:pytest]\n")
-        f.write("testpaths = tests\n")
+        f.write(f"testpaths = {tests_dir}\n")
 
-    run_cmd(f"python -m mutmut run --lines {line_str}")
+    # only the changed lines of the changed files are mutated
+    max_children = f" --max-children {args.max_children}" if args.max_children else ""
+    run_cmd(f"python -m mutmut run --changed-lines-json {changed_lines_path}{max_children}")
 
     # Check if survived_mutants.json exists
     survived_path = os.path.join(mutants_dir, "survived_mutants.json")
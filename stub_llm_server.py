@@ -0,0 +1,101 @@
+import argparse
+import hashlib
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Dict, Any
+
+# Deterministic stand-in for Ollama / OpenAI-compatible servers.
+# Every prompt gets the same answer on every run, so explainer throughput can be
+# measured in CI without a GPU or network access.
+
+
+def stub_answer(prompt: str) -> str:
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    return json.dumps({
+        "why": f"stub explanation {digest}: no test asserts on the mutated value",
+        "how to kill": f"stub suggestion {digest}: assert on the exact return value",
+        "example_test": f"def test_stub_{digest}():\n    assert True",
+    })
+
+
+def make_handler(latency: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        def _reply(self, body: Dict[str, Any], status: int = 200):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                return self._reply({"error": "invalid JSON"}, status=400)
+
+            if latency:
+                time.sleep(latency)
+
+            model = payload.get("model", "stub")
+            if self.path == "/api/generate":
+                return self._reply({
+                    "model": model,
+                    "response": stub_answer(payload.get("prompt", "")),
+                    "done": True,
+                })
+            if self.path == "/v1/chat/completions":
+                prompt = "\n".join(msg.get("content", "") for msg in payload.get("messages", []))
+                return self._reply({
+                    "object": "chat.completion",
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": stub_answer(prompt)},
+                        "finish_reason": "stop",
+                    }],
+                })
+            return self._reply({"error": f"unknown endpoint {self.path}"}, status=404)
+
+        # noinspection PyShadowingBuiltins
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def make_server(host: str = "127.0.0.1", port: int = 11435, latency: float = 0.0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(latency))
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0) -> ThreadingHTTPServer:
+    """Start a stub server on a daemon thread. Use port 0 to pick a free port; read it back from `server.server_address`."""
+    server = make_server(host, port, latency)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic local LLM stub for offline explainer runs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to sleep before answering each request")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.latency)
+    print(f"🤖 Stub LLM listening on http://{args.host}:{args.port} (latency {args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
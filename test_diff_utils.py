@@ -0,0 +1,36 @@
+from diff_utils import lines_for_path, match_path
+
+CHANGED = {
+    "src/pkg/core.py": {3, 4},
+    "src/pkg/__init__.py": {1},
+    "src/other/__init__.py": {2},
+    "setup.py": {10},
+}
+
+
+def test_match_path_exact():
+    assert match_path(CHANGED, "src/pkg/core.py") == "src/pkg/core.py"
+    assert match_path(CHANGED, "./setup.py") == "setup.py"
+    assert match_path(CHANGED, "src\\pkg\\core.py") == "src/pkg/core.py"
+
+
+def test_match_path_relative_to_a_sub_directory():
+    # mutmut ran in src/, the diff names paths from the repository root
+    assert match_path(CHANGED, "pkg/core.py") == "src/pkg/core.py"
+    assert match_path(CHANGED, "core.py") == "src/pkg/core.py"
+    # the diff was taken in a sub-directory of the checkout mutmut ran in
+    assert match_path({"pkg/core.py": {1}}, "src/pkg/core.py") == "pkg/core.py"
+
+
+def test_match_path_ambiguous_or_missing():
+    assert match_path(CHANGED, "__init__.py") is None
+    assert match_path(CHANGED, "pkg/__init__.py") == "src/pkg/__init__.py"
+    assert match_path(CHANGED, "missing.py") is None
+    # only whole path components match
+    assert match_path(CHANGED, "re.py") is None
+    assert match_path({}, "core.py") is None
+
+
+def test_lines_for_path():
+    assert lines_for_path(CHANGED, "pkg/core.py") == {3, 4}
+    assert lines_for_path(CHANGED, "__init__.py") == set()
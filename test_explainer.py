@@ -0,0 +1,95 @@
+import json
+
+from explainer import ExplanationJournal, finalize, journal_path_for
+
+
+def record(name, status="explained", why="because"):
+    return {"mutant_name": name, "why": why, "how to kill": "", "example_test": "", "explanation_status": status}
+
+
+def test_journal_path_for():
+    assert journal_path_for("mutants/out.json") == "mutants/out.jsonl"
+
+
+def test_journal_last_record_wins(tmp_path):
+    journal = ExplanationJournal(str(tmp_path / "out.jsonl"))
+    journal.open(resume=False)
+    journal.append(record("a", status="failed", why=""))
+    journal.append(record("b"))
+    journal.append(record("a"))
+    journal.close()
+
+    records = journal.load()
+    assert list(records) == ["a", "b"]
+    assert records["a"]["explanation_status"] == "explained"
+
+
+def test_journal_resume_appends_and_ignores_torn_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    journal = ExplanationJournal(str(path))
+    journal.open(resume=False)
+    journal.append(record("a"))
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"mutant_name": "b", "wh')
+
+    journal.open(resume=True)
+    journal.append(record("c"))
+    journal.close()
+
+    assert list(journal.load()) == ["a", "c"]
+
+
+def test_journal_without_resume_starts_over(tmp_path):
+    journal = ExplanationJournal(str(tmp_path / "out.jsonl"))
+    journal.open(resume=False)
+    journal.append(record("a"))
+    journal.close()
+    journal.open(resume=False)
+    journal.close()
+
+    assert journal.load() == {}
+
+
+def test_journal_load_missing_file(tmp_path):
+    assert ExplanationJournal(str(tmp_path / "missing.jsonl")).load() == {}
+
+
+def test_finalize_adds_survivors_missing_from_the_journal_as_deferred(tmp_path):
+    input_path = tmp_path / "survived.json"
+    input_path.write_text(json.dumps([{"mutant_name": "a"}, {"mutant_name": "b"}]), encoding="utf-8")
+    output_path = tmp_path / "out.json"
+    journal = ExplanationJournal(journal_path_for(str(output_path)))
+    journal.open(resume=False)
+    journal.append(record("a"))
+    journal.close()
+
+    records = finalize(str(input_path), journal.path, str(output_path))
+
+    assert [(r["mutant_name"], r["explanation_status"]) for r in records] == [("a", "explained"), ("b", "deferred")]
+    assert json.loads(output_path.read_text(encoding="utf-8")) == records
+    assert not (tmp_path / "out.json.tmp").exists()
+
+
+def test_journal_resume_drops_torn_line_after_long_record(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text(json.dumps(record("a", why="x" * 10000)) + "\n" + '{"mutant_name": "b", ' + "y" * 5000, encoding="utf-8")
+
+    journal = ExplanationJournal(str(path))
+    journal.open(resume=True)
+    journal.append(record("c"))
+    journal.close()
+
+    assert list(journal.load()) == ["a", "c"]
+
+
+def test_journal_resume_drops_torn_first_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text('{"mutant_name": "a", "wh', encoding="utf-8")
+
+    journal = ExplanationJournal(str(path))
+    journal.open(resume=True)
+    journal.append(record("b"))
+    journal.close()
+
+    assert list(journal.load()) == ["b"]
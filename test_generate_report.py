@@ -0,0 +1,49 @@
+import io
+import json
+
+import pytest
+
+from generate_report import iter_json_array, iter_records
+
+RECORDS = [
+    {"mutant_name": "a.x__mutmut_1", "why": "brackets ] [ and commas , in strings", "line": 12},
+    {"mutant_name": "a.y__mutmut_2", "why": "escaped \" quote and unicode 👀", "nested": [1, [2, {"k": None}]]},
+    12345,
+    -6.5e3,
+    "text",
+    True,
+    None,
+    [],
+    {},
+]
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_iter_json_array_on_every_chunk_boundary(indent):
+    text = json.dumps(RECORDS, indent=indent, ensure_ascii=False)
+    for chunk_size in range(1, len(text) + 2):
+        assert list(iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == RECORDS, chunk_size
+
+
+@pytest.mark.parametrize('text', ['[]', ' [ ] ', '\n[\n]\n'])
+def test_iter_json_array_empty(text):
+    for chunk_size in (1, 2, 64):
+        assert list(iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == []
+
+
+@pytest.mark.parametrize('text', ['', '{"mutant_name": "a"}', '[1, 2', '[{"a": 1}', '[1, {"a": ]'])
+def test_iter_json_array_rejects_invalid_input(text):
+    for chunk_size in (1, 3, 64):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+
+
+def test_iter_records_reads_array_and_journal(tmp_path):
+    records = [{"mutant_name": "a"}, {"mutant_name": "b"}]
+    array_path = tmp_path / "out.json"
+    array_path.write_text(json.dumps(records), encoding="utf-8")
+    journal_path = tmp_path / "out.jsonl"
+    journal_path.write_text("".join(json.dumps(r) + "\n" for r in records) + "\n", encoding="utf-8")
+
+    assert list(iter_records(str(array_path))) == records
+    assert list(iter_records(str(journal_path))) == records
@@ -0,0 +1,151 @@
+import pytest
+import requests
+
+from llm_backends import CircuitBreaker, CircuitOpenError, ResilientBackend, is_retryable
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ScriptedBackend:
+    """Raises or returns the next item of `replies` on each call."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+def open_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=FakeClock())
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_circuit_breaker_half_open_lets_one_trial_through():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 10
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+    assert breaker.allow()
+
+
+def test_circuit_breaker_failed_trial_reopens():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 19
+    assert not breaker.allow()
+    clock.now = 20
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize('error, expected', [
+    (requests.ConnectionError(), True),
+    (requests.Timeout(), True),
+    (http_error(429), True),
+    (http_error(500), True),
+    (http_error(503), True),
+    (http_error(400), False),
+    (http_error(404), False),
+    (requests.HTTPError(), False),
+    (ValueError("bad JSON"), False),
+])
+def test_is_retryable(error, expected):
+    assert is_retryable(error) == expected
+
+
+def test_backoff_is_bounded():
+    backend = ResilientBackend(ScriptedBackend(), backoff_base=1.0, backoff_max=5.0)
+    for attempt in range(10):
+        for _ in range(20):
+            assert 0 <= backend.backoff(attempt) <= min(5.0, 2 ** attempt)
+
+
+def test_retries_retryable_errors_then_succeeds():
+    sleeps = []
+    backend = ResilientBackend(ScriptedBackend(requests.Timeout(), http_error(503), "ok"), max_retries=3, sleep=sleeps.append)
+    assert backend.generate("prompt") == "ok"
+    assert backend.backend.calls == 3
+    assert len(sleeps) == 2
+    assert backend.breaker.consecutive_failures == 0
+    summary = backend.metrics.summary()
+    assert summary["succeeded"] == 1
+    assert summary["retries"] == 2
+    assert summary["errors"] == {"Timeout": 1, "HTTPError": 1}
+
+
+def test_gives_up_after_max_retries():
+    backend = ResilientBackend(ScriptedBackend(*[requests.ConnectionError()] * 3), max_retries=2, sleep=lambda s: None)
+    with pytest.raises(requests.ConnectionError):
+        backend.generate("prompt")
+    assert backend.backend.calls == 3
+    assert backend.metrics.summary()["failed"] == 1
+
+
+def test_non_retryable_errors_are_not_retried_and_do_not_open_the_circuit():
+    backend = ResilientBackend(
+        ScriptedBackend(*[http_error(400)] * 5, "ok"),
+        breaker=CircuitBreaker(failure_threshold=2, clock=FakeClock()),
+        sleep=lambda s: pytest.fail("non-retryable errors must not be retried"),
+    )
+    for _ in range(5):
+        with pytest.raises(requests.HTTPError):
+            backend.generate("prompt")
+    assert backend.breaker.state == "closed"
+    assert backend.generate("prompt") == "ok"
+
+
+def test_open_circuit_short_circuits_without_calling_the_backend():
+    backend = ResilientBackend(
+        ScriptedBackend(requests.ConnectionError(), requests.ConnectionError()),
+        max_retries=0,
+        breaker=CircuitBreaker(failure_threshold=2, clock=FakeClock()),
+    )
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            backend.generate("prompt")
+    with pytest.raises(CircuitOpenError):
+        backend.generate("prompt")
+    assert backend.backend.calls == 2
+    assert backend.metrics.summary()["short_circuited"] == 1
@@ -0,0 +1,67 @@
+import os
+import subprocess
+
+from touch_mutated_lines import ANCHOR, anchor_lines, apply_plans, collect_edits, make_patch, plan_edits
+
+
+def test_collect_edits():
+    records = [
+        {"source_file": "a.py", "start_line": 3},
+        {"source_file": "a.py", "start_line": 3},
+        {"source_file": "a.py", "mutation_desc": "Line 7: x = 1 -> x = 2"},
+        {"source_file": "b.py", "mutation_desc": "no line number"},
+        {"start_line": 4},
+    ]
+    assert collect_edits(records) == {"a.py": {3, 7}, "b.py": {1}}
+
+
+def test_anchor_lines_keeps_line_endings_and_is_idempotent():
+    lines = ["a = 1\r\n", "b = 2\n", "c = 3"]
+    touched = anchor_lines(lines, {1, 3, 4, 0})
+    assert touched == [f"a = 1  {ANCHOR}\r\n", "b = 2\n", f"c = 3  {ANCHOR}"]
+    assert lines == ["a = 1\r\n", "b = 2\n", "c = 3"]
+    assert anchor_lines(touched, {1, 3}) == touched
+
+
+def test_plan_edits_skips_missing_and_already_anchored_files(tmp_path):
+    changed = tmp_path / "changed.py"
+    changed.write_text("x = 1\ny = 2\n", encoding="utf-8")
+    anchored = tmp_path / "anchored.py"
+    anchored.write_text(f"x = 1  {ANCHOR}\n", encoding="utf-8")
+
+    plans = plan_edits({str(changed): {2}, str(anchored): {1}, str(tmp_path / "missing.py"): {1}})
+
+    assert plans == {str(changed): [["x = 1\n", "y = 2\n"], ["x = 1\n", f"y = 2  {ANCHOR}\n"]]}
+
+
+def test_apply_plans_keeps_crlf_and_mode(tmp_path):
+    path = tmp_path / "script.py"
+    path.write_bytes(b"x = 1\r\ny = 2\r\n")
+    os.chmod(path, 0o755)
+
+    apply_plans(plan_edits({str(path): {1}}))
+
+    assert path.read_bytes() == f"x = 1  {ANCHOR}\r\ny = 2\r\n".encode("utf-8")
+    assert os.stat(path).st_mode & 0o777 == 0o755
+    assert os.listdir(tmp_path) == ["script.py"]
+    assert plan_edits({str(path): {1}}) == {}
+
+
+def test_make_patch_applies_with_git(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("a.py", "w", encoding="utf-8") as f:
+        f.write("x = 1\ny = 2\nz = 3")
+    os.mkdir("pkg")
+    with open("pkg/b.py", "w", encoding="utf-8", newline="") as f:
+        f.write("b = 1\r\n")
+    subprocess.run(["git", "init", "-q"], check=True)
+
+    plans = plan_edits({"a.py": {1, 3}, "pkg/b.py": {1}})
+    with open("anchors.patch", "w", encoding="utf-8", newline="") as f:
+        f.write(make_patch(plans))
+    subprocess.run(["git", "apply", "anchors.patch"], check=True)
+
+    with open("a.py", encoding="utf-8") as f:
+        assert f.read() == f"x = 1  {ANCHOR}\ny = 2\nz = 3  {ANCHOR}"
+    with open("pkg/b.py", "rb") as f:
+        assert f.read() == f"b = 1  {ANCHOR}\r\n".encode("utf-8")
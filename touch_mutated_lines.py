@@ -1,47 +1,140 @@
+import argparse
+import difflib
 import json
 import os
 import re
+import sys
+import tempfile
 from collections import defaultdict
+from typing import Dict, Any, Iterable, List, Set
 
 EXPLANATION_PATH = "mutants/survived_mutants_with_explanations.json"
+ANCHOR = "# 👀 Reviewdog anchor"
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 
 # Group all lines to touch by file path
-edits = defaultdict(set)
+def collect_edits(records: Iterable[Dict[str, Any]]) -> Dict[str, Set[int]]:
+    edits = defaultdict(set)
+    for record in records:
+        path = record.get("source_file")
+        line = record.get("start_line")
+        if not line:
+            # Older records only have the line number inside mutation_desc, like "Line 13:"
+            match = re.search(r"Line (\d+):", record.get("mutation_desc", ""))
+            line = int(match.group(1)) if match else 1  # fallback to line 1
+
+        if path:
+            edits[path].add(int(line))
+    return edits
 
-with open(EXPLANATION_PATH, "r", encoding="utf-8") as f:
-    records = json.load(f)
 
-for record in records:
-    path = record.get("source_file")
-    mutation_desc = record.get("mutation_desc", "")
+def anchor_lines(lines: List[str], lines_to_touch: Set[int]) -> List[str]:
+    """Copy of `lines` with the anchor comment added to each line in `lines_to_touch` that does not have it yet."""
+    result = list(lines)
+    for line_num in sorted(lines_to_touch):
+        idx = line_num - 1
+        if 0 <= idx < len(result) and ANCHOR not in result[idx]:
+            body = result[idx].rstrip("\r\n")
+            result[idx] = body + f"  {ANCHOR}" + result[idx][len(body):]
+    return result
 
-    # Extract the correct line number from mutation_desc like "Line 13:"
-    match = re.search(r"Line (\d+):", mutation_desc)
-    line = int(match.group(1)) if match else 1  # fallback to line 1
 
-    if path:
-        edits[path].add(line)
+def plan_edits(edits: Dict[str, Set[int]]) -> Dict[str, List[List[str]]]:
+    """Read every file first and compute its new content: path -> [old lines, new lines].
 
-# Apply line modifications
-for file_path, lines_to_touch in edits.items():
-    if not os.path.exists(file_path):
-        print(f"❌ File not found: {file_path}")
-        continue
+    Files that are missing, unreadable or already anchored are left out, so running twice changes nothing."""
+    plans = {}
+    for file_path, lines_to_touch in sorted(edits.items()):
+        if not os.path.exists(file_path):
+            print(f"❌ File not found: {file_path}")
+            continue
+        try:
+            # newline="" keeps CRLF files CRLF
+            with open(file_path, "r", encoding="utf-8", newline="") as f:
+                lines = f.read().splitlines(keepends=True)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ Error reading {file_path}: {e}")
+            continue
 
+        touched = anchor_lines(lines, lines_to_touch)
+        if touched != lines:
+            plans[file_path] = [lines, touched]
+    return plans
+
+
+def write_atomic(path: str, content: str) -> None:
+    """Replace `path` with `content` through a temp file in the same directory, so a crash never leaves half a file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(content)
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def apply_plans(plans: Dict[str, List[List[str]]]) -> None:
+    for file_path, (_, touched) in plans.items():
+        write_atomic(file_path, "".join(touched))
+
+
+def make_patch(plans: Dict[str, List[List[str]]]) -> str:
+    """Single unified diff of all planned edits, to be applied with `git apply`."""
+    out = []
+    for file_path, (lines, touched) in plans.items():
+        path = os.path.relpath(file_path).replace(os.sep, "/")
+        for line in difflib.unified_diff(lines, touched, fromfile=f"a/{path}", tofile=f"b/{path}"):
+            if line.endswith("\n"):
+                out.append(line)
+            else:
+                # header lines come without a newline, so does the last line of a file that does not end in one
+                out.append(line + "\n")
+                if line[:1] in "+- " and not line.startswith(("---", "+++")):
+                    out.append("\\ No newline at end of file\n")
+    return "".join(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add anchor comments to the lines of surviving mutants so they show up in the PR diff")
+    parser.add_argument("--input", default=EXPLANATION_PATH)
+    parser.add_argument("--dry-run", action="store_true", help="Only print which lines would be touched")
+    parser.add_argument("--patch", default=None, help="Write a unified diff for `git apply` to this path (- for stdout) instead of editing files")
+    args = parser.parse_args()
+
+    plans = plan_edits(collect_edits(load_records(args.input)))
+    if not plans:
+        print("✅ Nothing to touch")
+        return
+
+    if args.patch:
+        patch = make_patch(plans)
+        if args.patch == "-":
+            sys.stdout.write(patch)
+        else:
+            with open(args.patch, "w", encoding="utf-8", newline="") as f:
+                f.write(patch)
+            print(f"📝 Wrote patch for {len(plans)} file(s) to {args.patch}")
+        return
 
-        for line_num in sorted(lines_to_touch):
-            idx = line_num - 1
-            if 0 <= idx < len(lines):
-                if "# 👀 Reviewdog anchor" not in lines[idx]:
-                    lines[idx] = lines[idx].rstrip("\n") + "  # 👀 Reviewdog anchor\n"
+    for file_path, (lines, touched) in plans.items():
+        changed = [i + 1 for i, (a, b) in enumerate(zip(lines, touched)) if a != b]
+        if args.dry_run:
+            print(f"🔍 Would touch {file_path} on line(s): {changed}")
+        else:
+            print(f"✅ Touching {file_path} on line(s): {changed}")
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.writelines(lines)
+    if not args.dry_run:
+        apply_plans(plans)
 
-        print(f"✅ Touched {file_path} on line(s): {sorted(lines_to_touch)}")
 
-    except Exception as e:
-        print(f"❌ Error editing {file_path}: {e}")
+if __name__ == "__main__":
+    main()